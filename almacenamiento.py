@@ -0,0 +1,540 @@
+import os
+import sys
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+import funciones as fn
+import binario
+import instantanea
+
+
+# Backends de Almacenamiento
+#
+# Todas las operaciones de persistencia de funciones.py (alta, carga, carga por partición,
+# reescritura de una región, modificación/baja y estadísticas) pasan por fn.BACKEND cuando
+# está configurado. Un backend es cualquier objeto con esta interfaz:
+#
+#   nombre                                          texto descriptivo
+#   alta(continente, region, pais, pob, sup)        agrega un país; devuelve dónde quedó guardado
+#   alta_lote(continente, region, filas)            agrega varias filas {'Pais', 'Poblacion', 'Superficie'}
+#   vaciar()                                        borra todos los datos
+#   leer_todo(compacto)                             lista global (dicts o RegistroPais)
+#   leer_particion(continente, region, compacto)    ítems de esas claves (None = cualquiera)
+#   reescribir_region(continente, region, items)    reemplaza el contenido de la región
+#   reescribir_regiones(regiones)                   lo mismo para {(continente, region): items}, en un solo paso
+#                                                   cuando el backend lo permite (ver cada implementación)
+#   actualizar(continente, region, anterior, nuevo) cambia la primera fila con valores 'anterior'
+#   eliminar(continente, region, anterior)          borra la primera fila con valores 'anterior'
+#   estadisticas()                                  mismo formato que fn.estadisticas_desde_resumenes()
+
+NOMBRE_DB_SQLITE = "paises.db"
+BACKENDS = ('csv', 'sqlite', 'binario')   # El primero es la referencia de la verificación
+
+
+def _item_de_fila(pais, poblacion, superficie, continente, region, compacto):
+    """Crea el ítem con la misma forma que produce la lectura del árbol CSV."""
+    if compacto:
+        return fn.RegistroPais(pais, poblacion, superficie, continente, region)
+    return {
+        'Pais': pais,
+        'Poblacion': str(poblacion),
+        'Superficie': str(superficie),
+        'Continente': continente,
+        'Region': region
+    }
+
+
+class BackendCSV:
+    """
+    Árbol de carpetas DB/Continente/Región/Datos.csv (el almacenamiento original).
+    Llama directamente a las implementaciones CSV de funciones.py, sin pasar por fn.BACKEND,
+    para poder usarse como origen o destino de una migración con otro backend activo.
+    """
+    nombre = "árbol CSV"
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or fn.BASE_DIR
+
+    def _en_base(self, funcion, *args):
+        """Ejecuta una función de funciones.py con BASE_DIR apuntando a este árbol."""
+        anterior = fn.BASE_DIR
+        fn.BASE_DIR = self.base_dir
+        try:
+            return funcion(*args)
+        finally:
+            fn.BASE_DIR = anterior
+
+    def alta(self, continente, region, pais, poblacion, superficie):
+        return self._en_base(fn.alta_item_csv, continente, region, pais, poblacion, superficie)
+
+    def alta_lote(self, continente, region, filas):
+        self._en_base(fn.volcar_buffers, {(continente, region): list(filas)}, set())
+
+    def vaciar(self):
+        fn.invalidar_cache()
+        fn.vaciar_directorio_base(self.base_dir)
+
+    def leer_todo(self, compacto=False):
+        if not os.path.isdir(self.base_dir):
+            return []
+        return self._en_base(fn.leer_datos_recursivo, self.base_dir, compacto)
+
+    def leer_particion(self, continente=None, region=None, compacto=False):
+        archivos = self._en_base(fn.buscar_archivos_particion, continente, region)
+        items = []
+        for items_archivo in fn.parsear_archivos(archivos, compacto=compacto):
+            items.extend(items_archivo)
+        return items
+
+    def reescribir_region(self, continente, region, items):
+        self._en_base(fn.reescribir_region_csv, continente, region, items)
+
+    def reescribir_regiones(self, regiones):
+        """
+        Región por región. La sincronización del árbol no pasa por aquí: arma un árbol nuevo y
+        lo reemplaza de una vez (ver fn.sincronizar_datos).
+        """
+        for (continente, region), items in regiones.items():
+            self.reescribir_region(continente, region, items)
+
+    def actualizar(self, continente, region, anterior, nuevo):
+        self._en_base(fn.registrar_cambio_csv, continente, region, 'U', anterior, nuevo)
+
+    def eliminar(self, continente, region, anterior):
+        self._en_base(fn.registrar_cambio_csv, continente, region, 'D', anterior)
+
+    def estadisticas(self):
+        return self._en_base(fn.estadisticas_csv)
+
+
+class BackendSQLite:
+    """
+    Base de datos SQLite local con una tabla 'paises' indexada por Pais, Continente y Región.
+    Filtros, modificaciones y agregados se resuelven con SQL sobre esos índices.
+    Las claves de búsqueda se guardan en minúsculas (calculadas en Python) para comparar
+    igual que el árbol CSV, que no distingue mayúsculas.
+    La conexión puede usarse desde cualquier hilo (el servidor escribe desde su executor):
+    cada operación la toma con 'cerrojo', así dos hilos nunca la usan a la vez.
+    """
+    nombre = "SQLite"
+
+    def __init__(self, ruta_db=NOMBRE_DB_SQLITE):
+        self.ruta_db = ruta_db
+        self.cerrojo = threading.RLock()
+        self.conexion = sqlite3.connect(ruta_db, check_same_thread=False)
+        self.conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS paises (
+                id INTEGER PRIMARY KEY,
+                continente TEXT NOT NULL,
+                region TEXT NOT NULL,
+                pais TEXT NOT NULL,
+                poblacion INTEGER,
+                superficie INTEGER,
+                continente_min TEXT NOT NULL,
+                region_min TEXT NOT NULL,
+                pais_min TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_paises_pais ON paises (pais_min);
+            CREATE INDEX IF NOT EXISTS idx_paises_continente ON paises (continente_min, region_min);
+            CREATE INDEX IF NOT EXISTS idx_paises_region ON paises (region_min);
+            CREATE INDEX IF NOT EXISTS idx_paises_fila ON paises (continente, region, pais);
+        """)
+
+    def _ejecutar_insercion(self, filas):
+        """Inserta tuplas (continente, region, pais, poblacion, superficie) en la transacción abierta."""
+        self.conexion.executemany(
+            "INSERT INTO paises (continente, region, pais, poblacion, superficie, "
+            "continente_min, region_min, pais_min) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ((c, r, p, pob, sup, c.lower(), r.lower(), p.lower()) for c, r, p, pob, sup in filas)
+        )
+
+    def _insertar(self, filas):
+        """Inserta tuplas (continente, region, pais, poblacion, superficie) en una transacción."""
+        with self.cerrojo, self.conexion:
+            self._ejecutar_insercion(filas)
+
+    def alta(self, continente, region, pais, poblacion, superficie):
+        self._insertar([(continente, region, pais, poblacion, superficie)])
+        return f"{self.ruta_db} ({continente}/{region})"
+
+    def alta_lote(self, continente, region, filas):
+        self._insertar((continente, region, f['Pais'], f['Poblacion'], f['Superficie']) for f in filas)
+
+    def vaciar(self):
+        with self.cerrojo, self.conexion:
+            self.conexion.execute("DELETE FROM paises")
+
+    def _consultar(self, condicion="", parametros=(), compacto=False):
+        consulta = "SELECT pais, poblacion, superficie, continente, region FROM paises"
+        if condicion:
+            consulta += " WHERE " + condicion
+        with self.cerrojo:
+            return [
+                _item_de_fila(*fila, compacto)
+                for fila in self.conexion.execute(consulta + " ORDER BY id", parametros)
+            ]
+
+    def leer_todo(self, compacto=False):
+        return self._consultar(compacto=compacto)
+
+    def leer_particion(self, continente=None, region=None, compacto=False):
+        condiciones, parametros = [], []
+        if continente is not None:
+            condiciones.append("continente_min = ?")
+            parametros.append(continente.lower())
+        if region is not None:
+            condiciones.append("region_min = ?")
+            parametros.append(region.lower())
+        return self._consultar(" AND ".join(condiciones), parametros, compacto)
+
+    def reescribir_region(self, continente, region, items):
+        filas = [(continente, region, i['Pais'], i['Poblacion'], i['Superficie']) for i in items]
+        # Borrado e inserción en la misma transacción: la región nunca queda vacía a medias
+        with self.cerrojo, self.conexion:
+            self.conexion.execute("DELETE FROM paises WHERE continente = ? AND region = ?", (continente, region))
+            self._ejecutar_insercion(filas)
+
+    def reescribir_regiones(self, regiones):
+        """Todas las regiones en una sola transacción: un error a mitad no deja ninguna reescrita."""
+        with self.cerrojo, self.conexion:
+            for (continente, region), items in regiones.items():
+                self.conexion.execute("DELETE FROM paises WHERE continente = ? AND region = ?", (continente, region))
+                self._ejecutar_insercion(
+                    [(continente, region, i['Pais'], i['Poblacion'], i['Superficie']) for i in items]
+                )
+
+    def _id_de_fila(self, continente, region, anterior):
+        """Devuelve el id de la primera fila con esos valores (el mismo criterio que el log CSV)."""
+        pais, poblacion, superficie = anterior
+        fila = self.conexion.execute(
+            "SELECT id FROM paises WHERE continente = ? AND region = ? AND pais = ? "
+            "AND poblacion = ? AND superficie = ? ORDER BY id LIMIT 1",
+            (continente, region, pais, fn.a_entero(poblacion), fn.a_entero(superficie))
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def actualizar(self, continente, region, anterior, nuevo):
+        pais, poblacion, superficie = nuevo
+        with self.cerrojo, self.conexion:
+            id_fila = self._id_de_fila(continente, region, anterior)
+            if id_fila is None:
+                return
+            self.conexion.execute(
+                "UPDATE paises SET pais = ?, poblacion = ?, superficie = ?, pais_min = ? WHERE id = ?",
+                (pais, poblacion, superficie, pais.lower(), id_fila)
+            )
+
+    def eliminar(self, continente, region, anterior):
+        with self.cerrojo, self.conexion:
+            id_fila = self._id_de_fila(continente, region, anterior)
+            if id_fila is not None:
+                self.conexion.execute("DELETE FROM paises WHERE id = ?", (id_fila,))
+
+    def estadisticas(self):
+        total = fn.resumen_vacio()
+        por_continente = {}
+        por_region = {}
+
+        # Solo se agregan los valores enteros, igual que los resúmenes del árbol CSV
+        with self.cerrojo:
+            filas = self.conexion.execute("""
+                SELECT continente, region, COUNT(*),
+                       TOTAL(CASE WHEN typeof(poblacion) = 'integer' THEN poblacion END),
+                       MIN(CASE WHEN typeof(poblacion) = 'integer' THEN poblacion END),
+                       MAX(CASE WHEN typeof(poblacion) = 'integer' THEN poblacion END),
+                       TOTAL(CASE WHEN typeof(superficie) = 'integer' THEN superficie END),
+                       MIN(CASE WHEN typeof(superficie) = 'integer' THEN superficie END),
+                       MAX(CASE WHEN typeof(superficie) = 'integer' THEN superficie END)
+                FROM paises GROUP BY continente, region ORDER BY MIN(id)
+                """).fetchall()
+        for continente, region, cantidad, s_pob, min_pob, max_pob, s_sup, min_sup, max_sup in filas:
+            resumen = {
+                'cantidad': cantidad,
+                'Poblacion': {'suma': int(s_pob), 'min': min_pob, 'max': max_pob},
+                'Superficie': {'suma': int(s_sup), 'min': min_sup, 'max': max_sup}
+            }
+            por_region[(continente, region)] = resumen
+            fn.combinar_resumenes(por_continente.setdefault(continente, fn.resumen_vacio()), resumen)
+            fn.combinar_resumenes(total, resumen)
+
+        return {'global': total, 'por_continente': por_continente, 'por_region': por_region}
+
+    def cerrar(self):
+        with self.cerrojo:
+            self.conexion.close()
+
+
+class BackendBinario:
+    """
+    Árbol DB/Continente/Región/Datos.bin con registros de ancho fijo (ver binario.py).
+    Las modificaciones se escriben en el lugar del registro a través de mmap y las bajas
+    solo lo marcan como borrado; la lectura y las estadísticas no parsean texto.
+    Puede convivir con los Datos.csv del mismo árbol: solo toca los archivos Datos.bin.
+    """
+    nombre = "binario (mmap)"
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or fn.BASE_DIR
+
+    def _ruta(self, continente, region):
+        return binario.obtener_ruta_binario(continente, region, self.base_dir)
+
+    def _regiones(self, continente=None, region=None):
+        """
+        Devuelve (ruta_bin, continente, region) de las regiones que coinciden (sin distinguir mayúsculas).
+        Las carpetas debajo del continente pueden anidarse: cada nivel es una parte de la Región.
+        """
+        encontradas = []
+        if not os.path.isdir(self.base_dir):
+            return encontradas
+        niveles = None if region is None else [nivel.lower() for nivel in fn.niveles_region(region)]
+
+        def recorrer(ruta, profundidad):
+            with os.scandir(ruta) as entradas:
+                subdirectorios = [entrada for entrada in entradas if entrada.is_dir()]
+            for entrada in subdirectorios:
+                nombre = entrada.name.lower()
+                if profundidad == 0:
+                    if continente is not None and nombre != continente.lower():
+                        continue
+                elif niveles is not None and nombre != niveles[profundidad - 1]:
+                    continue
+
+                ruta_bin = os.path.join(entrada.path, binario.NOMBRE_ARCHIVO)
+                if profundidad > 0 and (niveles is None or profundidad == len(niveles)) and os.path.isfile(ruta_bin):
+                    encontradas.append((ruta_bin, *fn.jerarquia_de_ruta(entrada.path, self.base_dir)))
+                if niveles is None or profundidad < len(niveles):
+                    recorrer(entrada.path, profundidad + 1)
+
+        recorrer(self.base_dir, 0)
+        return encontradas
+
+    def alta(self, continente, region, pais, poblacion, superficie):
+        ruta_bin = self._ruta(continente, region)
+        binario.anexar_registros(ruta_bin, [(pais, poblacion, superficie)])
+        return ruta_bin
+
+    def alta_lote(self, continente, region, filas):
+        binario.anexar_registros(
+            self._ruta(continente, region),
+            [(f['Pais'], f['Poblacion'], f['Superficie']) for f in filas]
+        )
+
+    def vaciar(self):
+        for ruta_bin, _, _ in self._regiones():
+            os.remove(ruta_bin)
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def leer_todo(self, compacto=False):
+        return self.leer_particion(compacto=compacto)
+
+    def leer_particion(self, continente=None, region=None, compacto=False):
+        items = []
+        for ruta_bin, c, r in self._regiones(continente, region):
+            if compacto:
+                c, r = sys.intern(c), sys.intern(r)
+            items.extend(_item_de_fila(*fila, c, r, compacto) for fila in binario.leer_region(ruta_bin))
+        return items
+
+    def reescribir_region(self, continente, region, items):
+        binario.escribir_region(
+            self._ruta(continente, region),
+            [(i['Pais'], i['Poblacion'], i['Superficie']) for i in items]
+        )
+
+    def reescribir_regiones(self, regiones):
+        """
+        Valida y empaqueta todas las regiones antes de escribir la primera, pero cada Datos.bin
+        se reemplaza por separado: no hay transacción entre archivos. Reemplazar el árbol entero,
+        como hace la sincronización CSV, cambiaría también los Datos.csv con los que convive.
+        Si el proceso se interrumpe a mitad, repetir la sincronización termina las regiones que faltan.
+        """
+        binario.escribir_regiones({
+            self._ruta(continente, region): [(i['Pais'], i['Poblacion'], i['Superficie']) for i in items]
+            for (continente, region), items in regiones.items()
+        })
+
+    def actualizar(self, continente, region, anterior, nuevo):
+        ruta_bin = self._ruta(continente, region)
+        try:
+            binario.actualizar_registro(ruta_bin, anterior, nuevo)
+        except (ValueError, OSError) as e:
+            print(f"Error al modificar el registro en {ruta_bin}: {e}")
+
+    def eliminar(self, continente, region, anterior):
+        ruta_bin = self._ruta(continente, region)
+        try:
+            binario.borrar_registro(ruta_bin, anterior)
+        except (ValueError, OSError) as e:
+            print(f"Error al borrar el registro en {ruta_bin}: {e}")
+
+    def estadisticas(self):
+        total = fn.resumen_vacio()
+        por_continente = {}
+        por_region = {}
+        for ruta_bin, continente, region in self._regiones():
+            resumen = fn.resumen_vacio()
+            for poblacion, superficie in zip(*binario.columnas_numericas(ruta_bin)):
+                fn.sumar_al_resumen(resumen, poblacion, superficie)
+            if not resumen['cantidad']:
+                continue
+            por_region[(continente, region)] = resumen
+            fn.combinar_resumenes(por_continente.setdefault(continente, fn.resumen_vacio()), resumen)
+            fn.combinar_resumenes(total, resumen)
+        return {'global': total, 'por_continente': por_continente, 'por_region': por_region}
+
+
+def crear_backend(nombre, ruta=None):
+    """
+    Crea un backend por nombre: 'csv' o 'binario' (ruta = directorio base)
+    o 'sqlite' (ruta = archivo .db).
+    """
+    if nombre == 'csv':
+        return BackendCSV(ruta)
+    if nombre == 'binario':
+        return BackendBinario(ruta)
+    if nombre == 'sqlite':
+        return BackendSQLite(ruta or NOMBRE_DB_SQLITE)
+    raise ValueError(f"Backend desconocido: {nombre}")
+
+def configurar_backend(nombre, ruta=None):
+    """
+    Activa el backend indicado para todas las operaciones de funciones.py.
+    'csv' restablece el comportamiento original (fn.BACKEND = None).
+    """
+    if nombre == 'csv':
+        if ruta:
+            fn.BASE_DIR = ruta
+        fn.BACKEND = None
+    else:
+        fn.BACKEND = crear_backend(nombre, ruta)
+    fn.invalidar_cache()
+    return fn.BACKEND
+
+def configurar_desde_entorno():
+    """
+    Activa el backend indicado por las variables de entorno PAISES_BACKEND ('csv' por defecto,
+    'sqlite' o 'binario') y PAISES_DB (archivo de SQLite o directorio base). Devuelve fn.BACKEND.
+    Con PAISES_INSTANTANEA=1 las cargas del árbol CSV usan la instantánea binaria (instantanea.py).
+    """
+    nombre = os.environ.get('PAISES_BACKEND', 'csv').strip().lower()
+    backend = configurar_backend(nombre, os.environ.get('PAISES_DB'))
+    if os.environ.get('PAISES_INSTANTANEA', '').strip() == '1':
+        instantanea.activar()
+    return backend
+
+def migrar(origen, destino):
+    """
+    Copia todos los países del backend 'origen' al 'destino' (que se vacía antes).
+    Conserva el orden de cada región. Devuelve la cantidad de países migrados.
+    """
+    por_region = {}
+    for item in origen.leer_todo():
+        por_region.setdefault((item['Continente'], item['Region']), []).append(
+            {'Pais': item['Pais'], 'Poblacion': item['Poblacion'], 'Superficie': item['Superficie']}
+        )
+
+    destino.vaciar()
+    for (continente, region), filas in por_region.items():
+        destino.alta_lote(continente, region, filas)
+    return sum(len(filas) for filas in por_region.values())
+
+
+# Verificación de Paridad entre Backends
+
+def _normalizar(items):
+    """Forma comparable de una lista de ítems: valores como texto y orden por región."""
+    filas = [tuple(str(item[campo]) for campo in fn.CAMPOS_SALIDA) for item in items]
+    return sorted(filas, key=lambda fila: (fila[3], fila[4]))
+
+def verificar_backends(archivo_origen='paises.csv'):
+    """
+    Ejecuta el mismo recorrido de operaciones (importación, alta, filtro, modificación,
+    baja, reescritura y estadísticas) sobre cada backend en un directorio temporal
+    y compara los resultados con los del árbol CSV. Devuelve True si coinciden en todos los pasos.
+    """
+    resultados = {}
+    directorio_original = os.getcwd()
+    archivo_origen = os.path.abspath(archivo_origen)
+    backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+
+    for nombre in BACKENDS:
+        with tempfile.TemporaryDirectory() as temporal:
+            os.chdir(temporal)
+            try:
+                configurar_backend(nombre, os.path.join(temporal, 'paises.db') if nombre == 'sqlite' else 'DB')
+                pasos = []
+                fn.importar_datos_iniciales(archivo_origen)
+                pasos.append(_normalizar(fn.obtener_todos_los_datos()))
+
+                # El orden de la lista global depende del backend: se eligen los ítems por valor
+                lista = sorted(fn.obtener_todos_los_datos(), key=lambda item: tuple(str(item[campo]) for campo in fn.CAMPOS_SALIDA))
+                primero = lista[0]
+                fn.alta_item(primero['Continente'], primero['Region'], "Verificacion", 123, 456)
+                pasos.append(_normalizar(fn.obtener_datos_filtrados(primero['Continente'])))
+                pasos.append(_normalizar(fn.obtener_datos_filtrados(None, primero['Region'].upper())))
+
+                anterior = (primero['Pais'], primero['Poblacion'], primero['Superficie'])
+                fn.registrar_cambio(primero['Continente'], primero['Region'], 'U', anterior, (primero['Pais'], 1, 2))
+                ultimo = lista[-1]
+                fn.registrar_cambio(ultimo['Continente'], ultimo['Region'], 'D',
+                                    (ultimo['Pais'], ultimo['Poblacion'], ultimo['Superficie']))
+                pasos.append(_normalizar(fn.obtener_todos_los_datos()))
+
+                region = fn.obtener_datos_filtrados(primero['Continente'], primero['Region'])
+                fn.reescribir_archivo_csv_especifico(primero['Continente'], primero['Region'], region[::-1])
+                pasos.append(_normalizar(fn.obtener_todos_los_datos()))
+
+                estadisticas = fn.estadisticas_desde_resumenes()
+                pasos.append((estadisticas['global'], sorted(estadisticas['por_continente'].items())))
+                resultados[nombre] = pasos
+            finally:
+                if isinstance(fn.BACKEND, BackendSQLite):
+                    fn.BACKEND.cerrar()
+                fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+                fn.invalidar_cache()
+                os.chdir(directorio_original)
+
+    iguales = True
+    for nombre in BACKENDS[1:]:
+        for paso, (a, b) in enumerate(zip(resultados['csv'], resultados[nombre]), 1):
+            if a != b:
+                print(f"Diferencia entre csv y {nombre} en el paso {paso}")
+                iguales = False
+    print("Verificación de backends: " + ("OK" if iguales else "FALLÓ"))
+    return iguales
+
+
+def main(argumentos=None):
+    """Línea de comandos: migración entre backends y verificación de paridad."""
+    parser = argparse.ArgumentParser(description="Herramientas de almacenamiento (árbol CSV / SQLite / binario).")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_migrar = sub.add_parser('migrar', help="Copia todos los datos de un backend a otro")
+    p_migrar.add_argument('origen', choices=BACKENDS)
+    p_migrar.add_argument('destino', choices=BACKENDS)
+    p_migrar.add_argument('--dir', default=fn.BASE_DIR, help="Directorio base del árbol CSV o binario")
+    p_migrar.add_argument('--db', default=NOMBRE_DB_SQLITE, help="Archivo de la base SQLite")
+
+    p_verificar = sub.add_parser('verificar', help="Ejecuta las mismas operaciones en cada backend y compara")
+    p_verificar.add_argument('--origen', default='paises.csv')
+
+    args = parser.parse_args(argumentos)
+
+    if args.comando == 'migrar':
+        if args.origen == args.destino:
+            parser.error("El origen y el destino deben ser distintos.")
+        rutas = {'csv': args.dir, 'binario': args.dir, 'sqlite': args.db}
+        origen = crear_backend(args.origen, rutas[args.origen])
+        destino = crear_backend(args.destino, rutas[args.destino])
+        cantidad = migrar(origen, destino)
+        print(f"Migración completada: {cantidad} países de {origen.nombre} a {destino.nombre}.")
+        return 0
+
+    return 0 if verificar_backends(args.origen) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
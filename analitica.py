@@ -0,0 +1,190 @@
+import math
+
+import funciones as fn
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa la implementación en Python puro
+    np = None
+
+
+# Motor de Análisis por Grupo
+#
+# Carga la jerarquía una sola vez en columnas (Población, Superficie y códigos categóricos de
+# Continente/Región) y calcula reportes agrupados: cantidad, suma, media, mediana y percentiles,
+# más un ranking de densidad de población. Con NumPy las reducciones se vectorizan; sin NumPy se
+# usa un camino en Python puro que produce exactamente los mismos números.
+
+PERCENTILES = (25, 50, 75, 90)   # La mediana es el percentil 50
+
+
+def cargar_columnas(lista_global=None, usar_numpy=None):
+    """
+    Convierte la lista global en columnas. Si no se recibe lista, la carga desde BASE_DIR.
+    Las filas con Población o Superficie no numéricas se descartan (se informa la cantidad).
+    Continente y Región se codifican como enteros que indexan 'continentes' y 'regiones'.
+    """
+    if lista_global is None:
+        lista_global = fn.obtener_todos_los_datos(compacto=True)
+    if usar_numpy is None:
+        usar_numpy = np is not None
+
+    paises, poblacion, superficie = [], [], []
+    codigos_continente, codigos_region = [], []
+    continentes, regiones = {}, {}
+    descartadas = 0
+
+    for item in lista_global:
+        pob = fn.a_entero(item['Poblacion'])
+        sup = fn.a_entero(item['Superficie'])
+        if not isinstance(pob, int) or not isinstance(sup, int):
+            descartadas += 1
+            continue
+
+        paises.append(item['Pais'])
+        poblacion.append(pob)
+        superficie.append(sup)
+        # Codificación por diccionario: cada categoría recibe un código en orden de aparición
+        codigos_continente.append(continentes.setdefault(item['Continente'], len(continentes)))
+        codigos_region.append(regiones.setdefault((item['Continente'], item['Region']), len(regiones)))
+
+    columnas = {
+        'Pais': paises,
+        'Poblacion': poblacion,
+        'Superficie': superficie,
+        'Continente': codigos_continente,
+        'Region': codigos_region,
+        'continentes': list(continentes),
+        'regiones': list(regiones),
+        'descartadas': descartadas,
+        'numpy': usar_numpy,
+    }
+
+    if usar_numpy:
+        for campo in ('Poblacion', 'Superficie', 'Continente', 'Region'):
+            columnas[campo] = np.asarray(columnas[campo], dtype=np.int64)
+
+    return columnas
+
+def _percentil(ordenados, inicio, cantidad, p):
+    """
+    Percentil con interpolación lineal sobre una porción ya ordenada (mismo criterio que NumPy).
+    Se usa igual en ambos caminos para que los resultados coincidan exactamente.
+    """
+    posicion = (cantidad - 1) * p / 100
+    abajo = math.floor(posicion)
+    arriba = min(abajo + 1, cantidad - 1)
+    v_abajo = float(ordenados[inicio + abajo])
+    v_arriba = float(ordenados[inicio + arriba])
+    return v_abajo + (v_arriba - v_abajo) * (posicion - abajo)
+
+def _estadisticas_campo(ordenados, inicio, cantidad, suma):
+    """Arma el bloque de estadísticas de un campo para un grupo."""
+    bloque = {'suma': int(suma), 'media': int(suma) / cantidad}
+    for p in PERCENTILES:
+        bloque[f"p{p}"] = _percentil(ordenados, inicio, cantidad, p)
+    bloque['mediana'] = bloque['p50']
+    return bloque
+
+def _grupos_python(codigos, valores):
+    """Ordena los valores por (grupo, valor) y devuelve {código: (ordenados, inicio, cantidad, suma)}."""
+    por_grupo = {}
+    for codigo, valor in zip(codigos, valores):
+        por_grupo.setdefault(codigo, []).append(valor)
+
+    grupos = {}
+    for codigo, lista in por_grupo.items():
+        lista.sort()
+        grupos[codigo] = (lista, 0, len(lista), sum(lista))
+    return grupos
+
+def _grupos_numpy(codigos, valores):
+    """
+    Igual que _grupos_python pero vectorizado: un único lexsort por (grupo, valor)
+    y sumas por grupo con np.add.reduceat sobre los límites de cada grupo.
+    """
+    if len(codigos) == 0:
+        return {}
+    orden = np.lexsort((valores, codigos))
+    codigos_ordenados = codigos[orden]
+    ordenados = valores[orden]
+
+    inicios = np.flatnonzero(np.r_[True, codigos_ordenados[1:] != codigos_ordenados[:-1]])
+    cantidades = np.diff(np.r_[inicios, len(ordenados)])
+    sumas = np.add.reduceat(ordenados, inicios)
+
+    return {
+        int(codigos_ordenados[inicio]): (ordenados, int(inicio), int(cantidad), int(suma))
+        for inicio, cantidad, suma in zip(inicios, cantidades, sumas)
+    }
+
+def resumen_por_grupo(columnas, nivel='Continente'):
+    """
+    Calcula, por Continente o por (Continente, Región), la cantidad de países y para Población y
+    Superficie: suma, media, mediana y percentiles. Devuelve {grupo: {...}} en orden de aparición.
+    """
+    codigos = columnas[nivel]
+    nombres = columnas['continentes'] if nivel == 'Continente' else columnas['regiones']
+    agrupar = _grupos_numpy if columnas['numpy'] else _grupos_python
+
+    resultado = {nombre: {} for nombre in nombres}
+    for campo in fn.CAMPOS_NUMERICOS:
+        for codigo, (ordenados, inicio, cantidad, suma) in agrupar(codigos, columnas[campo]).items():
+            grupo = resultado[nombres[codigo]]
+            grupo['cantidad'] = cantidad
+            grupo[campo] = _estadisticas_campo(ordenados, inicio, cantidad, suma)
+
+    return resultado
+
+def ranking_densidad(columnas, cantidad=10, mayor_a_menor=True):
+    """
+    Devuelve los 'cantidad' países con mayor (o menor) densidad Población/Superficie.
+    Los países con superficie 0 se excluyen. Cada elemento es (Pais, densidad, Continente, Región).
+    """
+    poblacion, superficie = columnas['Poblacion'], columnas['Superficie']
+
+    if columnas['numpy']:
+        validos = np.flatnonzero(superficie > 0)
+        densidades = poblacion[validos] / superficie[validos]
+        # Orden estable: ante empates se respeta el orden de carga (igual que sorted)
+        orden = np.argsort(-densidades if mayor_a_menor else densidades, kind='stable')[:cantidad]
+        seleccion = [(int(validos[i]), float(densidades[i])) for i in orden]
+    else:
+        densidades = [(i, poblacion[i] / superficie[i]) for i in range(len(poblacion)) if superficie[i] > 0]
+        seleccion = sorted(densidades, key=lambda par: -par[1] if mayor_a_menor else par[1])[:cantidad]
+
+    regiones = columnas['regiones']
+    return [
+        (columnas['Pais'][i], densidad, *regiones[int(columnas['Region'][i])])
+        for i, densidad in seleccion
+    ]
+
+def mostrar_analisis(lista_global=None, cantidad_ranking=10):
+    """
+    Muestra el reporte de análisis: estadísticas por Continente y por Región
+    y el ranking de densidad de población.
+    """
+    columnas = cargar_columnas(lista_global)
+    if not columnas['Pais']:
+        print("No hay datos para analizar.")
+        return
+
+    motor = "NumPy" if columnas['numpy'] else "Python"
+    print(f"\n--- Análisis por Grupo ({len(columnas['Pais'])} países, motor: {motor}) ---")
+    if columnas['descartadas']:
+        print(f"({columnas['descartadas']} fila(s) con valores no numéricos fueron descartadas)")
+
+    for nivel, titulo in (('Continente', 'Continente'), ('Region', 'Región')):
+        print(f"\nPor {titulo}:")
+        print(f"{titulo:<25} {'Países':>7} {'Pob. media':>15} {'Pob. mediana':>15} {'Pob. p90':>15} {'Sup. mediana':>15}")
+        print("-" * 97)
+        for grupo, datos in resumen_por_grupo(columnas, nivel).items():
+            nombre = grupo if nivel == 'Continente' else "/".join(grupo)
+            pob, sup = datos['Poblacion'], datos['Superficie']
+            print(f"{nombre:<25} {datos['cantidad']:>7} {pob['media']:>15,.0f} {pob['mediana']:>15,.0f} "
+                  f"{pob['p90']:>15,.0f} {sup['mediana']:>15,.0f}")
+
+    print(f"\nTop {cantidad_ranking} por densidad (hab/km²):")
+    for posicion, (pais, densidad, continente, region) in enumerate(ranking_densidad(columnas, cantidad_ranking), 1):
+        print(f"{posicion:>3}. {pais:<20} {densidad:>12,.2f}  ({continente}/{region})")
+    print("-" * 30)
@@ -0,0 +1,665 @@
+import os
+import io
+import sys
+import csv
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+import contextlib
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import funciones as fn
+import consultas
+import comandos
+import servidor
+import almacenamiento
+import instantanea
+
+
+# Banco de Pruebas de Rendimiento
+#
+# Genera jerarquías sintéticas (continentes x regiones por continente x países por región),
+# ejecuta las operaciones principales en un directorio temporal y mide, por operación:
+# tiempo total, filas por segundo, percentiles de latencia y memoria pico (tracemalloc).
+# Los resultados se guardan en JSON para comparar corridas y detectar regresiones:
+#
+#   python benchmark.py ejecutar --escalas 4x5x100,6x8x1000 --backend csv --salida resultados.json
+#   python benchmark.py comparar base.json resultados.json --umbral 0.2
+#
+# 'estres' lanza varios procesos que escriben a la vez sobre las mismas regiones (altas,
+# modificaciones por log y lotes) y comprueba al final que no se haya perdido ninguna escritura:
+#
+#   python benchmark.py estres --procesos 8 --operaciones 200 --regiones 4
+#
+# 'servidor' compara la latencia de las peticiones al servidor residente (servidor.py) con la
+# de invocaciones en frío de la línea de comandos, que pagan el arranque y la lectura de disco:
+#
+#   python benchmark.py servidor --escala 6x8x2000 --peticiones 500 --clientes 16
+
+ESCALAS_POR_DEFECTO = "3x4x50,5x6x500,6x8x2000"
+REPETICIONES_POR_DEFECTO = 30      # Operaciones puntuales (modificar, eliminar) por escala
+PERCENTILES_LATENCIA = (50, 90, 99)
+UMBRAL_REGRESION = 0.2             # Una operación 20 % más lenta que la base se marca como regresión
+
+
+# Generador de Datos Sintéticos
+
+def interpretar_escala(texto):
+    """Convierte 'CxRxP' en la tupla (continentes, regiones por continente, países por región)."""
+    partes = texto.lower().split('x')
+    if len(partes) != 3 or not all(p.isdigit() and int(p) > 0 for p in partes):
+        raise ValueError(f"Escala inválida: {texto!r} (formato esperado: continentesxregionesxpaises)")
+    return tuple(int(p) for p in partes)
+
+def generar_dataset(ruta_csv, continentes, regiones_por_continente, paises_por_region, semilla=0):
+    """
+    Escribe un CSV de origen con el mismo formato que paises.csv.
+    Los nombres son únicos (País_<n>) y los valores numéricos se eligen con una semilla fija,
+    así dos corridas con los mismos parámetros miden exactamente los mismos datos.
+    Devuelve la cantidad de filas escritas.
+    """
+    aleatorio = random.Random(semilla)
+    filas = 0
+    with open(ruta_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Pais', 'Continente', 'Region', 'Poblacion', 'Superficie'])
+        for c in range(continentes):
+            for r in range(regiones_por_continente):
+                for _ in range(paises_por_region):
+                    writer.writerow([
+                        f"País_{filas}", f"Continente_{c}", f"Region_{c}_{r}",
+                        aleatorio.randint(1_000, 1_500_000_000), aleatorio.randint(1, 17_000_000)
+                    ])
+                    filas += 1
+    return filas
+
+
+# Medición
+
+def _percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores_ordenados:
+        return None
+    posicion = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[posicion]
+
+def _resumir(latencias, filas_por_repeticion, memoria_pico):
+    """Arma el resultado de una operación a partir de sus latencias (en segundos)."""
+    ordenadas = sorted(latencias)
+    total = sum(latencias)
+    filas = filas_por_repeticion * len(latencias)
+    resultado = {
+        'repeticiones': len(latencias),
+        'total_s': total,
+        'filas_por_s': filas / total if total > 0 else None,
+        'latencia_ms': {f"p{p}": _percentil(ordenadas, p) * 1000 for p in PERCENTILES_LATENCIA},
+        'memoria_pico_kb': memoria_pico / 1024,
+    }
+    resultado['latencia_ms']['min'] = ordenadas[0] * 1000
+    resultado['latencia_ms']['max'] = ordenadas[-1] * 1000
+    return resultado
+
+def medir(operacion, repeticiones=1, filas_por_repeticion=1, preparar=None):
+    """
+    Ejecuta 'operacion' varias veces midiendo cada latencia con perf_counter.
+    'preparar' (opcional) se llama antes de cada repetición, fuera del tiempo medido.
+    La memoria pico se mide aparte, en una ejecución adicional bajo tracemalloc,
+    para que el rastreo no distorsione los tiempos. La salida por pantalla se descarta.
+    """
+    latencias = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for repeticion in range(repeticiones + 1):
+            if preparar is not None:
+                preparar()
+            if repeticion == repeticiones:
+                tracemalloc.start()
+                operacion()
+                _, memoria_pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            else:
+                inicio = time.perf_counter()
+                operacion()
+                latencias.append(time.perf_counter() - inicio)
+    return _resumir(latencias, filas_por_repeticion, memoria_pico)
+
+
+# Escenario
+
+def ejecutar_escala(continentes, regiones, paises, repeticiones=REPETICIONES_POR_DEFECTO, semilla=0, backend='csv'):
+    """
+    Ejecuta todas las operaciones sobre una jerarquía sintética en un directorio temporal,
+    con un backend propio creado allí (nunca toca la base real). Devuelve {operación: resultado}.
+    El directorio de trabajo, BASE_DIR y el backend activo se restauran al terminar.
+    """
+    directorio_original = os.getcwd()
+    backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+    aleatorio = random.Random(semilla)
+    resultados = {}
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        try:
+            almacenamiento.configurar_backend(backend, os.path.join(temporal, 'paises.db') if backend == 'sqlite' else 'DB')
+            total = generar_dataset('origen.csv', continentes, regiones, paises, semilla)
+
+            # La importación borra y recrea la base: cada repetición parte de cero
+            resultados['importar'] = medir(lambda: fn.importar_datos_iniciales('origen.csv'), 3, total)
+            # Sincronizar con el mismo origen: se compara todo y no se reescribe ninguna región
+            resultados['sincronizar_sin_cambios'] = medir(lambda: fn.sincronizar_datos('origen.csv'), 3, total)
+
+            resultados['cargar'] = medir(fn.obtener_todos_los_datos, 5, total)
+            fn.obtener_todos_los_datos(usar_cache=True)
+            resultados['cargar_con_cache'] = medir(lambda: fn.obtener_todos_los_datos(usar_cache=True), 5, total)
+            if backend == 'csv':
+                # Arranque en frío con las instantáneas vigentes: sin caché en memoria, nada se parsea
+                instantanea.activar()
+                fn.obtener_todos_los_datos() # Escriben la instantánea de cada modo
+                fn.obtener_todos_los_datos(compacto=True)
+                resultados['cargar_instantanea'] = medir(fn.obtener_todos_los_datos, 5, total)
+                resultados['cargar_instantanea_compacta'] = medir(
+                    lambda: fn.obtener_todos_los_datos(compacto=True), 5, total)
+                instantanea.desactivar()
+                resultados['cargar_compacta'] = medir(lambda: fn.obtener_todos_los_datos(compacto=True), 5, total)
+
+            lista = fn.obtener_todos_los_datos()
+            condiciones_region = [('Continente', '=', 'continente_0'), ('Region', '=', 'region_0_0')]
+            condiciones_rango = [('Poblacion', 'entre', (100_000_000, 200_000_000))]
+            resultados['filtrar_particion_disco'] = medir(
+                lambda: fn.filtrar_desde_disco(condiciones_region), 10, paises)
+            resultados['filtrar_rango_recorrido'] = medir(
+                lambda: consultas.filtrar_por_recorrido(lista, condiciones_rango), 10, total)
+            indices = consultas.construir_indices_consulta(lista)
+            resultados['filtrar_rango_indexado'] = medir(
+                lambda: consultas.consultar(indices, condiciones_rango), 10, total)
+
+            resultados['ordenar'] = medir(
+                lambda: fn.obtener_orden(lista, 'Poblacion', True), 5, total, preparar=fn.invalidar_ordenes)
+            resultados['top_10'] = medir(
+                lambda: fn.top_n(lista, 'Poblacion', 10), 5, total, preparar=fn.invalidar_ordenes)
+
+            resultados['estadisticas_resumenes'] = medir(fn.estadisticas_desde_resumenes, 10, total)
+            resultados['estadisticas_en_memoria'] = medir(lambda: fn.calcular_estadisticas(lista), 5, total)
+
+            # Modificaciones y bajas puntuales sobre países elegidos al azar (como las del menú)
+            elegidos = aleatorio.sample(lista, min(len(lista), 2 * repeticiones + 2))
+            pendientes = iter(elegidos)
+
+            def modificar():
+                item = next(pendientes)
+                anterior = (item['Pais'], item['Poblacion'], item['Superficie'])
+                item['Poblacion'] = str(aleatorio.randint(1_000, 1_500_000_000))
+                fn.registrar_cambio(item['Continente'], item['Region'], 'U', anterior,
+                                    (item['Pais'], item['Poblacion'], item['Superficie']))
+
+            def eliminar():
+                item = next(pendientes)
+                fn.registrar_cambio(item['Continente'], item['Region'], 'D',
+                                    (item['Pais'], item['Poblacion'], item['Superficie']))
+
+            cantidad = (len(elegidos) - 2) // 2
+            resultados['modificar'] = medir(modificar, cantidad)
+            resultados['eliminar'] = medir(eliminar, cantidad)
+
+            # Las mismas modificaciones agrupadas en un lote (una escritura por región afectada)
+            nombres = [item['Pais'] for item in aleatorio.sample(fn.obtener_todos_los_datos(), cantidad)]
+            lote = [{'op': 'modificar', 'pais': nombre, 'poblacion': aleatorio.randint(1_000, 1_500_000_000)}
+                    for nombre in nombres]
+            resultados['lote_modificar'] = medir(lambda: comandos.aplicar_lote(lote), 3, len(lote))
+        finally:
+            if isinstance(fn.BACKEND, almacenamiento.BackendSQLite):
+                fn.BACKEND.cerrar()
+            instantanea.desactivar()
+            fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+            os.chdir(directorio_original)
+            fn.invalidar_cache()
+            fn.invalidar_ordenes()
+
+    return resultados
+
+def ejecutar(escalas, repeticiones=REPETICIONES_POR_DEFECTO, semilla=0, backend='csv'):
+    """Ejecuta todas las escalas y devuelve el documento de resultados (serializable a JSON)."""
+    documento = {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'backend': backend,
+        'semilla': semilla,
+        'escalas': {},
+    }
+    for texto in escalas:
+        continentes, regiones, paises = interpretar_escala(texto)
+        filas = continentes * regiones * paises
+        print(f"Escala {texto} ({filas} países)...")
+        documento['escalas'][texto] = {
+            'filas': filas,
+            'operaciones': ejecutar_escala(continentes, regiones, paises, repeticiones, semilla, backend),
+        }
+    return documento
+
+def mostrar_resultados(documento):
+    """Imprime una tabla por escala con el rendimiento de cada operación."""
+    for escala, datos in documento['escalas'].items():
+        print(f"\n--- Escala {escala} ({datos['filas']} países, backend: {documento['backend']}) ---")
+        print(f"{'Operación':<26} {'Rep.':>5} {'Filas/s':>14} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'Pico KB':>10}")
+        print("-" * 90)
+        for nombre, r in datos['operaciones'].items():
+            filas_s = f"{r['filas_por_s']:,.0f}" if r['filas_por_s'] is not None else "-"
+            lat = r['latencia_ms']
+            print(f"{nombre:<26} {r['repeticiones']:>5} {filas_s:>14} {lat['p50']:>10.3f} "
+                  f"{lat['p90']:>10.3f} {lat['p99']:>10.3f} {r['memoria_pico_kb']:>10,.0f}")
+
+def comparar(base, actual, umbral=UMBRAL_REGRESION):
+    """
+    Compara la latencia p50 de cada operación presente en ambos documentos.
+    Imprime la variación y devuelve la lista de regresiones (escala, operación, cociente).
+    """
+    regresiones = []
+    for escala, datos in actual['escalas'].items():
+        anteriores = base['escalas'].get(escala)
+        if anteriores is None:
+            continue
+        print(f"\n--- Escala {escala} ---")
+        for nombre, r in datos['operaciones'].items():
+            previo = anteriores['operaciones'].get(nombre)
+            if previo is None or not previo['latencia_ms']['p50']:
+                continue
+            cociente = r['latencia_ms']['p50'] / previo['latencia_ms']['p50']
+            marca = ""
+            if cociente > 1 + umbral:
+                marca = "  <-- REGRESIÓN"
+                regresiones.append((escala, nombre, cociente))
+            print(f"{nombre:<26} {previo['latencia_ms']['p50']:>10.3f} -> {r['latencia_ms']['p50']:>10.3f} ms "
+                  f"(x{cociente:.2f}){marca}")
+    print(f"\nRegresiones (más de {umbral:.0%} más lento): {len(regresiones)}")
+    return regresiones
+
+
+# Prueba de Estrés con Escritores Concurrentes
+
+CONTINENTE_ESTRES = "Estres"
+
+def _trabajador_estres(numero, directorio, backend, operaciones, regiones, bloquear):
+    """
+    Escritor de la prueba de estrés (se ejecuta en un proceso propio).
+    Da de alta países con nombres únicos (W<numero>_<j>) repartidos en las regiones y, cada
+    tanto, modifica uno de sus países anteriores por el registro de cambios o por un lote.
+    Devuelve {nombre: (Poblacion, Superficie)} con los valores que deberían quedar en disco.
+    """
+    # BASE_DIR relativo, como en el programa: la jerarquía se deduce de la ruta 'DB/<continente>/<región>'
+    os.chdir(directorio)
+    almacenamiento.configurar_backend(backend, 'DB')
+    fn.BLOQUEAR_REGIONES = bloquear
+    aleatorio = random.Random(numero)
+    esperado = {}
+    propios = {}   # Región -> nombres dados de alta por este proceso
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for j in range(operaciones):
+            region = f"Region_{(numero + j) % regiones}"
+            poblacion = aleatorio.randint(1_000, 1_500_000_000)
+            superficie = aleatorio.randint(1, 17_000_000)
+            nombres = propios.setdefault(region, [])
+
+            if nombres and j % 3 == 1:
+                previo = aleatorio.choice(nombres)
+                anterior = (previo, *esperado[previo])
+                fn.registrar_cambio(CONTINENTE_ESTRES, region, 'U', anterior, (previo, poblacion, anterior[2]))
+                esperado[previo] = (poblacion, anterior[2])
+            elif nombres and j % 3 == 2:
+                previo = aleatorio.choice(nombres)
+                lista = fn.obtener_datos_filtrados(CONTINENTE_ESTRES, region)
+                # Dos operaciones sobre la región: el lote la relee y la reescribe (uno suelto iría al log)
+                operaciones = [{'op': 'modificar', 'pais': previo, 'poblacion': poblacion},
+                               {'op': 'modificar', 'pais': previo, 'superficie': superficie}]
+                comandos.aplicar_lote(operaciones, lista, fn.construir_indice(lista))
+                esperado[previo] = (poblacion, superficie)
+            else:
+                nombre = f"W{numero}_{j}"
+                fn.alta_item(CONTINENTE_ESTRES, region, nombre, poblacion, superficie)
+                esperado[nombre] = (poblacion, superficie)
+                nombres.append(nombre)
+    return esperado
+
+def ejecutar_estres(procesos, operaciones, regiones, backend='csv', bloquear=True):
+    """
+    Ejecuta la prueba de estrés en un directorio temporal y verifica el resultado final.
+    Devuelve {'operaciones', 'segundos', 'ops_por_segundo', 'perdidas', 'duplicados'}: una
+    escritura perdida es un país ausente o con valores distintos de los que escribió su proceso.
+    """
+    directorio_original = os.getcwd()
+    backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+    with tempfile.TemporaryDirectory() as temporal:
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = [pool.submit(_trabajador_estres, numero, temporal, backend, operaciones, regiones, bloquear)
+                       for numero in range(procesos)]
+            esperado = {}
+            for futuro in futuros:
+                esperado.update(futuro.result())
+        segundos = time.perf_counter() - inicio
+
+        os.chdir(temporal)
+        try:
+            almacenamiento.configurar_backend(backend, 'DB')
+            finales = {}
+            duplicados = 0
+            for item in fn.obtener_datos_filtrados(CONTINENTE_ESTRES):
+                if item['Pais'] in finales:
+                    duplicados += 1
+                finales[item['Pais']] = (int(item['Poblacion']), int(item['Superficie']))
+        finally:
+            fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+            os.chdir(directorio_original)
+            fn.invalidar_cache()
+
+    perdidas = sum(1 for nombre, valores in esperado.items() if finales.get(nombre) != valores)
+    total = procesos * operaciones
+    return {'operaciones': total, 'segundos': segundos, 'ops_por_segundo': total / segundos if segundos else 0.0,
+            'perdidas': perdidas, 'duplicados': duplicados}
+
+
+# Servidor Residente contra Invocaciones en Frío
+
+REPETICIONES_CLI = 10   # Invocaciones en frío de la línea de comandos por consulta
+
+def _medir_peticiones(cliente, generar_peticion, cantidad):
+    """Envía 'cantidad' peticiones por una conexión abierta y devuelve sus latencias (segundos)."""
+    latencias = []
+    for _ in range(cantidad):
+        peticion = generar_peticion()
+        inicio = time.perf_counter()
+        respuesta = cliente.pedir(peticion)
+        latencias.append(time.perf_counter() - inicio)
+        if not respuesta.get('ok'):
+            raise RuntimeError(f"El servidor respondió con error: {respuesta.get('error')}")
+    return latencias
+
+def _medir_clientes_concurrentes(ruta_socket, generar_peticion, clientes, cantidad):
+    """
+    Lanza 'clientes' hilos, cada uno con su conexión, que envían 'cantidad' peticiones a la vez.
+    Devuelve (latencias de todas las peticiones, segundos totales).
+    """
+    latencias = []
+    errores = []
+    cerrojo = threading.Lock()
+
+    def trabajar():
+        try:
+            with servidor.Cliente(ruta_socket) as cliente:
+                propias = _medir_peticiones(cliente, generar_peticion, cantidad)
+            with cerrojo:
+                latencias.extend(propias)
+        except (OSError, RuntimeError) as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(clientes)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    if errores:
+        raise RuntimeError(f"Falló un cliente concurrente: {errores[0]}")
+    return latencias, segundos
+
+def _medir_cli(argumentos, repeticiones, directorio):
+    """Ejecuta comandos.py en un proceso nuevo 'repeticiones' veces y devuelve las latencias."""
+    comando = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'comandos.py'), *argumentos]
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=directorio, stdout=subprocess.DEVNULL, check=True)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+def ejecutar_servidor(continentes, regiones, paises, peticiones=REPETICIONES_POR_DEFECTO * 10,
+                      clientes=8, repeticiones_cli=REPETICIONES_CLI, semilla=0):
+    """
+    Importa una jerarquía sintética en un directorio temporal, lanza servidor.py sobre ella y mide:
+    - cada tipo de petición por una conexión persistente (servidor_*),
+    - búsquedas desde varios clientes a la vez (servidor_concurrente; filas/s = peticiones/s),
+    - las mismas consultas como invocaciones en frío de comandos.py (cli_frio_*).
+    Devuelve {operación: resultado}, con el mismo formato que ejecutar_escala.
+    """
+    directorio_original = os.getcwd()
+    backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+    aleatorio = random.Random(semilla)
+    resultados = {}
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        proceso = None
+        try:
+            almacenamiento.configurar_backend('csv', 'DB')
+            total = generar_dataset('origen.csv', continentes, regiones, paises, semilla)
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn.importar_datos_iniciales('origen.csv')
+
+            ruta_socket = os.path.join(temporal, servidor.RUTA_SOCKET_POR_DEFECTO)
+            entorno = dict(os.environ, PAISES_BACKEND='csv')
+            entorno.pop('PAISES_DB', None)
+            proceso = subprocess.Popen(
+                [sys.executable, os.path.abspath(servidor.__file__), '--socket', ruta_socket, 'iniciar'],
+                cwd=temporal, env=entorno, stdout=subprocess.DEVNULL)
+            if not servidor.esperar_servidor(ruta_socket):
+                raise RuntimeError("El servidor no respondió a tiempo.")
+
+            rango = [100_000_000, 200_000_000]
+            tipos = {
+                'buscar': lambda: {'op': 'buscar', 'pais': f"País_{aleatorio.randrange(total)}"},
+                'filtrar_region': lambda: {'op': 'filtrar', 'condiciones': [
+                    ['Continente', '=', 'Continente_0'], ['Region', '=', 'Region_0_0']]},
+                'filtrar_rango': lambda: {'op': 'filtrar', 'limite': 0,
+                                          'condiciones': [['Poblacion', 'entre', rango]]},
+                'top_10': lambda: {'op': 'ordenar', 'campo': 'Poblacion', 'descendente': True, 'cantidad': 10},
+                'estadisticas': lambda: {'op': 'estadisticas'},
+            }
+            with servidor.Cliente(ruta_socket) as cliente:
+                for nombre, generar_peticion in tipos.items():
+                    resultados[f'servidor_{nombre}'] = _resumir(
+                        _medir_peticiones(cliente, generar_peticion, peticiones), 1, 0)
+
+            latencias, segundos = _medir_clientes_concurrentes(ruta_socket, tipos['buscar'], clientes, peticiones)
+            resultados['servidor_concurrente'] = _resumir(latencias, 1, 0)
+            resultados['servidor_concurrente']['total_s'] = segundos
+            resultados['servidor_concurrente']['filas_por_s'] = len(latencias) / segundos if segundos else None
+
+            consultas_cli = {
+                'cli_frio_filtrar_region': ['consultar', '--continente', 'Continente_0',
+                                            '--region', 'Region_0_0', '--formato', 'csv'],
+                'cli_frio_filtrar_rango': ['consultar', '--poblacion-min', str(rango[0]),
+                                           '--poblacion-max', str(rango[1]), '--formato', 'csv'],
+                'cli_frio_estadisticas': ['estadisticas'],
+            }
+            for nombre, argumentos in consultas_cli.items():
+                resultados[nombre] = _resumir(_medir_cli(argumentos, repeticiones_cli, temporal), 1, 0)
+        finally:
+            if proceso is not None:
+                try:
+                    servidor.pedir({'op': 'detener'}, ruta_socket)
+                except OSError:
+                    proceso.terminate()
+                proceso.wait(timeout=30)
+            fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+            os.chdir(directorio_original)
+            fn.invalidar_cache()
+            fn.invalidar_ordenes()
+
+    return resultados
+
+
+# Fragmentación de una región grande
+
+def ejecutar_fragmentos(paises, tam_fragmento=fn.TAM_MAXIMO_FRAGMENTO, repeticiones=REPETICIONES_POR_DEFECTO,
+                        trabajadores=None, semilla=0):
+    """
+    Importa una única región con 'paises' filas dos veces, sin fragmentar y con fragmentos de
+    'tam_fragmento' bytes, y mide en cada caso la carga secuencial, la carga en paralelo
+    (un pool de procesos) y un lote de una modificación, que reescribe el archivo afectado.
+    Devuelve {configuración: {operación: resultado}}.
+    """
+    directorio_original = os.getcwd()
+    backend_original, base_original, tam_original = fn.BACKEND, fn.BASE_DIR, fn.TAM_MAXIMO_FRAGMENTO
+    trabajadores = trabajadores or os.cpu_count() or 1
+    configuraciones = {}
+
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        try:
+            almacenamiento.configurar_backend('csv', 'DB')
+            total = generar_dataset('origen.csv', 1, 1, paises, semilla)
+            for etiqueta, tam in (('sin_fragmentar', 0), (f'fragmentos_{tam_fragmento // 1024}k', tam_fragmento)):
+                fn.TAM_MAXIMO_FRAGMENTO = tam
+                aleatorio = random.Random(semilla)
+                resultados = {}
+                resultados['importar'] = medir(lambda: fn.importar_datos_iniciales('origen.csv'), 1, total)
+                resultados['cargar'] = medir(fn.obtener_todos_los_datos, 3, total)
+                resultados['cargar_paralelo'] = medir(
+                    lambda: fn.obtener_todos_los_datos(trabajadores, usar_procesos=True), 3, total)
+
+                nombres = [item['Pais'] for item in aleatorio.sample(fn.obtener_todos_los_datos(), repeticiones)]
+                pendientes = iter(nombres)
+                resultados['lote_modificar_uno'] = medir(lambda: comandos.aplicar_lote(
+                    [{'op': 'modificar', 'pais': next(pendientes), 'poblacion': aleatorio.randint(1_000, 1_500_000_000)}]),
+                    repeticiones - 1)
+
+                ruta_region = fn.obtener_ruta_csv("Continente_0", "Region_0_0")[0]
+                configuraciones[etiqueta] = {'filas': total, 'archivos': len(fn.archivos_de_datos(ruta_region)),
+                                             'operaciones': resultados}
+        finally:
+            fn.BACKEND, fn.BASE_DIR, fn.TAM_MAXIMO_FRAGMENTO = backend_original, base_original, tam_original
+            os.chdir(directorio_original)
+            fn.invalidar_cache()
+            fn.invalidar_ordenes()
+
+    return configuraciones
+
+
+def main(argumentos=None):
+    """Línea de comandos del banco de pruebas."""
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento sobre datos sintéticos.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_ejecutar = sub.add_parser('ejecutar', help="Mide las operaciones en varias escalas")
+    p_ejecutar.add_argument('--escalas', default=ESCALAS_POR_DEFECTO,
+                            help="Lista separada por comas de continentesxregionesxpaises")
+    p_ejecutar.add_argument('--repeticiones', type=int, default=REPETICIONES_POR_DEFECTO)
+    p_ejecutar.add_argument('--semilla', type=int, default=0)
+    p_ejecutar.add_argument('--backend', choices=almacenamiento.BACKENDS, default='csv')
+    p_ejecutar.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+
+    p_generar = sub.add_parser('generar', help="Solo escribe un CSV de origen sintético")
+    p_generar.add_argument('escala')
+    p_generar.add_argument('--salida', default='sintetico.csv')
+    p_generar.add_argument('--semilla', type=int, default=0)
+
+    p_comparar = sub.add_parser('comparar', help="Compara dos archivos de resultados")
+    p_comparar.add_argument('base')
+    p_comparar.add_argument('actual')
+    p_comparar.add_argument('--umbral', type=float, default=UMBRAL_REGRESION)
+
+    p_estres = sub.add_parser('estres', help="Escritores concurrentes en varios procesos; verifica que no se pierdan escrituras")
+    p_estres.add_argument('--procesos', type=int, default=8)
+    p_estres.add_argument('--operaciones', type=int, default=200, help="Operaciones por proceso")
+    p_estres.add_argument('--regiones', type=int, default=4)
+    p_estres.add_argument('--backend', choices=('csv', 'binario'), default='csv')
+    p_estres.add_argument('--sin-bloqueos', action='store_true', help="Desactiva los bloqueos por región (para comparar)")
+
+    p_servidor = sub.add_parser('servidor', help="Latencia del servidor residente frente a la línea de comandos en frío")
+    p_servidor.add_argument('--escala', default="6x8x2000")
+    p_servidor.add_argument('--peticiones', type=int, default=REPETICIONES_POR_DEFECTO * 10,
+                            help="Peticiones por tipo (y por cliente en la prueba concurrente)")
+    p_servidor.add_argument('--clientes', type=int, default=8)
+    p_servidor.add_argument('--repeticiones-cli', type=int, default=REPETICIONES_CLI)
+    p_servidor.add_argument('--semilla', type=int, default=0)
+    p_servidor.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+
+    p_fragmentos = sub.add_parser('fragmentos', help="Una región grande sin fragmentar y fragmentada")
+    p_fragmentos.add_argument('--paises', type=int, default=200_000)
+    p_fragmentos.add_argument('--tam-fragmento', type=int, default=fn.TAM_MAXIMO_FRAGMENTO,
+                              help="Tamaño máximo de cada fragmento en bytes")
+    p_fragmentos.add_argument('--repeticiones', type=int, default=REPETICIONES_POR_DEFECTO)
+    p_fragmentos.add_argument('--trabajadores', type=int, default=None, help="Procesos de la carga en paralelo")
+    p_fragmentos.add_argument('--semilla', type=int, default=0)
+    p_fragmentos.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+
+    args = parser.parse_args(argumentos)
+
+    if args.comando == 'estres':
+        if min(args.procesos, args.operaciones, args.regiones) < 1:
+            parser.error("procesos, operaciones y regiones deben ser mayores que cero.")
+        r = ejecutar_estres(args.procesos, args.operaciones, args.regiones, args.backend, not args.sin_bloqueos)
+        print(f"{r['operaciones']} operaciones en {r['segundos']:.2f} s ({r['ops_por_segundo']:,.0f} ops/s) "
+              f"con {args.procesos} procesos sobre {args.regiones} regiones.")
+        print(f"Escrituras perdidas: {r['perdidas']}. Países duplicados: {r['duplicados']}.")
+        return 1 if r['perdidas'] or r['duplicados'] else 0
+
+    try:
+        if args.comando == 'generar':
+            filas = generar_dataset(args.salida, *interpretar_escala(args.escala), semilla=args.semilla)
+            print(f"{filas} países escritos en {args.salida}.")
+            return 0
+
+        if args.comando == 'comparar':
+            with open(args.base, encoding='utf-8') as f:
+                base = json.load(f)
+            with open(args.actual, encoding='utf-8') as f:
+                actual = json.load(f)
+            return 1 if comparar(base, actual, args.umbral) else 0
+
+        if args.comando == 'fragmentos':
+            if min(args.paises, args.tam_fragmento, args.repeticiones) < 2:
+                raise ValueError("paises, tam-fragmento y repeticiones deben ser mayores que uno.")
+            print(f"Región de {args.paises} países, sin fragmentar y con fragmentos de {args.tam_fragmento} bytes...")
+            configuraciones = ejecutar_fragmentos(args.paises, args.tam_fragmento, args.repeticiones,
+                                                  args.trabajadores, args.semilla)
+            documento = {
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'backend': 'csv',
+                'semilla': args.semilla,
+                'escalas': configuraciones,
+            }
+            for etiqueta, datos in configuraciones.items():
+                print(f"{etiqueta}: {datos['archivos']} archivo(s) de datos.")
+        elif args.comando == 'servidor':
+            continentes, regiones, paises = interpretar_escala(args.escala)
+            if min(args.peticiones, args.clientes, args.repeticiones_cli) < 1:
+                raise ValueError("peticiones, clientes y repeticiones-cli deben ser mayores que cero.")
+            print(f"Escala {args.escala} ({continentes * regiones * paises} países), servidor contra CLI en frío...")
+            documento = {
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'backend': 'servidor (csv)',
+                'semilla': args.semilla,
+                'escalas': {args.escala: {
+                    'filas': continentes * regiones * paises,
+                    'operaciones': ejecutar_servidor(continentes, regiones, paises, args.peticiones,
+                                                     args.clientes, args.repeticiones_cli, args.semilla),
+                }},
+            }
+        else:
+            escalas = [e.strip() for e in args.escalas.split(',') if e.strip()]
+            documento = ejecutar(escalas, args.repeticiones, args.semilla, args.backend)
+    except ValueError as e:
+        parser.error(str(e))
+
+    mostrar_resultados(documento)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(documento, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+import os
+import sys
+import mmap
+import struct
+import argparse
+
+import funciones as fn
+
+
+# Formato Binario de Región (Datos.bin)
+#
+# Alternativa de ancho fijo al Datos.csv de una región, pensada para leerse con mmap:
+#
+#   cabecera  mágico (8 bytes), versión, largo máximo del nombre, registros, borrados
+#   registro  estado (1 = vigente, 0 = borrado), largo del nombre en bytes,
+#             nombre UTF-8 (rellenado con ceros), población int64, superficie int64
+#
+# Al ser de ancho fijo, el registro i empieza en CABECERA.size + i * REGISTRO.size: una
+# modificación se escribe en su lugar y una baja solo apaga el byte de estado (marca de borrado).
+# Cuando los borrados superan FRACCION_COMPACTACION de los registros, la región se reescribe.
+# Solo cuenta la cantidad de registros de la cabecera: bytes sobrantes al final se ignoran.
+
+MAGICO = b'PAISBIN\x00'
+VERSION = 1
+LARGO_NOMBRE = 62                      # Bytes UTF-8; con él cada registro ocupa 80 bytes
+NOMBRE_ARCHIVO = "Datos.bin"
+MINIMO_BORRADOS_COMPACTACION = 64      # Por debajo de esta cantidad de borrados nunca se compacta
+
+CABECERA = struct.Struct('<8sHHII')
+REGISTRO = struct.Struct(f'<BB{LARGO_NOMBRE}sqq')
+# Misma disposición que REGISTRO, pero salteando el nombre: para recorrer solo las columnas numéricas
+NUMERICO = struct.Struct(f'<B{1 + LARGO_NOMBRE}xqq')
+
+VIGENTE = 1
+BORRADO = 0
+
+
+def obtener_ruta_binario(continente, region, base_dir=None):
+    """Devuelve la ruta del Datos.bin de la región (BASE_DIR/continente/region/Datos.bin, un nivel por parte de la Región)."""
+    return os.path.join(base_dir or fn.BASE_DIR, continente, *fn.niveles_region(region), NOMBRE_ARCHIVO)
+
+def _a_entero_exacto(valor, campo):
+    """
+    Convierte el valor a int exigiendo que su texto sea exactamente el del número,
+    para que la conversión CSV -> binario -> CSV devuelva el mismo archivo.
+    """
+    try:
+        numero = int(valor)
+    except (ValueError, TypeError):
+        raise ValueError(f"{campo} no numérico: {valor!r}") from None
+    if str(numero) != str(valor):
+        raise ValueError(f"{campo} no se puede representar sin pérdida: {valor!r}")
+    return numero
+
+def empaquetar_registro(pais, poblacion, superficie):
+    """Devuelve los bytes de un registro vigente. Lanza ValueError si no entra en el formato."""
+    nombre = pais.encode('utf-8')
+    if len(nombre) > LARGO_NOMBRE:
+        raise ValueError(f"El nombre '{pais}' supera los {LARGO_NOMBRE} bytes del formato binario")
+    try:
+        return REGISTRO.pack(
+            VIGENTE, len(nombre), nombre,
+            _a_entero_exacto(poblacion, 'Poblacion'), _a_entero_exacto(superficie, 'Superficie')
+        )
+    except struct.error:
+        raise ValueError(f"Valores fuera del rango int64 para '{pais}'") from None
+
+def _leer_cabecera(datos):
+    """Valida la cabecera y devuelve (registros, borrados)."""
+    if len(datos) < CABECERA.size:
+        raise ValueError("Archivo binario truncado")
+    magico, version, largo_nombre, registros, borrados = CABECERA.unpack_from(datos, 0)
+    if magico != MAGICO or version != VERSION or largo_nombre != LARGO_NOMBRE:
+        raise ValueError("Formato binario no reconocido")
+    return registros, borrados
+
+def _limites_registros(mm):
+    """Devuelve (inicio, fin) de los registros válidos según la cabecera."""
+    registros, _ = _leer_cabecera(mm)
+    fin = CABECERA.size + registros * REGISTRO.size
+    if len(mm) < fin:
+        raise ValueError("Archivo binario truncado")
+    return CABECERA.size, fin
+
+def _bloqueo(ruta_bin, exclusivo=True):
+    """Bloqueo de la región del archivo (el mismo Datos.lock que usa el árbol CSV)."""
+    return fn.bloquear_directorio(os.path.dirname(ruta_bin), exclusivo)
+
+def escribir_region(ruta_bin, filas):
+    """
+    Escribe la región completa a partir de tuplas (Pais, Poblacion, Superficie).
+    Empaqueta todas las filas antes de abrir el archivo (un error no deja nada a medio escribir)
+    y usa un temporal + os.replace, igual que la reescritura atómica del Datos.csv.
+    """
+    _escribir_cuerpo(ruta_bin, b''.join(empaquetar_registro(*fila) for fila in filas))
+
+def escribir_regiones(filas_por_ruta):
+    """
+    Escribe varias regiones completas ({ruta_bin: filas}).
+    Empaqueta todas antes de tocar ningún archivo: un valor inválido no deja ninguna región escrita.
+    Cada región se reemplaza de forma atómica, pero no hay transacción entre archivos: si el
+    proceso muere a mitad, unas regiones quedan con el contenido nuevo y otras con el anterior.
+    """
+    cuerpos = {ruta_bin: b''.join(empaquetar_registro(*fila) for fila in filas)
+               for ruta_bin, filas in filas_por_ruta.items()}
+    for ruta_bin, cuerpo in cuerpos.items():
+        _escribir_cuerpo(ruta_bin, cuerpo)
+
+def _escribir_cuerpo(ruta_bin, cuerpo):
+    """Reemplaza la región por los registros ya empaquetados (temporal + os.replace)."""
+    cantidad = len(cuerpo) // REGISTRO.size
+
+    os.makedirs(os.path.dirname(ruta_bin), exist_ok=True)
+    ruta_temporal = ruta_bin + ".tmp"
+    with _bloqueo(ruta_bin):
+        with open(ruta_temporal, 'wb') as f:
+            f.write(CABECERA.pack(MAGICO, VERSION, LARGO_NOMBRE, cantidad, 0))
+            f.write(cuerpo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(ruta_temporal, ruta_bin)
+
+def anexar_registros(ruta_bin, filas):
+    """
+    Agrega registros al final de la región (la crea si no existe).
+    Primero se escriben los registros y después la cantidad en la cabecera: si el proceso se
+    interrumpe entre ambos pasos, los bytes nuevos quedan fuera de la cuenta y se ignoran.
+    """
+    cuerpo = b''.join(empaquetar_registro(*fila) for fila in filas)
+    os.makedirs(os.path.dirname(ruta_bin), exist_ok=True)
+
+    with _bloqueo(ruta_bin):
+        if not os.path.exists(ruta_bin):
+            escribir_region(ruta_bin, [])
+        _anexar_al_final(ruta_bin, cuerpo)
+
+def _anexar_al_final(ruta_bin, cuerpo):
+    """Escribe los registros ya empaquetados a continuación del último y actualiza la cabecera."""
+    with open(ruta_bin, 'r+b') as f:
+        registros, borrados = _leer_cabecera(f.read(CABECERA.size))
+        f.seek(CABECERA.size + registros * REGISTRO.size)
+        f.write(cuerpo)
+        f.truncate()
+        f.seek(0)
+        f.write(CABECERA.pack(MAGICO, VERSION, LARGO_NOMBRE, registros + len(cuerpo) // REGISTRO.size, borrados))
+
+def leer_region(ruta_bin):
+    """Devuelve las tuplas (Pais, Poblacion, Superficie) vigentes, en orden de archivo."""
+    with _bloqueo(ruta_bin, exclusivo=False), open(ruta_bin, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        inicio, fin = _limites_registros(mm)
+        # La vista de memoria recorre el mapa sin copiar el archivo
+        with memoryview(mm)[inicio:fin] as porcion:
+            return [
+                (nombre[:largo].decode('utf-8'), poblacion, superficie)
+                for estado, largo, nombre, poblacion, superficie in REGISTRO.iter_unpack(porcion)
+                if estado == VIGENTE
+            ]
+
+def columnas_numericas(ruta_bin):
+    """
+    Devuelve (poblaciones, superficies) de los registros vigentes sin decodificar los nombres:
+    los enteros se leen directamente del mapa de memoria, sin parsear texto.
+    """
+    poblaciones, superficies = [], []
+    with _bloqueo(ruta_bin, exclusivo=False), open(ruta_bin, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        inicio, fin = _limites_registros(mm)
+        with memoryview(mm)[inicio:fin] as porcion:
+            for estado, poblacion, superficie in NUMERICO.iter_unpack(porcion):
+                if estado == VIGENTE:
+                    poblaciones.append(poblacion)
+                    superficies.append(superficie)
+    return poblaciones, superficies
+
+def _buscar_registro(mm, registros, anterior):
+    """Posición del primer registro vigente con los valores 'anterior' (mismo criterio que el log CSV)."""
+    buscado = empaquetar_registro(*anterior)
+    fin = CABECERA.size + registros * REGISTRO.size
+    desde = mm.find(buscado, CABECERA.size, fin)
+    while desde != -1:
+        # Solo vale una coincidencia alineada al inicio de un registro
+        posicion, resto = divmod(desde - CABECERA.size, REGISTRO.size)
+        if resto == 0:
+            return posicion
+        desde = mm.find(buscado, desde + 1, fin)
+    return None
+
+def actualizar_registro(ruta_bin, anterior, nuevo):
+    """
+    Reemplaza en su lugar el primer registro con los valores 'anterior' por 'nuevo'.
+    Solo se escriben los bytes de ese registro. Devuelve False si no se encontró.
+    """
+    bytes_nuevos = empaquetar_registro(*nuevo)
+    with _bloqueo(ruta_bin), open(ruta_bin, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+        registros, _ = _leer_cabecera(mm)
+        posicion = _buscar_registro(mm, registros, anterior)
+        if posicion is None:
+            return False
+        desde = CABECERA.size + posicion * REGISTRO.size
+        mm[desde:desde + REGISTRO.size] = bytes_nuevos
+        mm.flush()
+    return True
+
+def borrar_registro(ruta_bin, anterior):
+    """
+    Marca como borrado el primer registro con los valores 'anterior' (apaga su byte de estado)
+    y compacta la región si los borrados superan el umbral. Devuelve False si no se encontró.
+    """
+    with _bloqueo(ruta_bin):
+        with open(ruta_bin, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+            registros, borrados = _leer_cabecera(mm)
+            posicion = _buscar_registro(mm, registros, anterior)
+            if posicion is None:
+                return False
+            mm[CABECERA.size + posicion * REGISTRO.size] = BORRADO
+            borrados += 1
+            mm[:CABECERA.size] = CABECERA.pack(MAGICO, VERSION, LARGO_NOMBRE, registros, borrados)
+            mm.flush()
+
+        if borrados >= max(MINIMO_BORRADOS_COMPACTACION, registros * fn.FRACCION_COMPACTACION):
+            compactar_region(ruta_bin)
+    return True
+
+def compactar_region(ruta_bin):
+    """Reescribe la región sin los registros borrados."""
+    with _bloqueo(ruta_bin):
+        escribir_region(ruta_bin, leer_region(ruta_bin))
+
+
+# Conversión entre Datos.csv y Datos.bin
+
+def csv_a_binario(ruta_csv, ruta_bin=None):
+    """
+    Convierte la región de ruta_csv (todos sus fragmentos, con los registros de cambios aplicados)
+    en un único Datos.bin: el formato binario no se fragmenta porque modifica en el lugar.
+    Lanza ValueError, sin escribir nada, si alguna fila no se puede representar sin pérdida.
+    Devuelve la cantidad de registros escritos.
+    """
+    ruta_bin = ruta_bin or os.path.join(os.path.dirname(ruta_csv), NOMBRE_ARCHIVO)
+    items = fn.leer_directorio_region(os.path.dirname(ruta_csv))
+    escribir_region(ruta_bin, [(item['Pais'], item['Poblacion'], item['Superficie']) for item in items])
+    return len(items)
+
+def binario_a_csv(ruta_bin, ruta_csv=None):
+    """
+    Convierte un Datos.bin en los archivos de datos CSV de su región (escritura atómica, fragmentada
+    si corresponde) y descarta los registros de cambios previos, que correspondían al CSV anterior.
+    Devuelve la cantidad de filas.
+    """
+    ruta_directorio = os.path.dirname(ruta_csv or ruta_bin)
+    filas = leer_region(ruta_bin)
+    with fn.bloquear_directorio(ruta_directorio):
+        fn.escribir_directorio_region(ruta_directorio, [dict(zip(fn.HEADERS, fila)) for fila in filas])
+    return len(filas)
+
+def convertir_arbol(base_dir, hacia_binario=True):
+    """
+    Convierte todas las regiones del árbol en un sentido u otro, dejando el formato de origen intacto.
+    Las regiones que no se pueden convertir sin pérdida se informan y se omiten.
+    Devuelve (regiones convertidas, regiones omitidas).
+    """
+    convertidas, omitidas = 0, 0
+    for directorio, _, archivos in os.walk(base_dir):
+        # Una región CSV puede estar fragmentada: se convierte su directorio completo
+        if hacia_binario and fn.archivos_de_datos(directorio, set(archivos)):
+            ruta = os.path.join(directorio, "Datos.csv")
+        elif not hacia_binario and NOMBRE_ARCHIVO in archivos:
+            ruta = os.path.join(directorio, NOMBRE_ARCHIVO)
+        else:
+            continue
+        try:
+            cantidad = csv_a_binario(ruta) if hacia_binario else binario_a_csv(ruta)
+        except (ValueError, OSError) as e:
+            print(f"Omitida {ruta}: {e}")
+            omitidas += 1
+            continue
+        print(f"- {ruta}: {cantidad} registro(s)")
+        convertidas += 1
+    return convertidas, omitidas
+
+
+def main(argumentos=None):
+    """Línea de comandos: conversión del árbol entre Datos.csv y Datos.bin."""
+    parser = argparse.ArgumentParser(description="Conversión entre Datos.csv y el formato binario Datos.bin.")
+    parser.add_argument('sentido', choices=['a-binario', 'a-csv'])
+    parser.add_argument('--dir', default=fn.BASE_DIR, help="Directorio base del árbol")
+    args = parser.parse_args(argumentos)
+
+    convertidas, omitidas = convertir_arbol(args.dir, args.sentido == 'a-binario')
+    print(f"Conversión completada: {convertidas} región(es) convertida(s), {omitidas} omitida(s).")
+    return 1 if omitidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+import sys
+import json
+import argparse
+
+import funciones as fn
+import almacenamiento
+import instrumentacion
+import instantanea
+
+
+# Modo de Comandos (no interactivo)
+#
+# Las mismas operaciones del menú, pensadas para scripts: cada subcomando recibe sus datos
+# por argumentos y nunca llama a input(). El subcomando 'lote' aplica un archivo JSON Lines
+# con una operación por línea:
+#
+#   {"op": "alta", "continente": "America", "region": "Sur", "pais": "Chile", "poblacion": 19000000, "superficie": 756102}
+#   {"op": "modificar", "pais": "Chile", "nuevo_pais": "Chile", "poblacion": 19500000}
+#   {"op": "eliminar", "pais": "Chile"}
+#
+# En 'modificar' los campos nuevo_pais, poblacion y superficie son opcionales (se cambia lo indicado).
+# Los países se buscan por nombre sin distinguir mayúsculas, igual que en el menú.
+
+OPERACIONES_LOTE = ('alta', 'modificar', 'eliminar')
+
+
+def texto_requerido(operacion, campo):
+    """Devuelve el campo de texto de la operación, o lanza ValueError si falta o está vacío."""
+    valor = str(operacion.get(campo, '')).strip()
+    if not valor:
+        raise ValueError(f"Falta el campo '{campo}'.")
+    return valor
+
+def _aplicar_operacion(operacion, lista_global, indice):
+    """
+    Aplica una operación sobre la lista en memoria y su índice (sin escribir en disco).
+    Devuelve la región (Continente, Región) afectada y el cambio en formato de registro
+    ('A', 'U' o 'D' con valores, ver fn.aplicar_cambios_region). Lanza ValueError si no es válida.
+    """
+    tipo = operacion.get('op')
+
+    if tipo == 'alta':
+        continente = texto_requerido(operacion, 'continente')
+        region = texto_requerido(operacion, 'region')
+        pais = texto_requerido(operacion, 'pais')
+        poblacion = fn.convertir_numero_positivo(operacion.get('poblacion', ''))
+        superficie = fn.convertir_numero_positivo(operacion.get('superficie', ''))
+
+        item = fn.crear_item_memoria(lista_global, continente, region, pais, poblacion, superficie)
+        lista_global.append(item)
+        fn.indexar_item(indice, item)
+        return (continente, region), ['A', pais, poblacion, superficie]
+
+    if tipo not in OPERACIONES_LOTE:
+        raise ValueError(f"Operación desconocida: {tipo!r}.")
+
+    pais = texto_requerido(operacion, 'pais')
+    item = fn.buscar_por_nombre(indice, pais)
+    if item is None:
+        raise ValueError(f"País '{pais}' no encontrado.")
+
+    anterior = [item['Pais'], item['Poblacion'], item['Superficie']]
+    if tipo == 'eliminar':
+        fn.quitar_por_identidad(lista_global, item)
+        fn.desindexar_item(indice, item)
+        return (item['Continente'], item['Region']), ['D', *anterior]
+
+    # Se validan todos los valores antes de tocar el ítem: una operación inválida no se aplica a medias
+    nuevos = {}
+    if str(operacion.get('nuevo_pais', '')).strip():
+        nuevos['Pais'] = str(operacion['nuevo_pais']).strip()
+    for campo, clave in (('Poblacion', 'poblacion'), ('Superficie', 'superficie')):
+        if clave in operacion:
+            nuevos[campo] = fn.convertir_numero_positivo(operacion[clave])
+    if not nuevos:
+        raise ValueError("La modificación no indica ningún valor nuevo.")
+
+    nombre_anterior = item['Pais']
+    for campo, valor in nuevos.items():
+        item[campo] = valor
+    if 'Pais' in nuevos:
+        fn.renombrar_en_indice(indice, item, nombre_anterior)
+    return (item['Continente'], item['Region']), ['U', *anterior, item['Pais'], item['Poblacion'], item['Superficie']]
+
+def aplicar_lote(operaciones, lista_global=None, indice=None):
+    """
+    Aplica una secuencia de operaciones (diccionarios) y persiste el resultado.
+    Los cambios se aplican primero en memoria, en orden; al final cada región afectada
+    se reescribe una sola vez, sin importar cuántas operaciones la tocaron (si la tocó una sola,
+    el cambio se anexa sin reescribir, ver fn.aplicar_cambios_region). La reescritura
+    reproduce los cambios sobre el contenido actual de la región (bajo su bloqueo), así que
+    no pisa lo que otro proceso haya escrito mientras tanto.
+    Las operaciones inválidas se informan y se omiten sin detener el lote.
+    Devuelve {'aplicadas': n, 'errores': [(numero, mensaje)], 'regiones': n}.
+    Si una región no se puede escribir se lanza OSError (las regiones anteriores ya quedaron escritas).
+    """
+    if lista_global is None:
+        lista_global = fn.obtener_todos_los_datos()
+    if indice is None:
+        indice = fn.construir_indice(lista_global)
+
+    cambios_por_region, aplicadas, errores = preparar_lote(operaciones, lista_global, indice)
+    persistir_lote(cambios_por_region)
+    return {'aplicadas': aplicadas, 'errores': errores, 'regiones': len(cambios_por_region)}
+
+def preparar_lote(operaciones, lista_global, indice):
+    """
+    Primera mitad de aplicar_lote: aplica las operaciones en memoria, sin tocar el disco.
+    Devuelve (cambios por (Continente, Región), cantidad aplicada, [(numero, mensaje)]).
+    """
+    cambios_por_region = {}   # (Continente, Región) -> cambios, en orden de aparición
+    aplicadas = 0
+    errores = []
+
+    for numero, operacion in enumerate(operaciones, 1):
+        try:
+            if not isinstance(operacion, dict):
+                raise ValueError("La operación debe ser un objeto JSON.")
+            region, cambio = _aplicar_operacion(operacion, lista_global, indice)
+            cambios_por_region.setdefault(region, []).append(cambio)
+            aplicadas += 1
+        except ValueError as e:
+            errores.append((numero, str(e)))
+
+    fn.invalidar_ordenes()
+    return cambios_por_region, aplicadas, errores
+
+def persistir_lote(cambios_por_region):
+    """
+    Segunda mitad de aplicar_lote: escribe los cambios de cada región (toma sus bloqueos).
+    Un error de escritura se propaga sin seguir con las demás regiones.
+    """
+    for (continente, region), cambios in cambios_por_region.items():
+        fn.aplicar_cambios_region(continente, region, cambios)
+
+def aplicar_operacion_suelta(operacion):
+    """
+    Aplica una modificación o baja sin cargar toda la jerarquía: recorre los datos hasta encontrar
+    el país (el primero en orden de carga, igual que el índice) y aplica el lote sobre ese único
+    ítem. Al ser un cambio suelto, se anexa al registro de cambios de su región sin reescribirla.
+    """
+    nombre = str(operacion.get('pais', '')).strip().lower()
+    item = next((i for i in fn.iterar_todos_los_datos() if i['Pais'].lower() == nombre), None) if nombre else None
+    lista = [item] if item is not None else []
+    return aplicar_lote([operacion], lista, fn.construir_indice(lista))
+
+def leer_lote(ruta):
+    """
+    Generador de operaciones de un archivo JSON Lines (las líneas en blanco se ignoran).
+    Una línea que no es JSON válido se entrega como texto, para que aplicar_lote la informe con su número.
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError:
+                yield linea.strip()
+
+def _informar_lote(resultado):
+    """Imprime el resultado de aplicar_lote y devuelve el código de salida."""
+    for numero, mensaje in resultado['errores']:
+        print(f"Error en la operación {numero}: {mensaje}")
+    print(f"Operaciones aplicadas: {resultado['aplicadas']}. "
+          f"Con errores: {len(resultado['errores'])}. Regiones actualizadas: {resultado['regiones']}.")
+    return 1 if resultado['errores'] else 0
+
+
+# Subcomandos
+
+def _comando_importar(args):
+    if args.sincronizar:
+        return 0 if fn.sincronizar_datos(args.origen) is not None else 1
+    return 0 if fn.importar_datos_iniciales(args.origen) is not None else 1
+
+def _comando_alta(args):
+    try:
+        poblacion = fn.convertir_numero_positivo(args.poblacion)
+        superficie = fn.convertir_numero_positivo(args.superficie)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    fn.alta_item(args.continente, args.region, args.pais, poblacion, superficie)
+    return 0
+
+def _comando_modificar(args):
+    operacion = {'op': 'modificar', 'pais': args.pais}
+    if args.nuevo_nombre:
+        operacion['nuevo_pais'] = args.nuevo_nombre
+    if args.poblacion is not None:
+        operacion['poblacion'] = args.poblacion
+    if args.superficie is not None:
+        operacion['superficie'] = args.superficie
+    return _informar_lote(aplicar_operacion_suelta(operacion))
+
+def _comando_eliminar(args):
+    return _informar_lote(aplicar_operacion_suelta({'op': 'eliminar', 'pais': args.pais}))
+
+def _comando_consultar(args):
+    condiciones = []
+    if args.continente:
+        condiciones.append(('Continente', '=', args.continente))
+    if args.region:
+        condiciones.append(('Region', '=', args.region))
+    if args.pais:
+        condiciones.append(('Pais', 'prefijo', args.pais))
+    if args.contiene:
+        condiciones.append(('Pais', 'contiene', args.contiene))
+    for campo, minimo, maximo in (('Poblacion', args.poblacion_min, args.poblacion_max),
+                                  ('Superficie', args.superficie_min, args.superficie_max)):
+        if minimo is not None or maximo is not None:
+            condiciones.append((campo, 'entre', (minimo, maximo)))
+
+    # Igual que el filtro del menú sin datos en memoria: solo se leen las particiones necesarias
+    resultados = fn.filtrar_desde_disco(condiciones)
+    fn.mostrar_items(resultados, formato=args.formato)
+    return 0
+
+def _comando_estadisticas(args):
+    fn.calcular_estadisticas(verificar=args.verificar)
+    return 0
+
+def _comando_lote(args):
+    return _informar_lote(aplicar_lote(leer_lote(args.archivo)))
+
+
+def main(argumentos=None):
+    """Punto de entrada de la línea de comandos (también accesible como 'python main.py <subcomando>')."""
+    parser = argparse.ArgumentParser(description="Gestión jerárquica de países sin menú interactivo.")
+    parser.add_argument('--instrumentar', action='store_true',
+                        help="Mide las funciones de funciones.py e imprime el reporte al terminar")
+    parser.add_argument('--instrumentacion-json', metavar='ARCHIVO',
+                        help="Como --instrumentar, pero guarda el reporte en un archivo JSON")
+    parser.add_argument('--perfil', metavar='ARCHIVO',
+                        help="Ejecuta el subcomando bajo cProfile y guarda el perfil (pstats)")
+    parser.add_argument('--instantanea', action='store_true',
+                        help="Carga desde la instantánea binaria si está vigente (y la actualiza)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('importar', help="Importa los datos iniciales (borra la base anterior)")
+    p.add_argument('origen', nargs='?', default='paises.csv')
+    p.add_argument('--sincronizar', action='store_true',
+                   help="Reescribe solo las regiones que cambiaron, sin vaciar la base")
+    p.set_defaults(funcion=_comando_importar)
+
+    p = sub.add_parser('alta', help="Agrega un país")
+    p.add_argument('--continente', required=True)
+    p.add_argument('--region', required=True)
+    p.add_argument('--pais', required=True)
+    p.add_argument('--poblacion', required=True)
+    p.add_argument('--superficie', required=True)
+    p.set_defaults(funcion=_comando_alta)
+
+    p = sub.add_parser('modificar', help="Modifica un país (solo los valores indicados)")
+    p.add_argument('pais')
+    p.add_argument('--nuevo-nombre')
+    p.add_argument('--poblacion')
+    p.add_argument('--superficie')
+    p.set_defaults(funcion=_comando_modificar)
+
+    p = sub.add_parser('eliminar', help="Elimina un país")
+    p.add_argument('pais')
+    p.set_defaults(funcion=_comando_eliminar)
+
+    p = sub.add_parser('consultar', help="Lista los países que cumplen todas las condiciones")
+    p.add_argument('--continente')
+    p.add_argument('--region')
+    p.add_argument('--pais', help="Nombre que empieza con el texto")
+    p.add_argument('--contiene', help="Nombre que contiene el texto")
+    p.add_argument('--poblacion-min', type=int)
+    p.add_argument('--poblacion-max', type=int)
+    p.add_argument('--superficie-min', type=int)
+    p.add_argument('--superficie-max', type=int)
+    p.add_argument('--formato', choices=['tabla', 'csv', 'jsonl'], default='tabla')
+    p.set_defaults(funcion=_comando_consultar)
+
+    p = sub.add_parser('estadisticas', help="Muestra las estadísticas globales")
+    p.add_argument('--verificar', action='store_true', help="Compara los resúmenes con un recorrido completo")
+    p.set_defaults(funcion=_comando_estadisticas)
+
+    p = sub.add_parser('lote', help="Aplica un archivo JSON Lines de operaciones (una escritura por región)")
+    p.add_argument('archivo')
+    p.set_defaults(funcion=_comando_lote)
+
+    args = parser.parse_args(argumentos)
+    almacenamiento.configurar_desde_entorno()
+    if args.instantanea:
+        instantanea.activar()
+
+    instrumentar = args.instrumentar or args.instrumentacion_json
+    if instrumentar:
+        instrumentacion.activar()
+    try:
+        if args.perfil:
+            return instrumentacion.perfilar(args.funcion, args, ruta_salida=args.perfil)
+        return args.funcion(args)
+    except OSError as e:
+        # Una escritura que no llegó al disco no se informa como aplicada
+        print(f"Error de sistema: {e}")
+        return 1
+    finally:
+        if instrumentar:
+            instrumentacion.desactivar()
+            if args.instrumentacion_json:
+                instrumentacion.exportar_json(args.instrumentacion_json)
+            else:
+                instrumentacion.mostrar_reporte()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
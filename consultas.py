@@ -0,0 +1,145 @@
+import bisect
+
+
+# Motor de Consultas sobre la Lista Global
+#
+# Una condición es una tupla (campo, operador, valor):
+#   ('Continente', '=', 'America')        igualdad insensible a mayúsculas (también 'Region' y 'Pais')
+#   ('Poblacion', 'entre', (min, max))    rango inclusivo; None deja el extremo abierto (también 'Superficie')
+#   ('Pais', 'prefijo', 'ar')             nombre que empieza con el texto (sin distinguir mayúsculas)
+#   ('Pais', 'contiene', 'ar')            nombre que contiene el texto (requiere recorrido)
+# Varias condiciones se combinan con AND.
+
+CAMPOS_HASH = ('Continente', 'Region')       # Índices por igualdad (valor en minúsculas -> posiciones)
+CAMPOS_RANGO = ('Poblacion', 'Superficie')   # Índices ordenados por valor numérico
+
+
+def _a_numero(valor):
+    """Convierte el valor a int; devuelve None si no es numérico."""
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return None
+
+def construir_indices_consulta(lista_global):
+    """
+    Construye los índices secundarios de la lista global.
+    Hash para Continente/Región, y listas ordenadas (bisect) para Población, Superficie y País.
+    Todos guardan posiciones dentro de la lista, así que deben reconstruirse tras cada mutación.
+    """
+    indices = {'lista': lista_global}
+
+    for campo in CAMPOS_HASH:
+        tabla = {}
+        for posicion, item in enumerate(lista_global):
+            tabla.setdefault(item.get(campo, '').lower(), []).append(posicion)
+        indices[campo] = tabla
+
+    for campo in CAMPOS_RANGO:
+        pares = sorted(
+            (numero, posicion)
+            for posicion, item in enumerate(lista_global)
+            if (numero := _a_numero(item.get(campo))) is not None
+        )
+        indices[campo] = ([numero for numero, _ in pares], [posicion for _, posicion in pares])
+
+    pares_nombre = sorted((item['Pais'].lower(), posicion) for posicion, item in enumerate(lista_global))
+    indices['Pais'] = ([nombre for nombre, _ in pares_nombre], [posicion for _, posicion in pares_nombre])
+
+    return indices
+
+def cumple_condicion(item, condicion):
+    """Evalúa una condición directamente sobre un ítem (equivalente al recorrido completo)."""
+    campo, operador, valor = condicion
+
+    if operador == '=':
+        return str(item.get(campo, '')).lower() == str(valor).lower()
+
+    if operador == 'entre':
+        numero = _a_numero(item.get(campo))
+        if numero is None:
+            return False
+        minimo, maximo = valor
+        return (minimo is None or numero >= minimo) and (maximo is None or numero <= maximo)
+
+    if operador == 'prefijo':
+        return item.get(campo, '').lower().startswith(valor.lower())
+
+    if operador == 'contiene':
+        return valor.lower() in item.get(campo, '').lower()
+
+    raise ValueError(f"Operador no soportado: {operador}")
+
+def filtrar_por_recorrido(lista_global, condiciones):
+    """Aplica las condiciones recorriendo toda la lista (referencia para validar el motor indexado)."""
+    return [item for item in lista_global if all(cumple_condicion(item, c) for c in condiciones)]
+
+def _candidatos_indexados(indices, condicion):
+    """
+    Devuelve las posiciones que cumplen la condición usando un índice, o None si no es indexable.
+    Cuesta O(log n + k), siendo k la cantidad de posiciones devueltas.
+    """
+    campo, operador, valor = condicion
+
+    if operador == '=' and campo in CAMPOS_HASH:
+        return indices[campo].get(str(valor).lower(), [])
+
+    if operador == 'entre' and campo in CAMPOS_RANGO:
+        valores, posiciones = indices[campo]
+        minimo, maximo = valor
+        desde = 0 if minimo is None else bisect.bisect_left(valores, minimo)
+        hasta = len(valores) if maximo is None else bisect.bisect_right(valores, maximo)
+        return posiciones[desde:hasta]
+
+    if campo == 'Pais' and operador in ('=', 'prefijo'):
+        nombres, posiciones = indices['Pais']
+        texto = str(valor).lower()
+        desde = bisect.bisect_left(nombres, texto)
+        if operador == '=':
+            hasta = bisect.bisect_right(nombres, texto)
+        else:
+            # Todo nombre con ese prefijo queda antes de texto + el mayor carácter posible
+            hasta = bisect.bisect_left(nombres, texto + '\U0010ffff')
+        return posiciones[desde:hasta]
+
+    return None
+
+def consultar(indices, condiciones):
+    """
+    Devuelve los ítems que cumplen todas las condiciones, en el orden de la lista global.
+    Usa el índice más selectivo para obtener candidatos y verifica el resto de las condiciones
+    solo sobre esos candidatos; si ninguna condición es indexable, recorre la lista.
+    """
+    lista_global = indices['lista']
+    if not condiciones:
+        return list(lista_global)
+
+    mejores = None
+    condicion_usada = None
+    for condicion in condiciones:
+        candidatos = _candidatos_indexados(indices, condicion)
+        if candidatos is not None and (mejores is None or len(candidatos) < len(mejores)):
+            mejores = candidatos
+            condicion_usada = condicion
+
+    if mejores is None:
+        return filtrar_por_recorrido(lista_global, condiciones)
+
+    restantes = [c for c in condiciones if c is not condicion_usada]
+    # Ordenar las posiciones devuelve los ítems en el mismo orden que un recorrido completo
+    return [
+        lista_global[posicion]
+        for posicion in sorted(mejores)
+        if all(cumple_condicion(lista_global[posicion], c) for c in restantes)
+    ]
+
+def describir_condiciones(condiciones):
+    """Devuelve un texto legible con las condiciones (para los mensajes al usuario)."""
+    partes = []
+    for campo, operador, valor in condiciones:
+        if operador == 'entre':
+            minimo, maximo = valor
+            partes.append(f"{campo} entre {minimo if minimo is not None else '-'} y {maximo if maximo is not None else '-'}")
+        else:
+            partes.append(f"{campo} {operador} '{valor}'")
+    return " Y ".join(partes)
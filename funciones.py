@@ -1,10 +1,47 @@
 import os
+import io
 import csv
+import json
+import time
+import bisect
+import heapq
+import zlib
+import itertools
+import sys
 import shutil
+import threading
+import contextlib
+import collections
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import consultas
+
+try:
+    import fcntl
+except ImportError:  # Sin fcntl (p. ej. Windows) los bloqueos por región no hacen nada
+    fcntl = None
 
 
 BASE_DIR = "DB"  # Directorio raíz para la base de datos jerárquica: Continente/Región/Datos.csv
 HEADERS = ['Pais', 'Poblacion', 'Superficie'] # Cabeceras para los CSV internos
+CAMPOS_NUMERICOS = ('Poblacion', 'Superficie') # Campos que se guardan como enteros en la representación compacta
+
+# Backend de almacenamiento activo. None = árbol de carpetas con Datos.csv (implementado en este módulo).
+# Otros motores (ver almacenamiento.py) se activan con almacenamiento.configurar_backend().
+BACKEND = None
+
+# Bloqueos por región: cada escritura toma un bloqueo exclusivo sobre Continente/Región/Datos.lock
+# y cada lectura uno compartido, de modo que varios procesos pueden usar el mismo DB/ a la vez.
+BLOQUEAR_REGIONES = True
+NOMBRE_BLOQUEO = "Datos.lock"
+
+# Fragmentación: una región cuyos archivos superan en promedio TAM_MAXIMO_FRAGMENTO bytes se reparte
+# en varios archivos Datos_NNN_de_MMM.csv (0 = no fragmentar). Una Región puede tener varios niveles
+# de carpetas separados por SEPARADOR_NIVELES (p. ej. "Sur/Andina").
+SEPARADOR_NIVELES = "/"
+ARCHIVO_FRAGMENTOS = "Datos.fragmentos"
+TAM_MAXIMO_FRAGMENTO = 4 * 1024 * 1024
 
 
 # Funciones de Validación de Entrada de Usuario
@@ -21,151 +58,1319 @@ def validar_no_vacio(texto):
         else:
             print("Error: El campo no puede estar vacío.")
 
-def validar_numero_positivo(texto):
+def convertir_numero_positivo(entrada):
+    """
+    Convierte la entrada (texto o entero) en un número entero, positivo y mayor que cero.
+    Lanza ValueError con el mensaje para el usuario si no es válida.
+    """
+    entrada = str(entrada).strip()
+    if not entrada.isdigit():
+        raise ValueError("Debe ingresar un valor numérico entero.")
+    numero = int(entrada)
+    if numero <= 0:
+        raise ValueError("El número debe ser positivo y mayor a cero.")
+    return numero
+
+def validar_numero_positivo(texto, entrada=None):
     """
     Valida que la entrada sea un número entero, positivo y mayor que cero.
     Reitera la solicitud hasta obtener un valor numérico válido.
+    Si se recibe una entrada ya leída, se valida esa primero (sin volver a preguntar).
     """
     while True:
-        entrada = input(texto).strip()
-        if entrada.isdigit():
-            numero = int(entrada)
-            if numero > 0:
-                return numero
-            else:
-                print("Error: El número debe ser positivo y mayor a cero.")
-        else:
-            print("Error: Debe ingresar un valor numérico entero.")
+        if entrada is None:
+            entrada = input(texto)
+        try:
+            return convertir_numero_positivo(entrada)
+        except ValueError as e:
+            print(f"Error: {e}")
+            entrada = None
 
 
 #  Funciones de Gestión de Archivos y Directorios
 
+def niveles_region(region):
+    """Divide una Región en sus niveles de carpeta ('Sur/Andina' -> ['Sur', 'Andina'])."""
+    return [nivel for nivel in region.split(SEPARADOR_NIVELES) if nivel]
+
 def obtener_ruta_csv(continente, region):
     """
     Construye la ruta completa del directorio y del archivo CSV.
-    Utiliza la jerarquía BASE_DIR/continente/region/Datos.csv.
+    Utiliza la jerarquía BASE_DIR/continente/region/Datos.csv; una Región con varios niveles
+    ('Sur/Andina') se guarda en carpetas anidadas. En una región fragmentada, Datos.csv no se
+    usa: cada país está en el fragmento que indica obtener_ruta_csv_pais.
     """
     # Genera la ruta del directorio basada en la jerarquía Continente/Región
-    ruta_directorio = os.path.join(BASE_DIR, continente, region)
+    ruta_directorio = os.path.join(BASE_DIR, continente, *niveles_region(region))
     
     # Define el nombre del archivo de datos dentro de ese directorio
     ruta_csv = os.path.join(ruta_directorio, "Datos.csv")
     
     return ruta_directorio, ruta_csv
 
-def alta_item(continente, region, pais, poblacion, superficie):
+def jerarquia_de_ruta(ruta_directorio, base_dir=None):
     """
-    Registra un nuevo ítem (país) en el archivo CSV correspondiente.
-    Crea la estructura de directorios (Continente/Región) si no existe.
+    Deduce (Continente, Región) del directorio de una región, relativo a la base.
+    Los niveles debajo del continente forman la Región unidos con '/'; "N/A" si faltan.
     """
+    relativa = os.path.relpath(ruta_directorio, base_dir or BASE_DIR)
+    partes = [parte for parte in relativa.split(os.sep) if parte not in ('', os.curdir)]
+    continente = partes[0] if partes else "N/A"
+    region = SEPARADOR_NIVELES.join(partes[1:]) if len(partes) > 1 else "N/A"
+    return continente, region
+
+# Fragmentos de Región
+#
+# Una región grande se divide en varios archivos (fragmentos) para que una modificación
+# reescriba solo uno de ellos y la carga pueda parsearlos en paralelo. Cada país va al
+# fragmento crc32(Pais) % cantidad. La cantidad vigente se guarda en Datos.fragmentos
+# (sin ese archivo la región tiene un único Datos.csv); los fragmentos se llaman
+# Datos_NNN_de_MMM.csv y cada uno tiene su propio log y su propio resumen.
+# Cuando el tamaño medio de los archivos de una región supera TAM_MAXIMO_FRAGMENTO, la cantidad
+# se duplica: se escriben los fragmentos nuevos y recién entonces se reemplaza Datos.fragmentos
+# (el punto de confirmación). Una interrupción antes de ese reemplazo deja la región como estaba.
+# Los archivos de la cantidad anterior se conservan hasta la redistribución siguiente: un lector
+# que los listó antes del reemplazo los termina de leer sin perder filas. Los que no son de la
+# cantidad vigente se ignoran al leer.
+
+def _cantidad_fragmentos(ruta_directorio):
+    """Devuelve la cantidad de fragmentos vigente de la región (1 si no está fragmentada)."""
     try:
-        ruta_directorio, ruta_csv = obtener_ruta_csv(continente, region)
-        
-        # Crea recursivamente los directorios si no existen
-        os.makedirs(ruta_directorio, exist_ok=True)
+        with open(os.path.join(ruta_directorio, ARCHIVO_FRAGMENTOS), 'r', encoding='utf-8') as f:
+            return max(1, int(f.read().strip()))
+    except (OSError, ValueError):
+        return 1
+
+def _guardar_cantidad_fragmentos(ruta_directorio, cantidad):
+    """Registra la cantidad de fragmentos (temporal + renombrado atómico)."""
+    ruta = os.path.join(ruta_directorio, ARCHIVO_FRAGMENTOS)
+    if cantidad <= 1:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        return
+    with open(ruta + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(f"{cantidad}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta + ".tmp", ruta)
+
+def _ruta_fragmento(ruta_directorio, numero, cantidad):
+    """Ruta del fragmento 'numero' de una región dividida en 'cantidad' (Datos.csv si no hay división)."""
+    if cantidad <= 1:
+        return os.path.join(ruta_directorio, "Datos.csv")
+    return os.path.join(ruta_directorio, f"Datos_{numero:03d}_de_{cantidad:03d}.csv")
+
+def _numero_fragmento(pais, cantidad):
+    """Fragmento que le corresponde a un país (estable entre ejecuciones, a diferencia de hash())."""
+    if cantidad <= 1:
+        return 0
+    return zlib.crc32(str(pais).encode('utf-8')) % cantidad
+
+def obtener_ruta_csv_pais(continente, region, pais):
+    """Devuelve el directorio de la región y el archivo de datos donde está (o va) el país."""
+    ruta_directorio = obtener_ruta_csv(continente, region)[0]
+    cantidad = _cantidad_fragmentos(ruta_directorio)
+    return ruta_directorio, _ruta_fragmento(ruta_directorio, _numero_fragmento(pais, cantidad), cantidad)
+
+def archivos_de_datos(ruta_directorio, nombres=None):
+    """
+    Devuelve las rutas de los archivos de datos vigentes del directorio, en orden de fragmento.
+    'nombres' son los archivos presentes, si el llamador ya listó el directorio.
+    Los fragmentos se escriben todos antes que Datos.fragmentos, así que si la cantidad
+    se leyó de ese archivo existen aunque el listado sea anterior a ellos.
+    """
+    if nombres is None:
+        try:
+            nombres = set(os.listdir(ruta_directorio))
+        except FileNotFoundError:
+            return []
+    cantidad = _cantidad_fragmentos(ruta_directorio) if ARCHIVO_FRAGMENTOS in nombres else 1
+    if cantidad == 1:
+        return [os.path.join(ruta_directorio, "Datos.csv")] if "Datos.csv" in nombres else []
+    return [_ruta_fragmento(ruta_directorio, numero, cantidad) for numero in range(cantidad)]
+
+def leer_directorio_region(ruta_directorio, continente='', region=''):
+    """Lee todos los fragmentos vigentes de una región (con sus logs aplicados)."""
+    items = []
+    for ruta_csv in archivos_de_datos(ruta_directorio):
+        items.extend(_leer_archivo_csv(ruta_csv, continente, region))
+    return items
+
+def _reescribir_archivo_datos(ruta_csv, items):
+    """Reescribe un archivo de datos junto con su log (ver _reemplazar_archivo_datos) y guarda su resumen."""
+    invalidar_cache(ruta_csv)
+    # La lista recibida ya refleja todos los cambios: el log pendiente sobra
+    _reemplazar_archivo_datos(ruta_csv, items)
+    _guardar_resumen(ruta_csv, calcular_resumen(items))
+
+def _limpiar_archivos_inactivos(ruta_directorio, cantidades):
+    """Borra los datos, logs y resúmenes que no pertenecen a ninguna de las cantidades de fragmentos indicadas."""
+    vigentes = {os.path.splitext(os.path.basename(_ruta_fragmento(ruta_directorio, numero, cantidad)))[0]
+                for cantidad in cantidades for numero in range(cantidad)}
+    with os.scandir(ruta_directorio) as entradas:
+        for entrada in entradas:
+            nombre = entrada.name
+            for extension in ('.resumen.json', '.csv', '.log'):
+                if nombre.startswith("Datos") and nombre.endswith(extension):
+                    if nombre[:-len(extension)] not in vigentes:
+                        invalidar_cache(os.path.join(ruta_directorio, nombre[:-len(extension)] + ".csv"))
+                        os.remove(entrada.path)
+                    break
+
+def _escribir_fragmentos(ruta_directorio, items, cantidad):
+    """
+    Reparte los ítems entre 'cantidad' fragmentos y escribe cada uno completo.
+    Si la cantidad cambia, Datos.fragmentos se reemplaza después de escribirlos todos y se borran
+    los archivos de cantidades anteriores a la que estaba vigente.
+    """
+    cantidad_anterior = _cantidad_fragmentos(ruta_directorio)
+    grupos = [[] for _ in range(cantidad)]
+    for item in items:
+        grupos[_numero_fragmento(item['Pais'], cantidad)].append(item)
+    for numero, grupo in enumerate(grupos):
+        _reescribir_archivo_datos(_ruta_fragmento(ruta_directorio, numero, cantidad), grupo)
+
+    if cantidad != cantidad_anterior:
+        _guardar_cantidad_fragmentos(ruta_directorio, cantidad)
+        _limpiar_archivos_inactivos(ruta_directorio, (cantidad, cantidad_anterior))
+
+def _fragmentar_si_hace_falta(ruta_directorio, ruta_escrita=None, items=None):
+    """
+    Duplica la cantidad de fragmentos de la región (las veces necesarias) si su tamaño medio
+    supera TAM_MAXIMO_FRAGMENTO. Con 'ruta_escrita' solo se mira la región si ese archivo lo supera.
+    'items' es el contenido de la región si el llamador ya lo tiene (evita releerla).
+    Se invoca con el bloqueo exclusivo de la región ya tomado.
+    """
+    if not TAM_MAXIMO_FRAGMENTO:
+        return
+    if ruta_escrita is not None and os.path.getsize(ruta_escrita) <= TAM_MAXIMO_FRAGMENTO:
+        return
+
+    cantidad = _cantidad_fragmentos(ruta_directorio)
+    tam_total = 0
+    for ruta_csv in archivos_de_datos(ruta_directorio):
+        tam_total += os.path.getsize(ruta_csv)
+        ruta_log = obtener_ruta_log(ruta_csv)
+        if os.path.exists(ruta_log):
+            tam_total += os.path.getsize(ruta_log)
+
+    nueva_cantidad = cantidad
+    while tam_total > nueva_cantidad * TAM_MAXIMO_FRAGMENTO:
+        nueva_cantidad *= 2
+    if nueva_cantidad != cantidad:
+        if items is None:
+            items = leer_directorio_region(ruta_directorio)
+        _escribir_fragmentos(ruta_directorio, items, nueva_cantidad)
+
+def escribir_directorio_region(ruta_directorio, items):
+    """
+    Reescribe completa la región del directorio con la cantidad de fragmentos vigente
+    (y la aumenta si el resultado lo requiere). Se invoca con el bloqueo exclusivo tomado.
+    """
+    _escribir_fragmentos(ruta_directorio, items, _cantidad_fragmentos(ruta_directorio))
+    _fragmentar_si_hace_falta(ruta_directorio, items=items)
+
+_bloqueos_tomados = threading.local()   # Por hilo: directorio -> [descriptor, exclusivo, anidamiento]
+
+@contextlib.contextmanager
+def bloquear_directorio(ruta_directorio, exclusivo=True):
+    """
+    Bloqueo consultivo (fcntl.flock) sobre el archivo Datos.lock del directorio de una región.
+    Exclusivo para escribir, compartido para leer. Es reentrante dentro del mismo hilo: una
+    función que ya tiene el bloqueo puede llamar a otra que lo pide (p. ej. compactar al registrar).
+    Sin fcntl, con BLOQUEAR_REGIONES = False o si no se puede crear el archivo, no bloquea.
+    """
+    if fcntl is None or not BLOQUEAR_REGIONES:
+        if exclusivo:
+            _completar_reemplazos(ruta_directorio)
+        yield
+        return
+
+    tomados = getattr(_bloqueos_tomados, 'tabla', None)
+    if tomados is None:
+        tomados = _bloqueos_tomados.tabla = {}
+    clave = os.path.abspath(ruta_directorio)
+
+    entrada = tomados.get(clave)
+    if entrada is not None:
+        if exclusivo and not entrada[1]:
+            fcntl.flock(entrada[0], fcntl.LOCK_EX)
+            entrada[1] = True
+            _completar_reemplazos(ruta_directorio)
+        entrada[2] += 1
+        try:
+            yield
+        finally:
+            entrada[2] -= 1
+        return
+
+    try:
+        descriptor = os.open(os.path.join(ruta_directorio, NOMBRE_BLOQUEO), os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        descriptor = None # Directorio inexistente o de solo lectura: se continúa sin bloqueo
+
+    if descriptor is None:
+        yield
+        return
+
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+        tomados[clave] = [descriptor, exclusivo, 1]
+        if exclusivo:
+            _completar_reemplazos(ruta_directorio)
+        yield
+    finally:
+        tomados.pop(clave, None)
+        os.close(descriptor) # Cerrar el descriptor libera el bloqueo
+
+def bloqueo_region(continente, region, exclusivo=True):
+    """Bloqueo de la región Continente/Región del árbol CSV (ver bloquear_directorio)."""
+    return bloquear_directorio(obtener_ruta_csv(continente, region)[0], exclusivo)
+
+def alta_item_csv(continente, region, pais, poblacion, superficie):
+    """
+    Añade el ítem al Datos.csv de su región (backend de archivos) y devuelve la ruta escrita.
+    Crea la estructura de directorios (Continente/Región) si no existe.
+    """
+    ruta_directorio = obtener_ruta_csv(continente, region)[0]
+    
+    # Crea recursivamente los directorios si no existen
+    os.makedirs(ruta_directorio, exist_ok=True)
+
+    nuevo_item = {
+        'Pais': pais,
+        'Poblacion': poblacion,
+        'Superficie': superficie
+    }
+    
+    # Bloqueo exclusivo: otro proceso no puede escribir la región al mismo tiempo
+    with bloqueo_region(continente, region):
+        # El fragmento se elige con el bloqueo tomado: otro proceso pudo redistribuir la región
+        ruta_csv = obtener_ruta_csv_pais(continente, region, pais)[1]
 
-        nuevo_item = {
-            'Pais': pais,
-            'Poblacion': poblacion,
-            'Superficie': superficie
-        }
-        
         # Determina si se deben escribir las cabeceras (si el archivo es nuevo)
         escribir_cabeceras = not os.path.exists(ruta_csv)
 
+        # Resumen agregado previo a la escritura (solo sirve si está vigente)
+        resumen = resumen_vacio() if escribir_cabeceras else _resumen_vigente(ruta_csv)
+
+        # La escritura deja obsoleta la copia cacheada de este archivo
+        invalidar_cache(ruta_csv)
+
         # Abre el archivo en modo 'a' (append/añadir)
         with open(ruta_csv, 'a', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=HEADERS)
-            
+        
             if escribir_cabeceras:
                 writer.writeheader() # Escribe las cabeceras si es el primer registro
-                
+            
             writer.writerow(nuevo_item) # Escribe la nueva fila de datos
+
+        if resumen is not None:
+            sumar_al_resumen(resumen, poblacion, superficie)
+            _guardar_resumen(ruta_csv, resumen)
+
+        _fragmentar_si_hace_falta(ruta_directorio, ruta_csv)
+
+    return ruta_csv
+
+def alta_item(continente, region, pais, poblacion, superficie, lista_global=None, indice=None):
+    """
+    Registra un nuevo ítem (país) en el archivo CSV correspondiente (o en el backend activo).
+    Crea la estructura de directorios (Continente/Región) si no existe.
+    Si se reciben la lista en memoria y su índice, también agrega el ítem a ambos.
+    """
+    try:
+        if BACKEND is not None:
+            ubicacion = BACKEND.alta(continente, region, pais, poblacion, superficie)
+        else:
+            ubicacion = alta_item_csv(continente, region, pais, poblacion, superficie)
+
+        # Mantiene sincronizada la copia en memoria, si el llamador la provee
+        if lista_global is not None:
+            invalidar_ordenes()
+            item_memoria = crear_item_memoria(lista_global, continente, region, pais, poblacion, superficie)
+            lista_global.append(item_memoria)
+            if indice is not None:
+                indexar_item(indice, item_memoria)
             
-        print(f"Éxito: País '{pais}' agregado en {ruta_csv}")
+        print(f"Éxito: País '{pais}' agregado en {ubicacion}")
+
+    except OSError as e: 
+        print(f"Error de sistema al crear directorios o escribir archivo: {e}")
+    except Exception as e:
+        print(f"Error inesperado en alta_item: {e}")
+
+
+# Representación Compacta de Ítems
+
+def a_entero(valor):
+    """
+    Convierte un valor numérico a int una única vez.
+    Si el valor no es numérico se conserva tal cual (como hace mostrar_items con 'N/A').
+    """
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return valor
+
+class RegistroPais:
+    """
+    Ítem (país) compacto: atributos fijos con __slots__ y Población/Superficie ya convertidas a int.
+    Continente y Región se internan, de modo que todas las filas comparten la misma cadena.
+    Imita la interfaz de diccionario que usan las funciones existentes (item['Pais'], item.get(...)).
+    """
+    __slots__ = ('Pais', 'Poblacion', 'Superficie', 'Continente', 'Region')
+
+    def __init__(self, pais, poblacion, superficie, continente, region):
+        self.Pais = pais
+        self.Poblacion = a_entero(poblacion)
+        self.Superficie = a_entero(superficie)
+        self.Continente = sys.intern(continente)
+        self.Region = sys.intern(region)
+
+    @classmethod
+    def desde_convertidos(cls, pais, poblacion, superficie, continente, region):
+        """
+        Crea el registro sin convertir ni internar: para valores que ya vienen como int y
+        Continente/Región ya internados (p. ej. al cargar una instantánea binaria).
+        """
+        registro = cls.__new__(cls)
+        registro.Pais = pais
+        registro.Poblacion = poblacion
+        registro.Superficie = superficie
+        registro.Continente = continente
+        registro.Region = region
+        return registro
+
+    def __getitem__(self, clave):
+        if clave not in RegistroPais.__slots__:
+            raise KeyError(clave)
+        return getattr(self, clave)
+
+    def __setitem__(self, clave, valor):
+        if clave not in RegistroPais.__slots__:
+            raise KeyError(clave)
+        if clave in CAMPOS_NUMERICOS:
+            valor = a_entero(valor)
+        elif clave in ('Continente', 'Region'):
+            valor = sys.intern(valor)
+        setattr(self, clave, valor)
+
+    def __contains__(self, clave):
+        return clave in RegistroPais.__slots__
+
+    def __iter__(self):
+        return iter(RegistroPais.__slots__)
+
+    def __len__(self):
+        return len(RegistroPais.__slots__)
+
+    def __repr__(self):
+        return f"RegistroPais({self.como_dict()!r})"
+
+    def get(self, clave, defecto=None):
+        return getattr(self, clave, defecto) if clave in RegistroPais.__slots__ else defecto
+
+    def keys(self):
+        return RegistroPais.__slots__
+
+    def items(self):
+        return [(clave, getattr(self, clave)) for clave in RegistroPais.__slots__]
+
+    def como_dict(self):
+        """Devuelve el ítem como diccionario común."""
+        return dict(self.items())
+
+def compactar_items(lista_items):
+    """
+    Convierte una lista de ítems (diccionarios) a RegistroPais.
+    Adaptador para reutilizar listas ya cargadas con la representación compacta.
+    """
+    return [
+        item if isinstance(item, RegistroPais) else RegistroPais(
+            item['Pais'], item['Poblacion'], item['Superficie'], item['Continente'], item['Region']
+        )
+        for item in lista_items
+    ]
+
+
+# Funciones de Lectura y Consolidación de Datos
+
+TRABAJADORES_CARGA = 0   # Hilos/procesos para parsear los Datos.csv (0 = lectura secuencial)
+USAR_PROCESOS_CARGA = False  # True para usar un pool de procesos en lugar de hilos
+CARGA_COMPACTA = False   # True para cargar los ítems como RegistroPais en lugar de diccionarios
+
+# Instantánea binaria de la carga (ver instantanea.py). None = desactivada; instantanea.activar() la configura.
+INSTANTANEA = None
+
+
+def _buscar_archivos_csv(ruta_actual, encontrados, recursivo=True):
+    """
+    Recorre de forma recursiva la estructura de carpetas usando os.scandir.
+    Acumula en 'encontrados' las tuplas (ruta_csv, continente, region) en orden de recorrido:
+    primero los archivos de datos del directorio (en orden de fragmento) y luego sus subcarpetas,
+    que pueden ser niveles más profundos de la jerarquía.
+    """
+    try:
+        subdirectorios = []
+        nombres = set()
+        # scandir reutiliza el tipo de entrada del directorio y evita un stat por archivo
+        with os.scandir(ruta_actual) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir():
+                    subdirectorios.append(entrada.path)
+                elif entrada.is_file():
+                    nombres.add(entrada.name)
+
+        if "Datos.csv" in nombres or ARCHIVO_FRAGMENTOS in nombres:
+            # Extrae los niveles de la jerarquía (Continente y Región) desde la ruta
+            continente, region = jerarquia_de_ruta(ruta_actual)
+            for ruta_csv in archivos_de_datos(ruta_actual, nombres):
+                encontrados.append((ruta_csv, continente, region))
+
+        if recursivo:
+            for subdirectorio in subdirectorios:
+                # Si es un directorio, realiza la llamada recursiva
+                _buscar_archivos_csv(subdirectorio, encontrados)
+
+    except FileNotFoundError: 
+        print(f"Error: El directorio base '{BASE_DIR}' no existe.")
+    except OSError as e: 
+        print(f"Error de sistema al leer el directorio {ruta_actual}: {e}")
+
+    return encontrados
+
+def _leer_archivo_csv(ruta_csv, continente, region, compacto=False):
+    """
+    Lee un archivo 'Datos.csv' y devuelve sus ítems con el contexto de la jerarquía.
+    Es una función de nivel de módulo para poder ejecutarse en un pool de procesos.
+    """
+    items = []
+    try:
+        # Bloqueo compartido: nunca se lee una fila o una línea del log a medio escribir
+        with bloquear_directorio(os.path.dirname(ruta_csv), exclusivo=False):
+            # Un reemplazo interrumpido deja el contenido completo (con el log ya aplicado) pendiente
+            ruta_pendiente = ruta_csv + SUFIJO_REEMPLAZO
+            pendiente = os.path.exists(ruta_pendiente)
+            with open(ruta_pendiente if pendiente else ruta_csv, 'r', newline='', encoding='utf-8') as f:
+                if compacto:
+                    items = _leer_filas_compactas(f, continente, region)
+                else:
+                    reader = csv.DictReader(f)
+                    for fila in reader:
+
+                        # Agrega la información de contexto (Continente/Región) a cada ítem
+                        fila['Continente'] = continente
+                        fila['Region'] = region
+                        items.append(fila)
+
+            # Aplica las modificaciones y bajas pendientes del registro de cambios, si existe
+            ruta_log = obtener_ruta_log(ruta_csv)
+            if not pendiente and os.path.exists(ruta_log):
+                items = _aplicar_registro_cambios(items, ruta_log)
+
+    except OSError as e:
+        print(f"Error de sistema al leer el archivo {ruta_csv}: {e}")
+
+    return items
+
+def _leer_filas_compactas(f, continente, region):
+    """
+    Lee las filas de un CSV abierto como RegistroPais, ubicando las columnas por su cabecera.
+    Usa csv.reader (listas) en lugar de DictReader para no crear un diccionario por fila.
+    """
+    reader = csv.reader(f)
+    cabeceras = next(reader, None)
+    if not cabeceras:
+        return []
+
+    i_pais = cabeceras.index('Pais')
+    i_poblacion = cabeceras.index('Poblacion')
+    i_superficie = cabeceras.index('Superficie')
+    continente = sys.intern(continente)
+    region = sys.intern(region)
+
+    return [
+        RegistroPais(fila[i_pais], fila[i_poblacion], fila[i_superficie], continente, region)
+        for fila in reader if fila
+    ]
+
+def _leer_archivo_csv_tupla(datos_archivo, compacto=False):
+    """Adaptador de _leer_archivo_csv para Executor.map (recibe una única tupla)."""
+    return _leer_archivo_csv(*datos_archivo, compacto=compacto)
+
+def leer_datos_recursivo(ruta_actual, compacto=False):
+    """
+    Recorre de forma recursiva la estructura de carpetas (DB/Continente/Región).
+    Lee todos los archivos 'Datos.csv' encontrados y consolida los ítems.
+    """
+    items_consolidados = [] # Lista para almacenar todos los países encontrados
+
+    for ruta_csv, continente, region in _buscar_archivos_csv(ruta_actual, []):
+        items_consolidados.extend(_leer_archivo_csv(ruta_csv, continente, region, compacto))
+
+    return items_consolidados
+
+def iterar_todos_los_datos(compacto=None):
+    """
+    Generador equivalente a obtener_todos_los_datos: entrega los ítems archivo por archivo,
+    de modo que un listado puede empezar a mostrarse antes de terminar la lectura.
+    """
+    if compacto is None:
+        compacto = CARGA_COMPACTA
+    if BACKEND is not None:
+        yield from BACKEND.leer_todo(compacto)
+        return
+    if not os.path.isdir(BASE_DIR):
+        return
+
+    for ruta_csv, continente, region in _buscar_archivos_csv(BASE_DIR, []):
+        yield from _leer_archivo_csv(ruta_csv, continente, region, compacto)
+
+def parsear_archivos(archivos, trabajadores=0, usar_procesos=False, compacto=False):
+    """
+    Parsea una lista de tuplas (ruta_csv, continente, region) y devuelve los ítems de cada archivo.
+    Con trabajadores > 0 usa un pool; el resultado conserva siempre el orden de 'archivos'.
+    """
+    # Con un solo archivo (o sin trabajadores) el pool no aporta nada
+    if not trabajadores or trabajadores == 1 or len(archivos) <= 1:
+        return [_leer_archivo_csv(*datos_archivo, compacto=compacto) for datos_archivo in archivos]
+
+    tipo_pool = ProcessPoolExecutor if usar_procesos else ThreadPoolExecutor
+    # Agrupa archivos por tarea para reducir el costo de comunicación entre procesos
+    tam_bloque = max(1, len(archivos) // (trabajadores * 4)) if usar_procesos else 1
+
+    with tipo_pool(max_workers=trabajadores) as pool:
+        # Executor.map conserva el orden de entrada, lo que hace determinista la consolidación
+        lector = partial(_leer_archivo_csv_tupla, compacto=compacto)
+        return list(pool.map(lector, archivos, chunksize=tam_bloque))
+
+def leer_datos_paralelo(ruta_actual, trabajadores=None, usar_procesos=False, compacto=False):
+    """
+    Variante de leer_datos_recursivo que parsea los 'Datos.csv' en un pool de hilos o procesos.
+    Los resultados se combinan en el mismo orden que la lectura recursiva secuencial.
+    """
+    archivos = _buscar_archivos_csv(ruta_actual, [])
+    trabajadores = trabajadores or os.cpu_count() or 1
+
+    items_consolidados = []
+    for items in parsear_archivos(archivos, trabajadores, usar_procesos, compacto):
+        items_consolidados.extend(items)
+
+    return items_consolidados
+
+# Caché de carga: ruta_csv -> ((sello, compacto), ítems parseados). Permite recargar solo lo que cambió.
+_cache_carga = {}
+ESTADISTICAS_RECARGA = {'reparseados': 0, 'reutilizados': 0, 'eliminados': 0}
+
+
+def sello_archivo(ruta_csv):
+    """
+    Devuelve el sello (mtime_ns, tamaño, inodo) de un archivo, junto con el de su registro de cambios.
+    Si cualquiera de ellos cambia, el contenido cacheado se considera obsoleto.
+    """
+    estado = os.stat(ruta_csv)
+    try:
+        estado_log = os.stat(obtener_ruta_log(ruta_csv))
+        sello_log = (estado_log.st_mtime_ns, estado_log.st_size, estado_log.st_ino)
+    except FileNotFoundError:
+        sello_log = None
+    return (estado.st_mtime_ns, estado.st_size, estado.st_ino, sello_log)
+
+def invalidar_cache(ruta_csv=None):
+    """
+    Descarta la entrada cacheada de un archivo (o toda la caché si no se indica ruta).
+    Las escrituras propias la invocan porque dos escrituras muy seguidas pueden compartir mtime.
+    """
+    if ruta_csv is None:
+        _cache_carga.clear()
+    else:
+        _cache_carga.pop(ruta_csv, None)
+
+def recargar_datos_incremental(trabajadores=0, usar_procesos=False, compacto=False, cache=None):
+    """
+    Reconstruye la lista global reutilizando los ítems de los archivos sin cambios.
+    Solo se vuelven a parsear los 'Datos.csv' nuevos o modificados; los eliminados se descartan.
+    'cache' reemplaza a la caché de carga del módulo (p. ej. una cargada desde la instantánea).
+    """
+    if cache is None:
+        cache = _cache_carga
+    archivos = _buscar_archivos_csv(BASE_DIR, [])
+
+    sellos = {}
+    pendientes = []
+    for datos_archivo in archivos:
+        ruta_csv = datos_archivo[0]
+        try:
+            # El modo de representación forma parte del sello: cambiarlo obliga a reparsear
+            sellos[ruta_csv] = (sello_archivo(ruta_csv), compacto)
+        except OSError:
+            # El archivo desapareció entre el recorrido y el stat: se trata como eliminado
+            continue
+
+        entrada = cache.get(ruta_csv)
+        if entrada is None or entrada[0] != sellos[ruta_csv]:
+            pendientes.append(datos_archivo)
+
+    # Parsea solo los archivos nuevos o modificados y actualiza la caché
+    for datos_archivo, items in zip(pendientes, parsear_archivos(pendientes, trabajadores, usar_procesos, compacto)):
+        cache[datos_archivo[0]] = (sellos[datos_archivo[0]], items)
+
+    # Descarta de la caché los archivos que ya no existen
+    eliminados = [ruta for ruta in cache if ruta not in sellos]
+    for ruta in eliminados:
+        del cache[ruta]
+
+    ESTADISTICAS_RECARGA['reparseados'] = len(pendientes)
+    ESTADISTICAS_RECARGA['reutilizados'] = len(sellos) - len(pendientes)
+    ESTADISTICAS_RECARGA['eliminados'] = len(eliminados)
+
+    # Empalma los ítems de cada archivo en el orden del recorrido (sin volver a parsear)
+    items_consolidados = []
+    for ruta_csv, _, _ in archivos:
+        if ruta_csv in cache:
+            items_consolidados.extend(cache[ruta_csv][1])
+
+    return items_consolidados
+
+def obtener_todos_los_datos(trabajadores=None, usar_procesos=None, usar_cache=False, compacto=None):
+    """
+    Función principal para iniciar la lectura recursiva desde el directorio base.
+    Asegura la existencia del directorio 'BASE_DIR'.
+    Si se indican trabajadores (> 0), parsea los archivos en paralelo.
+    Con usar_cache=True solo vuelve a parsear los archivos que cambiaron desde la última carga.
+    Con compacto=True devuelve RegistroPais en lugar de diccionarios.
+    """
+    if trabajadores is None:
+        trabajadores = TRABAJADORES_CARGA
+    if usar_procesos is None:
+        usar_procesos = USAR_PROCESOS_CARGA
+    if compacto is None:
+        compacto = CARGA_COMPACTA
+
+    # Una carga nueva reemplaza la lista: los órdenes de la anterior ya no sirven
+    invalidar_ordenes()
+
+    if BACKEND is not None:
+        return BACKEND.leer_todo(compacto)
+
+    if not os.path.exists(BASE_DIR):
+        print(f"Directorio '{BASE_DIR}' no encontrado. Creando...")
+        try:
+            os.makedirs(BASE_DIR, exist_ok=True) # Crea el directorio base si no existe
+        except OSError as e:
+            print(f"No se pudo crear el directorio base: {e}")
+            return []
+
+    if INSTANTANEA is not None:
+        return _cargar_con_instantanea(trabajadores, usar_procesos, usar_cache, compacto)
+
+    if usar_cache:
+        return recargar_datos_incremental(trabajadores, usar_procesos, compacto)
+
+    if trabajadores:
+        return leer_datos_paralelo(BASE_DIR, trabajadores, usar_procesos, compacto)
+
+    # Inicia la lectura recursiva de todos los datos
+    return leer_datos_recursivo(BASE_DIR, compacto)
+
+def _cargar_con_instantanea(trabajadores, usar_procesos, usar_cache, compacto):
+    """
+    Carga usando la instantánea como caché persistente: los archivos cuyo sello coincide con el
+    de su catálogo salen de ella y solo se parsean los demás. Si se parseó o desapareció algún
+    archivo, la instantánea se vuelve a escribir con lo cargado.
+    Sin usar_cache se parte de una caché vacía (la del módulo no se toca).
+    """
+    cache = _cache_carga if usar_cache else {}
+    if not cache:
+        INSTANTANEA.cargar(cache, compacto)
+
+    items = recargar_datos_incremental(trabajadores, usar_procesos, compacto, cache)
+    if ESTADISTICAS_RECARGA['reparseados'] or ESTADISTICAS_RECARGA['eliminados']:
+        INSTANTANEA.guardar(cache, compacto)
+    return items
+
+def buscar_archivos_particion(continente=None, region=None):
+    """
+    Busca los 'Datos.csv' entrando solo en los directorios que pueden cumplir el filtro.
+    La jerarquía DB/Continente/Región ya particiona los datos por esas claves, así que un
+    filtro por continente solo abre DB/<continente>/ y uno por región solo DB/*/<región>/
+    (con una carpeta por nivel si la Región tiene varios: DB/*/Sur/Andina/).
+    La comparación es insensible a mayúsculas, igual que filtrar_items.
+    """
+    if not os.path.isdir(BASE_DIR):
+        return []
+
+    archivos = []
+    try:
+        with os.scandir(BASE_DIR) as entradas:
+            for entrada in entradas:
+                if not entrada.is_dir():
+                    continue
+                # Poda del Nivel 1: se descartan los continentes que no coinciden
+                if continente is not None and entrada.name.lower() != continente.lower():
+                    continue
+                if region is None:
+                    _buscar_archivos_csv(entrada.path, archivos)
+                    continue
+
+                # Poda de los niveles de la Región: en cada nivel se sigue solo la carpeta que coincide
+                candidatos = [entrada.path]
+                for nivel in niveles_region(region):
+                    siguientes = []
+                    for ruta_candidata in candidatos:
+                        with os.scandir(ruta_candidata) as entradas_nivel:
+                            siguientes.extend(e.path for e in entradas_nivel
+                                              if e.is_dir() and e.name.lower() == nivel.lower())
+                    candidatos = siguientes
+                for ruta_candidata in candidatos:
+                    _buscar_archivos_csv(ruta_candidata, archivos, recursivo=False)
+
+    except OSError as e:
+        print(f"Error de sistema al leer el directorio {BASE_DIR}: {e}")
+
+    # Verificación final sobre la ruta de cada archivo (cubre archivos fuera del nivel de región)
+    return [
+        (ruta_csv, c, r) for ruta_csv, c, r in archivos
+        if (continente is None or c.lower() == continente.lower())
+        and (region is None or r.lower() == region.lower())
+    ]
+
+def obtener_datos_filtrados(continente=None, region=None, trabajadores=None, usar_procesos=None, compacto=None):
+    """
+    Carga solo los ítems de las particiones que coinciden con el continente y/o la región.
+    Devuelve lo mismo (y en el mismo orden) que filtrar la carga completa por esas claves,
+    pero con un costo proporcional al tamaño de las particiones leídas.
+    """
+    if trabajadores is None:
+        trabajadores = TRABAJADORES_CARGA
+    if usar_procesos is None:
+        usar_procesos = USAR_PROCESOS_CARGA
+    if compacto is None:
+        compacto = CARGA_COMPACTA
+
+    if BACKEND is not None:
+        return BACKEND.leer_particion(continente, region, compacto)
+
+    archivos = buscar_archivos_particion(continente, region)
+
+    items_consolidados = []
+    for items in parsear_archivos(archivos, trabajadores, usar_procesos, compacto):
+        items_consolidados.extend(items)
+    return items_consolidados
+
+# Registro de Cambios por Región (log de solo anexado)
+#
+# Modificar o eliminar un país no reescribe Datos.csv: se anexa una línea a Datos.log.
+#   U,<Pais>,<Poblacion>,<Superficie>,<Pais nuevo>,<Poblacion nueva>,<Superficie nueva>
+#   D,<Pais>,<Poblacion>,<Superficie>
+# Cada línea identifica la fila por sus valores y afecta a la primera fila viva que coincide.
+# Al leer, el log se aplica sobre el archivo base; cuando crece demasiado se compacta.
+# Reaplicar un log sobre la base que ya lo incluye no es inocuo (una baja alcanzaría a una fila
+# dada de alta después), así que la base y el log se reemplazan juntos: ver _reemplazar_archivo_datos.
+
+UMBRAL_MINIMO_LOG = 4096       # Bytes de log por debajo de los cuales nunca se compacta
+FRACCION_COMPACTACION = 0.5    # Se compacta cuando el log supera esta fracción del Datos.csv
+SUFIJO_REEMPLAZO = ".nuevo"    # Datos.csv.nuevo: contenido que reemplaza a Datos.csv y a su log
+
+
+def obtener_ruta_log(ruta_csv):
+    """Devuelve la ruta del registro de cambios asociado a un archivo de datos (Datos.csv -> Datos.log)."""
+    return os.path.splitext(ruta_csv)[0] + ".log"
+
+def _clave_fila(pais, poblacion, superficie):
+    """Clave que identifica una fila por sus valores; los números se comparan como enteros."""
+    return (pais, a_entero(poblacion), a_entero(superficie))
+
+def _aplicar_registro_cambios(items, ruta_log):
+    """
+    Aplica sobre los ítems leídos del archivo base las líneas del registro de cambios.
+    Las líneas que no encuentran su fila se ignoran.
+    """
+    with open(ruta_log, 'r', newline='', encoding='utf-8') as f:
+        return _aplicar_cambios(items, csv.reader(f))
+
+def _aplicar_cambios(items, registros, continente=None, region=None):
+    """
+    Aplica registros de cambios con el formato del log: ['U', anterior x3, nuevo x3] y
+    ['D', anterior x3], más ['A', Pais, Poblacion, Superficie] para altas (que el log no usa).
+    Cada 'U'/'D' afecta a la primera fila viva con esos valores; si no la hay, se ignora.
+    """
+    # Clave de fila -> posiciones vivas, ordenadas como en el archivo
+    posiciones = {}
+    for posicion, item in enumerate(items):
+        clave = _clave_fila(item['Pais'], item['Poblacion'], item['Superficie'])
+        posiciones.setdefault(clave, []).append(posicion)
+
+    vivos = [True] * len(items)
+    for registro in registros:
+        if len(registro) < 4:
+            continue # Línea incompleta (p. ej. escritura interrumpida): se descarta
+
+        if registro[0] == 'A':
+            pais, poblacion, superficie = registro[1:4]
+            items.append({'Pais': pais, 'Poblacion': poblacion, 'Superficie': superficie,
+                          'Continente': continente, 'Region': region})
+            vivos.append(True)
+            posiciones.setdefault(_clave_fila(*registro[1:4]), []).append(len(items) - 1)
+            continue
+
+        candidatos = posiciones.get(_clave_fila(*registro[1:4]))
+        if not candidatos:
+            continue
+        posicion = candidatos.pop(0)
+
+        if registro[0] == 'D':
+            vivos[posicion] = False
+        elif registro[0] == 'U' and len(registro) >= 7:
+            item = items[posicion]
+            item['Pais'], item['Poblacion'], item['Superficie'] = registro[4:7]
+            bisect.insort(posiciones.setdefault(_clave_fila(*registro[4:7]), []), posicion)
+
+    return [item for item, vivo in zip(items, vivos) if vivo]
+
+def registrar_cambio(continente, region, operacion, anterior, nuevo=None):
+    """
+    Persiste una modificación ('U') o baja ('D') de un país de la región.
+    'anterior' y 'nuevo' son tuplas (Pais, Poblacion, Superficie).
+    En el árbol CSV se anexa al registro de cambios; otros backends la aplican directamente.
+    Si no se puede escribir, la excepción (OSError en el árbol CSV) llega al llamador.
+    """
+    if BACKEND is None:
+        registrar_cambio_csv(continente, region, operacion, anterior, nuevo)
+    elif operacion == 'D':
+        BACKEND.eliminar(continente, region, anterior)
+    else:
+        BACKEND.actualizar(continente, region, anterior, nuevo)
+
+def registrar_cambio_csv(continente, region, operacion, anterior, nuevo=None):
+    """
+    Anexa una modificación ('U') o baja ('D') al registro de cambios del fragmento del país.
+    Si el log supera el umbral, compacta ese fragmento. Un cambio de nombre que lleva al país
+    a otro fragmento se registra como baja en el suyo y alta en el nuevo.
+    Lanza OSError si no se pudo escribir.
+    """
+    ruta_directorio = obtener_ruta_csv(continente, region)[0]
+
+    with bloqueo_region(continente, region):
+        cantidad = _cantidad_fragmentos(ruta_directorio)
+        numero = _numero_fragmento(anterior[0], cantidad)
+        ruta_csv = _ruta_fragmento(ruta_directorio, numero, cantidad)
+
+        if nuevo is not None and _numero_fragmento(nuevo[0], cantidad) != numero:
+            _anexar_al_log(ruta_csv, ['D', *anterior], anterior)
+            alta_item_csv(continente, region, *nuevo)
+            return
+
+        registro = [operacion, *anterior]
+        if nuevo is not None:
+            registro.extend(nuevo)
+        _anexar_al_log(ruta_csv, registro, anterior, nuevo)
+
+def _anexar_al_log(ruta_csv, registro, anterior, nuevo=None):
+    """
+    Anexa un registro al log de un archivo de datos, actualiza su resumen y lo compacta si hace falta.
+    Se invoca con el bloqueo exclusivo de la región tomado.
+    """
+    ruta_log = obtener_ruta_log(ruta_csv)
+
+    # La escritura deja obsoleta la copia cacheada de este archivo
+    invalidar_cache(ruta_csv)
+    resumen = _resumen_vigente(ruta_csv)
+
+    with open(ruta_log, 'a', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(registro)
+
+    # Actualiza el resumen agregado en O(1) cuando el cambio lo permite
+    if resumen is not None and _restar_del_resumen(resumen, *anterior[1:]):
+        if nuevo is not None:
+            sumar_al_resumen(resumen, *nuevo[1:])
+        _guardar_resumen(ruta_csv, resumen)
+
+    tam_log = os.path.getsize(ruta_log)
+    tam_base = os.path.getsize(ruta_csv) if os.path.exists(ruta_csv) else 0
+    if tam_log >= max(UMBRAL_MINIMO_LOG, tam_base * FRACCION_COMPACTACION):
+        _compactar_archivo(ruta_csv)
+
+def aplicar_cambios_region(continente, region, cambios):
+    """
+    Persiste en una región una secuencia de cambios (registros 'A', 'U' y 'D', ver _aplicar_cambios)
+    con una única reescritura. Bajo el bloqueo exclusivo de la región se relee su contenido actual
+    y se reproducen los cambios sobre él, así lo que otro proceso escribió después de que el
+    llamador cargara sus datos no se pierde. En una región fragmentada solo se releen y reescriben
+    los fragmentos que los cambios tocan. Un cambio suelto no reescribe nada: el alta se anexa al
+    CSV y la modificación o baja al registro de cambios, como en el menú.
+    Otros backends reciben los cambios uno por uno.
+    Un error de escritura se propaga (OSError en el árbol CSV): el llamador no debe dar el cambio
+    por guardado.
+    """
+    if BACKEND is not None:
+        for cambio in cambios:
+            if cambio[0] == 'A':
+                BACKEND.alta(continente, region, *cambio[1:4])
+            elif cambio[0] == 'D':
+                BACKEND.eliminar(continente, region, tuple(cambio[1:4]))
+            else:
+                BACKEND.actualizar(continente, region, tuple(cambio[1:4]), tuple(cambio[4:7]))
+        return
+
+    if len(cambios) == 1:
+        tipo, *valores = cambios[0]
+        if tipo != 'A':
+            registrar_cambio_csv(continente, region, tipo, valores[:3], valores[3:6] or None)
+        else:
+            alta_item_csv(continente, region, *valores[:3])
+        return
+
+    ruta_directorio = obtener_ruta_csv(continente, region)[0]
+    os.makedirs(ruta_directorio, exist_ok=True)
+    with bloqueo_region(continente, region):
+        cantidad = _cantidad_fragmentos(ruta_directorio)
+
+        # Reparte los cambios por fragmento conservando su orden relativo
+        por_fragmento = {}
+        for cambio in cambios:
+            numero = _numero_fragmento(cambio[1], cantidad)
+            if cambio[0] == 'U' and len(cambio) >= 7 and _numero_fragmento(cambio[4], cantidad) != numero:
+                # El país cambia de fragmento: baja en el suyo y alta en el nuevo (como registrar_cambio_csv).
+                # El alta solo se hace si la fila existía al releer el fragmento.
+                por_fragmento.setdefault(numero, []).append(['D', *cambio[1:4]])
+                por_fragmento.setdefault(_numero_fragmento(cambio[4], cantidad), []).append(
+                    ['A', *cambio[4:7], _clave_fila(*cambio[1:4]), numero])
+            else:
+                por_fragmento.setdefault(numero, []).append(cambio)
+
+        leidos = {}
+        for numero in por_fragmento:
+            ruta_csv = _ruta_fragmento(ruta_directorio, numero, cantidad)
+            leidos[numero] = _leer_archivo_csv(ruta_csv, continente, region) if os.path.exists(ruta_csv) else []
+        # Claves presentes en los fragmentos de los que sale algún país
+        origenes = {r[5] for registros in por_fragmento.values() for r in registros if r[0] == 'A' and len(r) > 4}
+        existentes = {numero: {_clave_fila(i['Pais'], i['Poblacion'], i['Superficie']) for i in leidos[numero]}
+                      for numero in origenes}
+
+        for numero, registros in por_fragmento.items():
+            registros = [r for r in registros if r[0] != 'A' or len(r) == 4 or r[4] in existentes[r[5]]]
+            ruta_csv = _ruta_fragmento(ruta_directorio, numero, cantidad)
+            _reescribir_archivo_datos(ruta_csv, _aplicar_cambios(leidos[numero], registros, continente, region))
+        _fragmentar_si_hace_falta(ruta_directorio)
+
+def _escribir_csv_atomico(ruta_csv, items):
+    """
+    Escribe los ítems en un archivo temporal del mismo directorio y lo renombra sobre ruta_csv.
+    os.replace es atómico: un lector ve el archivo viejo o el nuevo, nunca uno truncado.
+    """
+    ruta_temporal = ruta_csv + ".tmp"
+    with open(ruta_temporal, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=HEADERS, extrasaction='ignore')
+        writer.writeheader() # Escribe siempre las cabeceras
+        # Escribe solo los campos de HEADERS
+        writer.writerows({campo: item[campo] for campo in HEADERS} for item in items)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(ruta_temporal, ruta_csv)
+
+def _reemplazar_archivo_datos(ruta_csv, items):
+    """
+    Pone los ítems (que ya incluyen los cambios del log) en lugar del archivo de datos y de su log.
+    Primero se escribe completo Datos.csv.nuevo, después se borra el log y recién entonces se
+    renombra sobre Datos.csv. Mientras exista Datos.csv.nuevo, la lectura usa ese archivo y
+    no aplica el log; el próximo bloqueo exclusivo termina el reemplazo (_completar_reemplazos).
+    Así una interrupción en cualquier punto deja el contenido viejo o el nuevo, nunca la base
+    nueva con el log viejo encima. Se invoca con el bloqueo exclusivo de la región tomado.
+    """
+    _escribir_csv_atomico(ruta_csv + SUFIJO_REEMPLAZO, items)
+    _terminar_reemplazo(ruta_csv)
+
+def _terminar_reemplazo(ruta_csv):
+    """Borra el log ya absorbido por Datos.csv.nuevo y lo instala como Datos.csv."""
+    ruta_log = obtener_ruta_log(ruta_csv)
+    if os.path.exists(ruta_log):
+        os.remove(ruta_log)
+    os.replace(ruta_csv + SUFIJO_REEMPLAZO, ruta_csv)
+
+def _completar_reemplazos(ruta_directorio):
+    """Termina los reemplazos que un proceso interrumpido dejó pendientes en el directorio."""
+    try:
+        nombres = os.listdir(ruta_directorio)
+    except OSError:
+        return # Directorio todavía inexistente: no hay nada pendiente
+    for nombre in nombres:
+        if nombre.endswith(".csv" + SUFIJO_REEMPLAZO):
+            ruta_csv = os.path.join(ruta_directorio, nombre[:-len(SUFIJO_REEMPLAZO)])
+            invalidar_cache(ruta_csv)
+            _terminar_reemplazo(ruta_csv)
+
+def compactar_region(continente, region):
+    """
+    Integra el registro de cambios en cada archivo de datos de la región y elimina los logs.
+    Una interrupción a mitad de camino no pierde ni repite cambios (ver _reemplazar_archivo_datos).
+    """
+    ruta_directorio = obtener_ruta_csv(continente, region)[0]
+    try:
+        with bloqueo_region(continente, region):
+            for ruta_csv in archivos_de_datos(ruta_directorio):
+                _compactar_archivo(ruta_csv)
+    except OSError as e:
+        print(f"Error al compactar la región {continente}/{region}: {e}")
+
+def _compactar_archivo(ruta_csv):
+    """Compacta el log de un archivo de datos. Se invoca con el bloqueo exclusivo de la región tomado."""
+    ruta_log = obtener_ruta_log(ruta_csv)
+    # Otro proceso pudo compactarlo mientras se esperaba el bloqueo
+    if not os.path.exists(ruta_log):
+        return
+    invalidar_cache(ruta_csv)
+    resumen = _resumen_vigente(ruta_csv)
+    items = _leer_archivo_csv(ruta_csv, '', '')
+    _reemplazar_archivo_datos(ruta_csv, items)
+
+    # El contenido lógico no cambió: se vuelve a sellar el resumen con el archivo nuevo
+    _guardar_resumen(ruta_csv, resumen if resumen is not None else calcular_resumen(items))
+
+# Resúmenes Agregados por Región
+#
+# Junto a cada Datos.csv se guarda Datos.resumen.json con la cantidad de países y la suma,
+# mínimo y máximo de Población y Superficie, sellado con el estado del Datos.csv (y su log).
+# Alta, modificación y baja lo actualizan en O(1); si un cambio no se puede aplicar de forma
+# incremental (p. ej. se quita el mínimo), el resumen queda vencido y se recalcula al consultarlo.
+
+def obtener_ruta_resumen(ruta_csv):
+    """Devuelve la ruta del resumen agregado de un archivo de datos (Datos.csv -> Datos.resumen.json)."""
+    return os.path.splitext(ruta_csv)[0] + ".resumen.json"
+
+def resumen_vacio():
+    """Devuelve un resumen sin ítems."""
+    return {
+        'cantidad': 0,
+        'Poblacion': {'suma': 0, 'min': None, 'max': None},
+        'Superficie': {'suma': 0, 'min': None, 'max': None}
+    }
+
+def sumar_al_resumen(resumen, poblacion, superficie):
+    """Agrega un ítem al resumen. Los valores no numéricos cuentan como país pero no suman."""
+    resumen['cantidad'] += 1
+    for campo, valor in (('Poblacion', poblacion), ('Superficie', superficie)):
+        numero = a_entero(valor)
+        if not isinstance(numero, int):
+            continue
+        agregado = resumen[campo]
+        agregado['suma'] += numero
+        agregado['min'] = numero if agregado['min'] is None else min(agregado['min'], numero)
+        agregado['max'] = numero if agregado['max'] is None else max(agregado['max'], numero)
+
+def _restar_del_resumen(resumen, poblacion, superficie):
+    """
+    Quita un ítem del resumen.
+    Devuelve False si el valor quitado era un mínimo o máximo: en ese caso el resumen
+    ya no puede actualizarse sin releer la región y debe descartarse.
+    """
+    resumen['cantidad'] -= 1
+    for campo, valor in (('Poblacion', poblacion), ('Superficie', superficie)):
+        numero = a_entero(valor)
+        if not isinstance(numero, int):
+            continue
+        agregado = resumen[campo]
+        agregado['suma'] -= numero
+        if numero in (agregado['min'], agregado['max']):
+            return False
+    return True
+
+def combinar_resumenes(destino, origen):
+    """Acumula el resumen 'origen' dentro de 'destino'."""
+    destino['cantidad'] += origen['cantidad']
+    for campo in CAMPOS_NUMERICOS:
+        a, b = destino[campo], origen[campo]
+        a['suma'] += b['suma']
+        for extremo, elegir in (('min', min), ('max', max)):
+            if b[extremo] is not None:
+                a[extremo] = b[extremo] if a[extremo] is None else elegir(a[extremo], b[extremo])
+
+def calcular_resumen(items):
+    """Calcula el resumen agregado de una lista de ítems recorriéndola completa."""
+    resumen = resumen_vacio()
+    for item in items:
+        sumar_al_resumen(resumen, item['Poblacion'], item['Superficie'])
+    return resumen
+
+def _sello_serializable(ruta_csv):
+    """Devuelve el sello del archivo en la forma en que se guarda en JSON (listas en lugar de tuplas)."""
+    return json.loads(json.dumps(sello_archivo(ruta_csv)))
+
+def _resumen_vigente(ruta_csv):
+    """
+    Devuelve el resumen guardado si su sello coincide con el estado actual del archivo.
+    Devuelve None si no existe, está dañado o quedó vencido.
+    """
+    try:
+        with open(obtener_ruta_resumen(ruta_csv), 'r', encoding='utf-8') as f:
+            resumen = json.load(f)
+        if resumen.pop('sello', None) == _sello_serializable(ruta_csv):
+            return resumen
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _guardar_resumen(ruta_csv, resumen):
+    """Guarda el resumen sellado con el estado actual del archivo (temporal + renombrado)."""
+    ruta_resumen = obtener_ruta_resumen(ruta_csv)
+    try:
+        contenido = dict(resumen, sello=_sello_serializable(ruta_csv))
+        with open(ruta_resumen + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(contenido, f)
+        os.replace(ruta_resumen + ".tmp", ruta_resumen)
+    except OSError as e:
+        print(f"Error al guardar el resumen {ruta_resumen}: {e}")
+
+def obtener_resumen(ruta_csv, continente, region):
+    """
+    Devuelve el resumen de un archivo de datos.
+    Si el guardado está vencido, recalcula solo esa región y lo vuelve a guardar.
+    """
+    resumen = _resumen_vigente(ruta_csv)
+    if resumen is None:
+        resumen = calcular_resumen(_leer_archivo_csv(ruta_csv, continente, region))
+        _guardar_resumen(ruta_csv, resumen)
+    return resumen
+
+def estadisticas_desde_resumenes():
+    """
+    Combina los resúmenes de todas las regiones sin cargar los ítems.
+    Devuelve {'global': resumen, 'por_continente': {...}, 'por_region': {(c, r): resumen}}.
+    """
+    if BACKEND is not None:
+        return BACKEND.estadisticas()
+    return estadisticas_csv()
 
-    except OSError as e: 
-        print(f"Error de sistema al crear directorios o escribir archivo: {e}")
-    except Exception as e:
-        print(f"Error inesperado en alta_item: {e}")
+def estadisticas_csv():
+    """Implementación de estadisticas_desde_resumenes para el árbol de Datos.csv."""
+    total = resumen_vacio()
+    por_continente = {}
+    por_region = {}
 
+    if os.path.isdir(BASE_DIR):
+        for ruta_csv, continente, region in _buscar_archivos_csv(BASE_DIR, []):
+            resumen = obtener_resumen(ruta_csv, continente, region)
+            if not resumen['cantidad']:
+                continue  # Una región vaciada no figura, igual que en los demás backends
+            combinar_resumenes(por_region.setdefault((continente, region), resumen_vacio()), resumen)
+            combinar_resumenes(por_continente.setdefault(continente, resumen_vacio()), resumen)
+            combinar_resumenes(total, resumen)
 
-# Funciones de Lectura y Consolidación de Datos
+    return {'global': total, 'por_continente': por_continente, 'por_region': por_region}
 
-def leer_datos_recursivo(ruta_actual):
+def verificar_resumenes():
     """
-    Recorre de forma recursiva la estructura de carpetas (DB/Continente/Región).
-    Lee todos los archivos 'Datos.csv' encontrados y consolida los ítems.
+    Compara cada resumen guardado con un recorrido completo de su archivo.
+    Un resumen vencido o inexistente es normal (una baja del mínimo o del máximo lo deja así
+    y se recalcula al usarlo): se regenera y no cuenta como diferencia.
+    Imprime y devuelve la lista de rutas cuyo resumen figura vigente pero no coincide.
     """
-    items_consolidados = [] # Lista para almacenar todos los países encontrados
-    
-    try:
-        # Itera sobre el contenido del directorio actual
-        for nombre_entrada in os.listdir(ruta_actual):
-            ruta_completa = os.path.join(ruta_actual, nombre_entrada)
-            
-            if os.path.isdir(ruta_completa):
-                # Si es un directorio, realiza la llamada recursiva
-                items_consolidados.extend(leer_datos_recursivo(ruta_completa))
-                
-            # Verifica si es un archivo y termina en '.csv'
-            elif os.path.isfile(ruta_completa) and nombre_entrada.endswith('.csv'):
-                
-                # Extrae los niveles de la jerarquía (Continente y Región) desde la ruta
-                partes_ruta = ruta_actual.split(os.sep)
-                # partes_ruta[1] es Continente, partes_ruta[2] es Región
-                continente = partes_ruta[1] if len(partes_ruta) > 1 else "N/A"
-                region = partes_ruta[2] if len(partes_ruta) > 2 else "N/A"
+    diferencias = []
+    regenerados = 0
+    if os.path.isdir(BASE_DIR):
+        for ruta_csv, continente, region in _buscar_archivos_csv(BASE_DIR, []):
+            # Con el bloqueo tomado, el resumen y el recorrido corresponden al mismo estado del archivo
+            with bloquear_directorio(os.path.dirname(ruta_csv)):
+                guardado = _resumen_vigente(ruta_csv)
+                real = calcular_resumen(_leer_archivo_csv(ruta_csv, continente, region))
+                if guardado is None:
+                    _guardar_resumen(ruta_csv, real)
+                    regenerados += 1
+                elif guardado != real:
+                    print(f"Resumen no coincide: {ruta_csv}")
+                    diferencias.append(ruta_csv)
 
-                
-                # Abre y lee el archivo CSV encontrado
-                with open(ruta_completa, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for fila in reader:
-                        
-                        # Agrega la información de contexto (Continente/Región) a cada ítem
-                        fila['Continente'] = continente
-                        fila['Region'] = region
-                        items_consolidados.append(fila)
+    if regenerados:
+        print(f"Resúmenes vencidos o inexistentes regenerados: {regenerados}.")
+    if not diferencias:
+        print("Verificación correcta: todos los resúmenes coinciden con los datos.")
+    return diferencias
 
-    except FileNotFoundError: 
-        print(f"Error: El directorio base '{BASE_DIR}' no existe.")
-    except OSError as e: 
-        print(f"Error de sistema al leer el directorio {ruta_actual}: {e}")
-        
-    return items_consolidados
+# Funciones de Importación Masiva
+
+TAM_BUFFER_IMPORTACION = 5000  # Máximo de filas retenidas en memoria antes de volcarlas a disco
 
-def obtener_todos_los_datos():
+
+def volcar_buffers(buffers, regiones_preparadas):
     """
-    Función principal para iniciar la lectura recursiva desde el directorio base.
-    Asegura la existencia del directorio 'BASE_DIR'.
+    Escribe en disco las filas acumuladas por (Continente, Región).
+    Cada archivo de datos se abre una sola vez por volcado y recibe un único bloque de texto;
+    su resumen agregado se actualiza con las filas escritas. Si la región crece por encima
+    de TAM_MAXIMO_FRAGMENTO se redistribuye en más fragmentos.
     """
-    if not os.path.exists(BASE_DIR):
-        print(f"Directorio '{BASE_DIR}' no encontrado. Creando...")
-        try:
-            os.makedirs(BASE_DIR) # Crea el directorio base si no existe
-        except OSError as e:
-            print(f"No se pudo crear el directorio base: {e}")
-            return []
-    
-    # Inicia la lectura recursiva de todos los datos
-    return leer_datos_recursivo(BASE_DIR)
+    for (continente, region), filas in buffers.items():
+        if not filas:
+            continue
 
-# Funciones de Importación Masiva
+        ruta_directorio = obtener_ruta_csv(continente, region)[0]
+
+        # La estructura de carpetas se crea solo en el primer volcado de la región
+        if (continente, region) not in regiones_preparadas:
+            os.makedirs(ruta_directorio, exist_ok=True)
+            regiones_preparadas.add((continente, region))
+
+        with bloqueo_region(continente, region):
+            cantidad = _cantidad_fragmentos(ruta_directorio)
+            grupos = {}
+            for fila in filas:
+                grupos.setdefault(_numero_fragmento(fila['Pais'], cantidad), []).append(fila)
+
+            supera_limite = False
+            for numero, filas_fragmento in grupos.items():
+                ruta_csv = _ruta_fragmento(ruta_directorio, numero, cantidad)
+                archivo_nuevo = not os.path.exists(ruta_csv)
+                resumen = resumen_vacio() if archivo_nuevo else _resumen_vigente(ruta_csv)
+
+                bloque = io.StringIO()
+                writer = csv.DictWriter(bloque, fieldnames=HEADERS)
+                if archivo_nuevo:
+                    writer.writeheader()
+                writer.writerows(filas_fragmento)
+
+                invalidar_cache(ruta_csv)
+                with open(ruta_csv, 'a', newline='', encoding='utf-8') as f:
+                    f.write(bloque.getvalue())
+
+                if resumen is not None:
+                    for fila in filas_fragmento:
+                        sumar_al_resumen(resumen, fila['Poblacion'], fila['Superficie'])
+                    _guardar_resumen(ruta_csv, resumen)
+                supera_limite = supera_limite or (
+                    TAM_MAXIMO_FRAGMENTO and os.path.getsize(ruta_csv) > TAM_MAXIMO_FRAGMENTO)
 
-def importar_datos_iniciales(archivo_origen):
+            if supera_limite:
+                _fragmentar_si_hace_falta(ruta_directorio)
+
+    buffers.clear()
+
+def _volcar_buffers_backend(buffers, regiones_preparadas):
+    """Equivalente de volcar_buffers para un backend distinto del árbol CSV (un lote por región)."""
+    for (continente, region), filas in buffers.items():
+        if filas:
+            BACKEND.alta_lote(continente, region, filas)
+    buffers.clear()
+
+def importar_datos_iniciales(archivo_origen, tam_buffer=TAM_BUFFER_IMPORTACION):
     """
     Procesa un archivo CSV y lo migra a la estructura jerárquica de carpetas.
     Borra y recrea la estructura base antes de la importación para asegurar limpieza.
+    Agrupa las filas por (Continente, Región) en buffers acotados y las escribe en bloques.
     """
-    print(f"\nLimpiando base de datos anterior en '{BASE_DIR}'...")
     try:
-        if os.path.exists(BASE_DIR):
-            shutil.rmtree(BASE_DIR) # Borra la carpeta base y todo su contenido
-        
-        # 2. Recrear el directorio base vacío
-        os.makedirs(BASE_DIR)
-        print("Directorio limpiado. Comenzando nueva importación...")
+        if BACKEND is not None:
+            # Otro backend: se vacía por su propia interfaz y recibe un lote por región
+            print(f"\nLimpiando base de datos anterior ({BACKEND.nombre})...")
+            BACKEND.vaciar()
+            volcar = _volcar_buffers_backend
+            print("Base de datos vaciada. Comenzando nueva importación...")
+        else:
+            print(f"\nLimpiando base de datos anterior en '{BASE_DIR}'...")
+            vaciar_directorio_base() # Borra la carpeta base y todo su contenido, y la recrea vacía
+            invalidar_cache() # Ningún archivo cacheado sobrevive a la limpieza
+            volcar = volcar_buffers
+            print("Directorio limpiado. Comenzando nueva importación...")
         
     except OSError as e:
         print(f"Error al limpiar el directorio '{BASE_DIR}': {e}")
@@ -176,94 +1381,655 @@ def importar_datos_iniciales(archivo_origen):
         print(f"Error: El archivo '{archivo_origen}' no se encuentra.")
         return
 
+    buffers = {}              # (Continente, Región) -> filas pendientes de escritura
+    regiones_preparadas = set()
+    conteo_por_region = {}
+    filas_en_buffer = 0
+    contador = 0
+    inicio = time.perf_counter()
+
     try:
-        # Lee el archivo CSV de origen
+        # Lee el archivo CSV de origen en una sola pasada
         with open(archivo_origen, 'r', newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
-            contador = 0
             for fila in reader:
                 try:
-                    # Llama a alta_item para grabar cada fila en la jerarquía
-                    alta_item(
-                        fila['Continente'],
-                        fila['Region'],
-                        fila['Pais'],
-                        int(fila['Poblacion']),
-                        int(fila['Superficie'])
-                    )
-                    contador += 1
+                    clave = (fila['Continente'], fila['Region'])
+                    nuevo_item = {
+                        'Pais': fila['Pais'],
+                        'Poblacion': int(fila['Poblacion']),
+                        'Superficie': int(fila['Superficie'])
+                    }
                 except (ValueError, KeyError) as e:
                     # Captura errores de formato o campos faltantes
                     print(f"Error en formato de fila: {fila}. Detalle: {e}")
-                
-            print(f"\nImportación completada. {contador} países migrados a la estructura de carpetas.")
-            
+                    continue
+
+                buffers.setdefault(clave, []).append(nuevo_item)
+                conteo_por_region[clave] = conteo_por_region.get(clave, 0) + 1
+                filas_en_buffer += 1
+                contador += 1
+
+                # Vuelca todos los buffers cuando se alcanza el límite de memoria
+                if filas_en_buffer >= tam_buffer:
+                    volcar(buffers, regiones_preparadas)
+                    filas_en_buffer = 0
+
+            volcar(buffers, regiones_preparadas)
+
     except FileNotFoundError:
         print(f"Error: Archivo '{archivo_origen}' no encontrado.")
+        return
+    except OSError as e:
+        print(f"Error de sistema al crear directorios o escribir archivo: {e}")
+        return
     except Exception as e:
         print(f"Error inesperado durante la importación: {e}")
+        return
+
+    duracion = time.perf_counter() - inicio
+    filas_por_segundo = contador / duracion if duracion > 0 else float(contador)
+
+    print("\nPaíses importados por región:")
+    for (continente, region), conteo in conteo_por_region.items():
+        print(f"- {continente}/{region}: {conteo} país(es)")
+    destino = "la estructura de carpetas" if BACKEND is None else BACKEND.nombre
+    print(f"\nImportación completada. {contador} países migrados a {destino}.")
+    print(f"Tiempo: {duracion:.3f} s ({filas_por_segundo:,.0f} filas/s)")
+
+    return conteo_por_region
+
+# Sincronización Incremental
+#
+# sincronizar_datos compara el CSV de origen con el estado actual región por región y solo
+# reescribe las regiones cuyo contenido cambió. En el árbol CSV el resultado se arma en un
+# directorio hermano (BASE_DIR.sincronizando): las regiones sin cambios se enlazan con hardlinks
+# (sin copiar datos) y las cambiadas se escriben completas; al final ese árbol pasa a ser una
+# versión nueva y BASE_DIR se cambia para apuntarla (ver abajo). Los lectores ven el árbol anterior
+# completo hasta el cambio, nunca uno a medio importar ni un BASE_DIR inexistente.
+# Mientras tanto se retienen los bloqueos de todas las regiones existentes.
+#
+# Solo la sincronización versiona el árbol: la primera vez BASE_DIR pasa a ser un enlace simbólico
+# a un directorio hermano (DB.v1, DB.v2, ...) y cada sincronización siguiente cambia de versión
+# creando un enlace temporal y renombrándolo sobre BASE_DIR con os.replace, que es atómico.
+# Apenas cambiado el enlace se borra la versión anterior: los lectores abren los archivos por
+# BASE_DIR, así que después del cambio ya no la usan. Alta, importación y demás operaciones
+# trabajan igual sobre un directorio real o sobre el enlace. Sin enlaces simbólicos se usa
+# un directorio común y se reemplaza con dos renombrados.
+
+SUFIJO_SINCRONIZACION = ".sincronizando"   # Árbol en preparación
+SUFIJO_ANTERIOR = ".anterior"              # Árbol reemplazado, se borra al terminar
+SUFIJO_VERSION = ".v"                      # Versiones del árbol: DB.v1, DB.v2, ...
+
+def _version_apuntada(base):
+    """Número de la versión a la que apunta el enlace base, o None si no es un enlace versionado."""
+    if not os.path.islink(base):
+        return None
+    numero = os.readlink(base).rpartition(SUFIJO_VERSION)[2]
+    return int(numero) if numero.isdigit() else None
+
+def _siguiente_version(base):
+    """Ruta libre para la próxima versión del árbol."""
+    numero = (_version_apuntada(base) or 0) + 1
+    while os.path.lexists(f"{base}{SUFIJO_VERSION}{numero}"):
+        numero += 1
+    return f"{base}{SUFIJO_VERSION}{numero}"
+
+def _borrar_versiones(base, conservar):
+    """Borra los directorios versionados de base que no están en 'conservar'."""
+    directorio = os.path.dirname(base) or os.curdir
+    prefijo = os.path.basename(base) + SUFIJO_VERSION
+    conservar = {os.path.basename(ruta) for ruta in conservar if ruta}
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            numero = entrada.name[len(prefijo):]
+            if entrada.name.startswith(prefijo) and numero.isdigit() and entrada.name not in conservar:
+                shutil.rmtree(entrada.path, ignore_errors=True)
+
+def _apuntar_base(ruta_version, base):
+    """
+    Hace que el enlace base apunte a ruta_version con un único os.replace y borra las demás
+    versiones. Devuelve False si no se pudo crear el enlace (sistema sin enlaces simbólicos).
+    """
+    temporal = f"{base}.enlace.{os.getpid()}"
+    try:
+        os.symlink(os.path.basename(ruta_version), temporal, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        return False
+    try:
+        try:
+            os.replace(temporal, base)
+        except IsADirectoryError:
+            # Un lector creó un BASE_DIR vacío mientras se convertía un árbol real: se descarta
+            os.rmdir(base)
+            os.replace(temporal, base)
+    except OSError:
+        os.remove(temporal)
+        raise
+    _borrar_versiones(base, (ruta_version,))
+    return True
+
+def _reemplazar_base(ruta_nueva, base=None):
+    """Pone el árbol ruta_nueva en lugar de base (BASE_DIR por defecto); ver el comentario de arriba."""
+    base = (base or BASE_DIR).rstrip(os.sep)
+    ruta_version = _siguiente_version(base)
+    os.rename(ruta_nueva, ruta_version)
+
+    ruta_anterior = None
+    if os.path.isdir(base) and not os.path.islink(base):
+        # Árbol real: se aparta (la única vez que BASE_DIR deja de existir por un momento)
+        ruta_anterior = base + SUFIJO_ANTERIOR
+        if os.path.exists(ruta_anterior):
+            shutil.rmtree(ruta_anterior)
+        os.rename(base, ruta_anterior)
+
+    if not _apuntar_base(ruta_version, base):
+        os.rename(ruta_version, base)
+    if ruta_anterior is not None:
+        shutil.rmtree(ruta_anterior)
+
+def vaciar_directorio_base(base=None):
+    """
+    Borra BASE_DIR con todo su contenido y lo recrea vacío, como directorio común.
+    Si una sincronización lo había dejado como enlace, se borran el enlace y sus versiones.
+    """
+    base = (base or BASE_DIR).rstrip(os.sep)
+    if os.path.islink(base):
+        os.remove(base)
+        _borrar_versiones(base, ())
+    elif os.path.exists(base):
+        shutil.rmtree(base)
+    os.makedirs(base)
+
+
+def _leer_origen_por_region(archivo_origen):
+    """
+    Lee el CSV de origen completo y agrupa sus filas por (Continente, Región), en el orden del archivo.
+    Las filas con formato inválido se informan y se omiten, igual que en la importación.
+    """
+    regiones = {}
+    with open(archivo_origen, 'r', newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            try:
+                clave = (fila['Continente'], fila['Region'])
+                item = {'Pais': fila['Pais'], 'Poblacion': int(fila['Poblacion']), 'Superficie': int(fila['Superficie'])}
+            except (ValueError, KeyError) as e:
+                print(f"Error en formato de fila: {fila}. Detalle: {e}")
+                continue
+            regiones.setdefault(clave, []).append(item)
+    return regiones
+
+def _estado_actual_por_region():
+    """Devuelve {(Continente, Región): ítems} con el contenido actual (log aplicado) de cada región."""
+    regiones = {}
+    if BACKEND is not None:
+        for item in BACKEND.leer_todo():
+            regiones.setdefault((item['Continente'], item['Region']), []).append(item)
+        return regiones
+
+    if os.path.isdir(BASE_DIR):
+        for ruta_csv, continente, region in _buscar_archivos_csv(BASE_DIR, []):
+            # Una región fragmentada aporta un archivo por fragmento
+            regiones.setdefault((continente, region), []).extend(_leer_archivo_csv(ruta_csv, continente, region))
+    return regiones
+
+def _comparar_region(actuales, nuevos):
+    """
+    Clasifica los países de una región por nombre: devuelve (insertados, actualizados, eliminados, intactos).
+    Con nombres repetidos se empareja la k-ésima aparición actual con la k-ésima nueva.
+    """
+    por_nombre = {}
+    for item in actuales:
+        por_nombre.setdefault(item['Pais'], []).append(_clave_fila(item['Pais'], item['Poblacion'], item['Superficie']))
+
+    insertados = actualizados = intactos = 0
+    for item in nuevos:
+        anteriores = por_nombre.get(item['Pais'])
+        if not anteriores:
+            insertados += 1
+        elif anteriores.pop(0) == _clave_fila(item['Pais'], item['Poblacion'], item['Superficie']):
+            intactos += 1
+        else:
+            actualizados += 1
+    eliminados = sum(len(restantes) for restantes in por_nombre.values())
+    return insertados, actualizados, eliminados, intactos
+
+def _misma_region(actuales, nuevos, fragmentada=False):
+    """
+    Indica si la región ya tiene exactamente las filas nuevas, en el mismo orden.
+    En una región fragmentada el orden entre fragmentos lo fija el reparto por nombre: basta con
+    que coincidan las filas.
+    """
+    if len(actuales) != len(nuevos):
+        return False
+    claves_actuales = [_clave_fila(a['Pais'], a['Poblacion'], a['Superficie']) for a in actuales]
+    claves_nuevas = [_clave_fila(n['Pais'], n['Poblacion'], n['Superficie']) for n in nuevos]
+    if fragmentada:
+        return collections.Counter(claves_actuales) == collections.Counter(claves_nuevas)
+    return claves_actuales == claves_nuevas
+
+def _enlazar_archivo(origen, destino):
+    """Crea un hardlink (o una copia, si el sistema de archivos no los admite)."""
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copy2(origen, destino)
+
+def _preparar_arbol_sincronizado(ruta_preparacion, origen, actuales, a_reescribir):
+    """
+    Arma en ruta_preparacion el árbol resultante: las regiones de origen que no están en a_reescribir
+    se enlazan tal cual desde BASE_DIR; las demás se escriben con su contenido nuevo y su resumen.
+    El Datos.lock de cada región existente también se enlaza, para que un proceso que espera
+    el bloqueo en el árbol anterior siga excluyendo a los que lo piden en el nuevo.
+    """
+    for continente, region in origen:
+        ruta_directorio = obtener_ruta_csv(continente, region)[0]
+        destino = os.path.join(ruta_preparacion, continente, *niveles_region(region))
+        os.makedirs(destino, exist_ok=True)
+
+        reescribir = (continente, region) in a_reescribir
+        if (continente, region) in actuales:
+            with os.scandir(ruta_directorio) as entradas:
+                for entrada in entradas:
+                    if entrada.is_file() and (not reescribir or entrada.name == NOMBRE_BLOQUEO):
+                        _enlazar_archivo(entrada.path, os.path.join(destino, entrada.name))
+
+        if reescribir:
+            # Se fragmenta desde cero según el tamaño del contenido nuevo
+            escribir_directorio_region(destino, origen[(continente, region)])
+
+def _reemplazar_arbol(ruta_preparacion):
+    """Pone el árbol preparado en lugar de BASE_DIR y borra el anterior."""
+    _reemplazar_base(ruta_preparacion)
+
+def sincronizar_datos(archivo_origen):
+    """
+    Importación incremental: deja la base igual al CSV de origen reescribiendo solo las regiones
+    que cambiaron y quitando las que ya no existen. Un país que cambia de región cuenta como
+    eliminado en una e insertado en la otra.
+    Devuelve {'insertados', 'actualizados', 'eliminados', 'intactos', 'regiones_reescritas',
+    'regiones_eliminadas', 'regiones_intactas'}, o None si no se pudo sincronizar.
+    """
+    if not os.path.exists(archivo_origen):
+        print(f"Error: El archivo '{archivo_origen}' no se encuentra.")
+        return None
+
+    inicio = time.perf_counter()
+    try:
+        origen = _leer_origen_por_region(archivo_origen)
+    except OSError as e:
+        print(f"Error al leer el archivo de origen '{archivo_origen}': {e}")
+        return None
+
+    conteo = {'insertados': 0, 'actualizados': 0, 'eliminados': 0, 'intactos': 0,
+              'regiones_reescritas': 0, 'regiones_eliminadas': 0, 'regiones_intactas': 0}
+    try:
+        with contextlib.ExitStack() as bloqueos:
+            # Nadie escribe en las regiones existentes entre la lectura y el reemplazo
+            if BACKEND is None and os.path.isdir(BASE_DIR):
+                for continente, region in sorted({(c, r) for _, c, r in _buscar_archivos_csv(BASE_DIR, [])}):
+                    bloqueos.enter_context(bloqueo_region(continente, region))
+            actuales = _estado_actual_por_region()
+
+            a_reescribir = set()
+            for clave, nuevos in origen.items():
+                existentes = actuales.get(clave, [])
+                insertados, actualizados, eliminados, intactos = _comparar_region(existentes, nuevos)
+                conteo['insertados'] += insertados
+                conteo['actualizados'] += actualizados
+                conteo['eliminados'] += eliminados
+                conteo['intactos'] += intactos
+                fragmentada = BACKEND is None and _cantidad_fragmentos(obtener_ruta_csv(*clave)[0]) > 1
+                if clave in actuales and _misma_region(existentes, nuevos, fragmentada):
+                    conteo['regiones_intactas'] += 1
+                else:
+                    a_reescribir.add(clave)
+            sobrantes = [clave for clave in actuales if clave not in origen]
+            conteo['eliminados'] += sum(len(actuales[clave]) for clave in sobrantes)
+            conteo['regiones_reescritas'] = len(a_reescribir)
+            conteo['regiones_eliminadas'] = len(sobrantes)
+
+            if BACKEND is not None:
+                # Otro backend: todas las regiones en un solo paso (una transacción en SQLite)
+                regiones = {clave: origen[clave] for clave in a_reescribir}
+                regiones.update((clave, []) for clave in sobrantes)
+                if regiones:
+                    BACKEND.reescribir_regiones(regiones)
+            elif a_reescribir or sobrantes or not os.path.isdir(BASE_DIR):
+                ruta_preparacion = BASE_DIR.rstrip(os.sep) + SUFIJO_SINCRONIZACION
+                if os.path.exists(ruta_preparacion):
+                    shutil.rmtree(ruta_preparacion) # Restos de una sincronización interrumpida
+                try:
+                    _preparar_arbol_sincronizado(ruta_preparacion, origen, actuales, a_reescribir)
+                    os.makedirs(ruta_preparacion, exist_ok=True)
+                    _reemplazar_arbol(ruta_preparacion)
+                except BaseException:
+                    shutil.rmtree(ruta_preparacion, ignore_errors=True)
+                    raise
+                # Las regiones enlazadas conservan su sello: la caché de carga las sigue reutilizando
+                directorios = {obtener_ruta_csv(c, r)[0] for c, r in a_reescribir.union(sobrantes)}
+                for ruta_csv in [ruta for ruta in _cache_carga if os.path.dirname(ruta) in directorios]:
+                    invalidar_cache(ruta_csv)
+    except OSError as e:
+        print(f"Error de sistema durante la sincronización: {e}")
+        return None
+
+    invalidar_ordenes()
+    duracion = time.perf_counter() - inicio
+    print(f"\nSincronización completada en {duracion:.3f} s.")
+    print(f"Países: {conteo['insertados']} insertados, {conteo['actualizados']} actualizados, "
+          f"{conteo['eliminados']} eliminados, {conteo['intactos']} sin cambios.")
+    print(f"Regiones: {conteo['regiones_reescritas']} reescritas, {conteo['regiones_eliminadas']} eliminadas, "
+          f"{conteo['regiones_intactas']} sin cambios.")
+    return conteo
+
+# Índices en Memoria
+
+def crear_item_memoria(lista_global, continente, region, pais, poblacion, superficie):
+    """
+    Crea el ítem en memoria con la misma forma que produce la carga:
+    RegistroPais si la lista es compacta, o diccionario con valores de texto si no.
+    """
+    if lista_global:
+        compacta = isinstance(lista_global[0], RegistroPais)
+    else:
+        compacta = CARGA_COMPACTA
+
+    if compacta:
+        return RegistroPais(pais, poblacion, superficie, continente, region)
+    return {
+        'Pais': pais,
+        'Poblacion': str(poblacion),
+        'Superficie': str(superficie),
+        'Continente': continente,
+        'Region': region
+    }
+
+def quitar_por_identidad(lista, item):
+    """
+    Elimina de la lista exactamente ese objeto (no otro ítem con los mismos valores).
+    Devuelve True si lo encontró.
+    """
+    for posicion, elemento in enumerate(lista):
+        if elemento is item:
+            del lista[posicion]
+            return True
+    return False
+
+def construir_indice(lista_global):
+    """
+    Construye los índices de la lista global:
+    'por_nombre' (nombre en minúsculas -> ítems) y 'por_region' ((Continente, Región) -> ítems).
+    Ambos conservan el orden de la lista, que coincide con el orden de cada Datos.csv.
+    """
+    indice = {'por_nombre': {}, 'por_region': {}}
+    for item in lista_global:
+        indexar_item(indice, item)
+    return indice
+
+def indexar_item(indice, item):
+    """Agrega un ítem a los índices de nombre y de partición."""
+    indice['por_nombre'].setdefault(item['Pais'].lower(), []).append(item)
+    indice['por_region'].setdefault((item['Continente'], item['Region']), []).append(item)
+
+def desindexar_item(indice, item):
+    """Quita un ítem de los índices de nombre y de partición, descartando las claves vacías."""
+    clave_nombre = item['Pais'].lower()
+    clave_region = (item['Continente'], item['Region'])
+
+    for tabla, clave in ((indice['por_nombre'], clave_nombre), (indice['por_region'], clave_region)):
+        items = tabla.get(clave)
+        if items is not None:
+            quitar_por_identidad(items, item)
+            if not items:
+                del tabla[clave]
+
+def renombrar_en_indice(indice, item, nombre_anterior):
+    """
+    Mueve un ítem ya renombrado a su nueva clave en el índice de nombres.
+    La partición no cambia, así que el ítem conserva su posición dentro de ella.
+    """
+    items = indice['por_nombre'].get(nombre_anterior.lower())
+    if items is not None:
+        quitar_por_identidad(items, item)
+        if not items:
+            del indice['por_nombre'][nombre_anterior.lower()]
+    indice['por_nombre'].setdefault(item['Pais'].lower(), []).append(item)
+
+def buscar_por_nombre(indice, nombre):
+    """
+    Devuelve el primer ítem cuyo nombre coincide (sin distinguir mayúsculas), o None.
+    Los homónimos se guardan en el orden de carga, igual que una búsqueda lineal.
+    """
+    items = indice['por_nombre'].get(nombre.lower())
+    return items[0] if items else None
+
+def items_de_region(indice, continente, region):
+    """Devuelve los ítems de la partición (Continente, Región) en el orden de su Datos.csv."""
+    return indice['por_region'].get((continente, region), [])
+
 
 # Funcionalidades Adicionales 
 
-def mostrar_items(lista_items):
+TAM_BLOQUE_SALIDA = 1000   # Filas formateadas que se acumulan antes de cada escritura
+CAMPOS_SALIDA = ['Pais', 'Poblacion', 'Superficie', 'Continente', 'Region'] # Columnas de las salidas CSV/JSON
+
+
+def _formatear_fila(item):
+    """Devuelve la línea de tabla de un ítem, con separadores de miles en los números."""
+    try:
+        # Formatea los números con separadores de miles
+        poblacion = f"{int(item['Poblacion']):,}"
+        superficie = f"{int(item['Superficie']):,}"
+    except (ValueError, TypeError):
+        # En caso de error, muestra 'N/A' o el valor original
+        poblacion = item.get('Poblacion', 'N/A')
+        superficie = item.get('Superficie', 'N/A')
+
+    return f"{item['Pais']:<20} {poblacion:<15} {superficie:<15} {item['Continente']:<15} {item['Region']:<15}"
+
+def _escribir_en_bloques(filas, formatear, salida):
+    """
+    Formatea las filas y las escribe de a TAM_BLOQUE_SALIDA por llamada a write().
+    Devuelve la cantidad de filas escritas.
+    """
+    cantidad = 0
+    bloque = []
+    for item in filas:
+        bloque.append(formatear(item))
+        cantidad += 1
+        if len(bloque) >= TAM_BLOQUE_SALIDA:
+            salida.write("\n".join(bloque) + "\n")
+            bloque.clear()
+    if bloque:
+        salida.write("\n".join(bloque) + "\n")
+    return cantidad
+
+def mostrar_items(lista_items, tam_pagina=None, desplazamiento=0, formato='tabla', salida=None, posicion=0):
     """
     Muestra la lista de ítems de forma clara y formateada.
     Formatea los números de Población y Superficie.
+    Acepta una lista o cualquier iterable (p. ej. iterar_todos_los_datos()), que se consume a medida
+    que se escribe. Con tam_pagina muestra solo esa cantidad desde 'desplazamiento'.
+    formato: 'tabla' (por defecto), 'csv' o 'jsonl' (sin formato de tabla, para otros programas).
+    Devuelve el cursor de la página siguiente, o None si no quedan ítems.
+    Con una lista el cursor es el desplazamiento siguiente. Con un iterador, la página siguiente se
+    pide pasando el mismo iterador con posicion=cursor: la posición es la cantidad de ítems que ya
+    se mostraron, y sirve para numerar la página y escribir la cabecera CSV una sola vez.
+    """
+    salida = salida if salida is not None else sys.stdout
+    es_lista = isinstance(lista_items, (list, tuple))
+    inicio = posicion + desplazamiento   # Posición absoluta del primer ítem de la página
+
+    # Selecciona la página sin copiar la lista completa
+    fin = None if tam_pagina is None else desplazamiento + tam_pagina
+    filas = itertools.islice(lista_items if lista_items is not None else [], desplazamiento, fin)
+
+    # Se adelanta el primer ítem para detectar una página vacía también en iterables
+    primero = next(filas, None)
+    if primero is None:
+        if formato == 'tabla' and inicio == 0:
+            salida.write("No hay ítems para mostrar.\n")
+        return None
+    filas = itertools.chain((primero,), filas)
+
+    if formato == 'csv':
+        writer = csv.writer(salida, lineterminator="\n")
+        if inicio == 0:
+            writer.writerow(CAMPOS_SALIDA)
+        cantidad = _escribir_en_bloques(filas, _linea_csv, salida)
+    elif formato == 'jsonl':
+        cantidad = _escribir_en_bloques(
+            filas,
+            lambda item: json.dumps({campo: item[campo] for campo in CAMPOS_SALIDA}, ensure_ascii=False),
+            salida
+        )
+    else:
+        salida.write("\n--- Listado Global de Países (Lectura Recursiva) ---\n")
+        # Imprime las cabeceras de la tabla
+        salida.write(f"{'País':<20} {'Población':<15} {'Superficie':<15} {'Continente':<15} {'Región':<15}\n")
+        salida.write("-" * 80 + "\n")
+        cantidad = _escribir_en_bloques(filas, _formatear_fila, salida)
+
+        salida.write("-" * 80 + "\n")
+        if tam_pagina is None:
+            salida.write(f"Total de ítems: {cantidad}\n")
+        else:
+            total = f" de {len(lista_items)}" if es_lista else ""
+            salida.write(f"Mostrando ítems {inicio + 1} a {inicio + cantidad}{total}\n")
+
+    salida.flush()
+
+    # Cursor de la página siguiente
+    if tam_pagina is None or cantidad < tam_pagina:
+        return None
+    if es_lista:
+        siguiente = desplazamiento + cantidad
+        return siguiente if siguiente < len(lista_items) else None
+    return inicio + cantidad
+
+def _linea_csv(item):
+    """Devuelve la línea CSV de un ítem (con las comillas que correspondan)."""
+    bloque = io.StringIO()
+    csv.writer(bloque, lineterminator="").writerow([item[campo] for campo in CAMPOS_SALIDA])
+    return bloque.getvalue()
+
+def mostrar_items_paginado(lista_items):
     """
-    if not lista_items:
-        print("No hay ítems para mostrar.")
+    Muestra los ítems de a una página por vez; Enter avanza y 'q' termina.
+    Acepta tanto la lista global como un iterador (la lectura avanza junto con las páginas).
+    """
+    tam_str = input("Tamaño de página (Enter = todo): ").strip()
+    if not (tam_str.isdigit() and int(tam_str) > 0):
+        mostrar_items(lista_items)
         return
 
-    print("\n--- Listado Global de Países (Lectura Recursiva) ---")
-    # Imprime las cabeceras de la tabla
-    print(f"{'País':<20} {'Población':<15} {'Superficie':<15} {'Continente':<15} {'Región':<15}")
-    print("-" * 80)
-    
-    for item in lista_items:
-        try:
-            # Formatea los números con separadores de miles
-            poblacion = f"{int(item['Poblacion']):,}"
-            superficie = f"{int(item['Superficie']):,}"
-        except (ValueError, TypeError):
-            # En caso de error, muestra 'N/A' o el valor original
-            poblacion = item.get('Poblacion', 'N/A')
-            superficie = item.get('Superficie', 'N/A')
+    tam_pagina = int(tam_str)
+    es_lista = isinstance(lista_items, (list, tuple))
+    fuente = pagina = lista_items if es_lista else iter(lista_items)
 
-        
-        # Imprime la fila de datos con alineación
-        print(f"{item['Pais']:<20} {poblacion:<15} {superficie:<15} {item['Continente']:<15} {item['Region']:<15}")
-    print("-" * 80)
-    print(f"Total de ítems: {len(lista_items)}")
+    cursor = 0
+    while cursor is not None:
+        if es_lista:
+            cursor = mostrar_items(lista_items, tam_pagina, cursor)
+        else:
+            # Con un iterador se continúa desde donde quedó: la posición solo numera la página
+            cursor = mostrar_items(pagina, tam_pagina, posicion=cursor)
+            if cursor is not None:
+                # Se adelanta un ítem: si la última página justo se completó, no se ofrece otra vacía
+                siguiente = next(fuente, None)
+                if siguiente is None:
+                    break
+                pagina = itertools.chain((siguiente,), fuente)
+        if cursor is None or input("Enter = página siguiente, q = salir: ").strip().lower() == 'q':
+            break
 
-def filtrar_items(lista_global):
+def _pedir_rango(nombre_campo):
     """
-    Permite filtrar la lista de países por 'Continente' o por 'Región'.
-    Realiza la búsqueda con coincidencia exacta e insensible a mayúsculas/minúsculas.
+    Solicita un rango numérico; dejar un extremo en blanco lo deja abierto.
+    Devuelve (minimo, maximo) o None si algún valor no es numérico.
     """
-    if not lista_global:
+    extremos = []
+    for extremo in ("mínima", "máxima"):
+        entrada = input(f"{nombre_campo} {extremo} (Enter = sin límite): ").strip()
+        if not entrada:
+            extremos.append(None)
+        elif entrada.isdigit():
+            extremos.append(int(entrada))
+        else:
+            print("Error: Debe ingresar un valor numérico entero.")
+            return None
+    return tuple(extremos)
+
+def _pedir_condicion():
+    """
+    Solicita al usuario una condición de filtrado y la devuelve como tupla (campo, operador, valor).
+    Devuelve None si la opción no es válida.
+    """
+    print("Filtrar por: 1. Continente 2. Región 3. Población (rango) 4. Superficie (rango) "
+          "5. País (empieza con) 6. País (contiene)")
+    op_filtro = input("Opción: ").strip()
+
+    if op_filtro in ('1', '2', '5', '6'):
+        termino_busqueda = input("Ingrese el término a buscar: ").strip().lower()
+        campo, operador = {
+            '1': ('Continente', '='),
+            '2': ('Region', '='),
+            '5': ('Pais', 'prefijo'),
+            '6': ('Pais', 'contiene'),
+        }[op_filtro]
+        return (campo, operador, termino_busqueda)
+
+    if op_filtro in ('3', '4'):
+        campo = 'Poblacion' if op_filtro == '3' else 'Superficie'
+        rango = _pedir_rango("Población" if op_filtro == '3' else "Superficie")
+        return (campo, 'entre', rango) if rango else None
+
+    print("Opción no válida.")
+    return None
+
+def filtrar_desde_disco(condiciones):
+    """
+    Resuelve las condiciones leyendo solo las particiones necesarias (sin carga global).
+    Las igualdades sobre Continente/Región podan directorios; el resto se evalúa sobre lo leído.
+    """
+    continente = next((v for c, op, v in condiciones if c == 'Continente' and op == '='), None)
+    region = next((v for c, op, v in condiciones if c == 'Region' and op == '='), None)
+
+    return consultas.filtrar_por_recorrido(obtener_datos_filtrados(continente, region), condiciones)
+
+def filtrar_items(lista_global, indices=None):
+    """
+    Permite filtrar la lista de países por 'Continente', 'Región', rangos de Población/Superficie
+    o por nombre (prefijo o subcadena). Las condiciones se pueden combinar (Y lógico).
+    Las igualdades son exactas e insensibles a mayúsculas/minúsculas.
+    Si se proveen los índices de consultas.py, se usan para no recorrer toda la lista.
+    Si lista_global es None, lee desde disco solo las carpetas que pueden cumplir el filtro.
+    """
+    if lista_global is not None and not lista_global:
         print("No hay datos para filtrar.")
         return
 
-    print("Filtrar por: 1. Continente 2. Región")
-    op_filtro = input("Opción: ").strip()
-    termino_busqueda = input("Ingrese el término a buscar: ").strip().lower()
-    
-    resultados = []
-    if op_filtro == '1':
-        clave_filtro = 'Continente'
-    elif op_filtro == '2':
-        clave_filtro = 'Region'
+    condiciones = []
+    while True:
+        condicion = _pedir_condicion()
+        if condicion is None:
+            return
+        condiciones.append(condicion)
+
+        if input("¿Agregar otra condición? (s/N): ").strip().lower() != 's':
+            break
+
+    if lista_global is None:
+        resultados = filtrar_desde_disco(condiciones)
+    elif indices is None:
+        # Sin índices prearmados, un único recorrido es más barato que construirlos
+        resultados = consultas.filtrar_por_recorrido(lista_global, condiciones)
     else:
-        print("Opción no válida.")
-        return
-        
-    for item in lista_global:
-        # Aplica el filtro (coincidencia de cadena completa en minúsculas)
-        if item.get(clave_filtro, '').lower() == termino_busqueda:
-            resultados.append(item)
+        resultados = consultas.consultar(indices, condiciones)
 
     if not resultados:
-        print(f"No se encontraron ítems para '{termino_busqueda}'.")
+        print(f"No se encontraron ítems para {consultas.describir_condiciones(condiciones)}.")
     else:
         print(f"\n--- Resultados del Filtro ({len(resultados)} encontrados) ---")
         mostrar_items(resultados)
@@ -271,46 +2037,47 @@ def filtrar_items(lista_global):
 
 def reescribir_archivo_csv_especifico(continente, region, items_del_archivo):
     """
-    Sobrescribe un archivo CSV individual (modo 'w') con una nueva lista de ítems.
-    Función auxiliar para la modificación y eliminación de datos.
+    Sobrescribe un archivo CSV individual (o la región en el backend activo) con una nueva lista de ítems.
+    Función auxiliar para la modificación y eliminación masiva de datos.
     """
+    if BACKEND is not None:
+        BACKEND.reescribir_region(continente, region, items_del_archivo)
+    else:
+        reescribir_region_csv(continente, region, items_del_archivo)
+
+def reescribir_region_csv(continente, region, items_del_archivo):
+    """
+    Reescribe los archivos de datos de la región: cada uno con un temporal que se renombra (atómico).
+    Los registros de cambios quedan absorbidos y se borran.
+    """
+    ruta_directorio = obtener_ruta_csv(continente, region)[0]
     try:
-        _, ruta_csv = obtener_ruta_csv(continente, region)
-        
-        # Abre el archivo en modo 'w' (write/sobrescribir)
-        with open(ruta_csv, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=HEADERS)
-            writer.writeheader() # Escribe siempre las cabeceras
-            
-            # Itera y escribe los ítems (solo los campos de HEADERS)
-            for item in items_del_archivo:
-                item_a_escribir = {
-                    'Pais': item['Pais'],
-                    'Poblacion': item['Poblacion'],
-                    'Superficie': item['Superficie']
-                }
-                writer.writerow(item_a_escribir)
+        # Una región nueva (p. ej. creada por un lote de altas) todavía no tiene carpeta
+        os.makedirs(ruta_directorio, exist_ok=True)
+
+        with bloqueo_region(continente, region):
+            escribir_directorio_region(ruta_directorio, items_del_archivo)
                 
     except OSError as e: 
-        print(f"Error al reescribir el archivo {ruta_csv}: {e}")
+        print(f"Error al reescribir la región {ruta_directorio}: {e}")
 
-def modificar_item(lista_global):
+def modificar_item(lista_global, indice=None):
     """
     Busca un país por nombre, solicita nuevos valores y actualiza el ítem.
-    Finalmente, reescribe el archivo CSV afectado con los datos actualizados.
+    Finalmente, registra el cambio en el log de su región (sin reescribir el Datos.csv).
+    Usa el índice (si se provee, y lo mantiene actualizado) para no recorrer la lista global.
     """
     if not lista_global:
         print("La lista está vacía. No se puede modificar.")
         return lista_global
+
+    if indice is None:
+        indice = construir_indice(lista_global)
         
     pais_a_modificar = input("Ingrese el nombre exacto del país a modificar: ").strip()
     
-    item_encontrado = None
     # Busca el ítem por nombre (comparación insensible a mayúsculas)
-    for item in lista_global:
-        if item['Pais'].lower() == pais_a_modificar.lower():
-            item_encontrado = item
-            break
+    item_encontrado = buscar_por_nombre(indice, pais_a_modificar)
             
     if not item_encontrado:
         print(f"Error: País '{pais_a_modificar}' no encontrado.")
@@ -323,78 +2090,98 @@ def modificar_item(lista_global):
     nueva_poblacion_str = input(f"Nueva población ({item_encontrado['Poblacion']}): ").strip()
     nueva_superficie_str = input(f"Nueva superficie ({item_encontrado['Superficie']}): ").strip()
 
+    # Valores actuales: identifican la fila dentro del Datos.csv en el registro de cambios
+    valores_anteriores = (item_encontrado['Pais'], item_encontrado['Poblacion'], item_encontrado['Superficie'])
     
+    nombre, poblacion, superficie = valores_anteriores
     if nuevo_pais:
-        item_encontrado['Pais'] = nuevo_pais
+        nombre = nuevo_pais
     if nueva_poblacion_str:
-        # Valida y asigna la nueva población si se ingresó un valor
-        item_encontrado['Poblacion'] = validar_numero_positivo(f"Confirme nueva población ({nueva_poblacion_str}): ")
+        # Valida la nueva población si se ingresó un valor
+        poblacion = validar_numero_positivo("Nueva población (numérico): ", nueva_poblacion_str)
     if nueva_superficie_str:
-        # Valida y asigna la nueva superficie si se ingresó un valor
-        item_encontrado['Superficie'] = validar_numero_positivo(f"Confirme nueva superficie ({nueva_superficie_str}): ")
-        
+        # Valida la nueva superficie si se ingresó un valor
+        superficie = validar_numero_positivo("Nueva superficie (numérico): ", nueva_superficie_str)
+    valores_nuevos = (nombre, poblacion, superficie)
 
-    continente_afectado = item_encontrado['Continente']
-    region_afectada = item_encontrado['Region']
-    
-    # Filtra todos los ítems que pertenecen al mismo CSV (Continente y Región)
-    items_para_el_archivo = [
-        i for i in lista_global 
-        if i['Continente'] == continente_afectado and i['Region'] == region_afectada
-    ]
-    
-    # Sobrescribe el archivo CSV específico con los datos actualizados
-    reescribir_archivo_csv_especifico(continente_afectado, region_afectada, items_para_el_archivo)
+    # Anexa la modificación al registro de cambios de la región (Continente y Región).
+    # Se guarda antes de tocar la memoria: si falla, la lista sigue igual que el disco
+    try:
+        registrar_cambio(item_encontrado['Continente'], item_encontrado['Region'], 'U', valores_anteriores, valores_nuevos)
+    except OSError as e:
+        print(f"Error al guardar la modificación de '{valores_anteriores[0]}': {e}")
+        return lista_global
+
+    item_encontrado['Pais'], item_encontrado['Poblacion'], item_encontrado['Superficie'] = valores_nuevos
+    if nuevo_pais:
+        # El nombre es clave del índice: se mueve el ítem a su nueva clave
+        renombrar_en_indice(indice, item_encontrado, valores_anteriores[0])
+    invalidar_ordenes()
     
     print(f"Éxito: País '{item_encontrado['Pais']}' modificado.")
     return lista_global
 
-def eliminar_item(lista_global):
+def eliminar_item(lista_global, indice=None):
     """
     Busca un país por nombre y lo elimina de la lista global.
-    Luego, reescribe el archivo CSV afectado para reflejar la eliminación.
+    Luego, registra la baja en el log de su región (sin reescribir el Datos.csv).
+    Usa el índice (si se provee, y lo mantiene actualizado) para no recorrer la lista global.
     """
     if not lista_global:
         print("La lista está vacía. No se puede eliminar.")
         return lista_global
 
+    if indice is None:
+        indice = construir_indice(lista_global)
+
     pais_a_eliminar = input("Ingrese el nombre exacto del país a eliminar: ").strip()
     
-    item_encontrado = None
     # Busca el ítem a eliminar
-    for item in lista_global:
-        if item['Pais'].lower() == pais_a_eliminar.lower():
-            item_encontrado = item
-            break
+    item_encontrado = buscar_por_nombre(indice, pais_a_eliminar)
             
     if not item_encontrado: 
         print(f"Error: País '{pais_a_eliminar}' no encontrado.")
         return lista_global
 
 
-    lista_global.remove(item_encontrado) # Elimina el ítem de la lista en memoria
-    
+    # Anexa la baja (marca de borrado) al registro de cambios de la región, antes de tocar la memoria
+    valores = (item_encontrado['Pais'], item_encontrado['Poblacion'], item_encontrado['Superficie'])
+    try:
+        registrar_cambio(item_encontrado['Continente'], item_encontrado['Region'], 'D', valores)
+    except OSError as e:
+        print(f"Error al guardar la baja de '{valores[0]}': {e}")
+        return lista_global
 
-    continente_afectado = item_encontrado['Continente']
-    region_afectada = item_encontrado['Region']
-    
-    # Filtra todos los ítems restantes del mismo CSV
-    items_para_el_archivo = [
-        i for i in lista_global 
-        if i['Continente'] == continente_afectado and i['Region'] == region_afectada
-    ]
-    
-    # Sobrescribe el archivo CSV afectado sin el ítem eliminado
-    reescribir_archivo_csv_especifico(continente_afectado, region_afectada, items_para_el_archivo)
+    # Elimina exactamente ese ítem de la lista en memoria y de los índices
+    quitar_por_identidad(lista_global, item_encontrado)
+    desindexar_item(indice, item_encontrado)
+    invalidar_ordenes()
     
     print(f"Éxito: País '{item_encontrado['Pais']}' eliminado.")
     return lista_global # Devuelve la lista actualizada
 
-def calcular_estadisticas(lista_global):
+def calcular_estadisticas(lista_global=None, verificar=False):
     """
     Calcula y muestra estadísticas básicas de la lista global:
     Conteo total, suma de población, promedio de población y conteo por continente.
+    Sin lista, las obtiene combinando los resúmenes agregados de cada región (sin cargar ítems).
+    Con verificar=True, antes compara los resúmenes con un recorrido completo.
     """
+    if verificar:
+        verificar_resumenes()
+
+    if lista_global is None:
+        estadisticas = estadisticas_desde_resumenes()
+        total_items = estadisticas['global']['cantidad']
+        suma_poblacion = estadisticas['global']['Poblacion']['suma']
+        conteo_por_continente = {c: r['cantidad'] for c, r in estadisticas['por_continente'].items()}
+
+        if not total_items:
+            print("No hay datos para calcular estadísticas.")
+            return
+        _imprimir_estadisticas(total_items, suma_poblacion, conteo_por_continente)
+        return
+
     if not lista_global:
         print("No hay datos para calcular estadísticas.")
         return
@@ -415,6 +2202,10 @@ def calcular_estadisticas(lista_global):
         # Conteo de países por cada continente
         conteo_por_continente[continente] = conteo_por_continente.get(continente, 0) + 1
 
+    _imprimir_estadisticas(total_items, suma_poblacion, conteo_por_continente)
+
+def _imprimir_estadisticas(total_items, suma_poblacion, conteo_por_continente):
+    """Muestra las estadísticas globales con el formato del menú."""
     # Calcula el promedio solo si hay ítems
     promedio_poblacion = (suma_poblacion / total_items) if total_items > 0 else 0
 
@@ -429,38 +2220,91 @@ def calcular_estadisticas(lista_global):
         print(f"- {continente}: {conteo} país(es)")
     print("-" * 30)
 
+# Rankings y Órdenes Cacheados
+
+# Criterios del menú de ordenamiento: opción -> (campo, descendente, título)
+CRITERIOS_ORDEN = {
+    '1': ('Pais', False, "Nombre (A-Z)"),
+    '2': ('Poblacion', True, "Población (Mayor a Menor)"),
+    '3': ('Poblacion', False, "Población (Menor a Mayor)"),
+    '4': ('Superficie', True, "Superficie (Mayor a Menor)"),
+    '5': ('Superficie', False, "Superficie (Menor a Mayor)"),
+}
+
+# (campo, descendente) -> (lista de origen, lista ordenada). Solo lo invalidan las mutaciones.
+_cache_ordenes = {}
+
+
+def invalidar_ordenes():
+    """Descarta los órdenes cacheados (se invoca en cada alta, modificación, baja o recarga)."""
+    _cache_ordenes.clear()
+
+def _clave_orden(campo):
+    """Devuelve la función clave del criterio: texto para 'Pais', entero para los campos numéricos."""
+    if campo == 'Pais':
+        return lambda item: item['Pais']
+
+    def clave_numerica(item):
+        valor = a_entero(item.get(campo, 0) or 0)
+        return valor if isinstance(valor, int) else 0
+    return clave_numerica
+
+def obtener_orden(lista_global, campo, descendente=False):
+    """
+    Devuelve la lista ordenada por el campo, reutilizando el orden cacheado si la lista
+    no cambió desde el último cálculo. El orden es estable, igual que sorted().
+    """
+    entrada = _cache_ordenes.get((campo, descendente))
+    if entrada is not None and entrada[0] is lista_global:
+        return entrada[1]
+
+    lista_ordenada = sorted(lista_global, key=_clave_orden(campo), reverse=descendente)
+    _cache_ordenes[(campo, descendente)] = (lista_global, lista_ordenada)
+    return lista_ordenada
+
+def top_n(lista_global, campo, cantidad, descendente=True):
+    """
+    Devuelve los primeros 'cantidad' ítems según el campo (los mayores si descendente=True).
+    Si hay un orden cacheado lo recorta; si no, usa selección por heap en O(n log k)
+    sin ordenar toda la lista. El resultado coincide con sorted(...)[:cantidad].
+    """
+    entrada = _cache_ordenes.get((campo, descendente))
+    if entrada is not None and entrada[0] is lista_global:
+        return entrada[1][:cantidad]
+
+    seleccionar = heapq.nlargest if descendente else heapq.nsmallest
+    return seleccionar(cantidad, lista_global, key=_clave_orden(campo))
+
 def ordenar_items(lista_global):
     """
     Ordena la lista de países según el criterio seleccionado por el usuario:
     1. Por País (alfabético)
-    2. Por Población (descendente)
+    2/3. Por Población (descendente/ascendente)
+    4/5. Por Superficie (descendente/ascendente)
+    Permite mostrar solo los primeros N sin ordenar ni imprimir toda la lista.
     """
     if not lista_global:
         print("No hay datos para ordenar.")
         return
 
     print("Seleccione criterio de ordenamiento:")
-    print("1. Por País (A-Z)")
-    print("2. Por Población (Mayor a Menor)")
+    for clave, (_, _, titulo) in CRITERIOS_ORDEN.items():
+        print(f"{clave}. Por {titulo}")
     opcion = input("Opción: ").strip()
 
-    lista_ordenada = []
-    
-    if opcion == '1':
-        # Ordena alfabéticamente por el campo 'Pais'
-        lista_ordenada = sorted(lista_global, key=lambda item: item['Pais'])
-        print("\n--- Países ordenados por Nombre (A-Z) ---")
-    elif opcion == '2':
-        # Ordena por 'Poblacion' (convirtiendo a int para un orden numérico) de forma descendente
-        lista_ordenada = sorted(
-            lista_global, 
-            key=lambda item: int(item.get('Poblacion', 0) or 0), 
-            reverse=True
-        )
-        print("\n--- Países ordenados por Población (Mayor a Menor) ---")
-    else:
+    if opcion not in CRITERIOS_ORDEN:
         print("Opción no válida.")
         return
+    campo, descendente, titulo = CRITERIOS_ORDEN[opcion]
+
+    cantidad_str = input("¿Cuántos mostrar? (Enter = todos): ").strip()
+    if cantidad_str.isdigit() and int(cantidad_str) > 0:
+        # Ranking: selección de los primeros N (sin orden completo ni impresión completa)
+        lista_ordenada = top_n(lista_global, campo, int(cantidad_str), descendente)
+        print(f"\n--- Top {len(lista_ordenada)} países por {titulo} ---")
+    else:
+        lista_ordenada = obtener_orden(lista_global, campo, descendente)
+        print(f"\n--- Países ordenados por {titulo} ---")
 
     # Muestra el resultado del ordenamiento
-    mostrar_items(lista_ordenada)
\ No newline at end of file
+    mostrar_items(lista_ordenada)
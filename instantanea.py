@@ -0,0 +1,467 @@
+import os
+import sys
+import json
+import zlib
+import struct
+import argparse
+import tempfile
+from array import array
+
+import funciones as fn
+
+
+# Instantánea Binaria de la Carga (DB.instantanea.bin)
+#
+# Guarda en un solo archivo, junto al árbol y fuera de él (BASE_DIR.instantanea.bin), los países ya
+# cargados, para no volver a parsear el texto de cada Datos.csv al iniciar. Hay un archivo por modo
+# de carga, así las cargas con diccionarios y las compactas no se invalidan entre sí:
+#
+#   DB.instantanea.bin           modo texto: Población y Superficie como tablas de texto (su valor exacto)
+#   DB.instantanea.compacta.bin  modo compacto: Población y Superficie como columnas int64 little-endian
+#
+#   cabecera  mágico (8 bytes), versión, modo, filas, crc32 del resto del archivo y el largo
+#             de cada sección
+#   catálogo  JSON: por archivo de datos, su ruta relativa a BASE_DIR, su sello
+#             (mtime_ns, tamaño, inodo y sello del log) y su cantidad de filas; más las excepciones
+#   nombres   los nombres de los países en orden de fila, UTF-8 separados por '\0'
+#   columnas  Población y Superficie, una sección tras otra (texto separado por '\0' o int64)
+#
+# Cada archivo del catálogo se usa solo si su sello coincide con el actual, igual que la caché de
+# carga de funciones.py: un archivo modificado se vuelve a parsear y el resto sale de la instantánea.
+# Las rutas son relativas a BASE_DIR, que apunta a la versión vigente del árbol: una sincronización
+# conserva el sello de las regiones que no cambiaron (se enlazan), y esas siguen saliendo de acá.
+# Los valores que no entran en su sección (un texto con '\0', o en modo compacto un número que no
+# es exactamente un int64) van a la lista de excepciones del catálogo con su valor original, así
+# la carga devuelve lo mismo que el CSV.
+
+MAGICO = b'PAISINS\x00'
+VERSION = 2
+SUFIJO_ARCHIVO = ".instantanea.bin"
+SUFIJO_ARCHIVO_COMPACTO = ".instantanea.compacta.bin"
+MODO_TEXTO = 0        # Escrita desde diccionarios: conserva el texto exacto de cada valor
+MODO_COMPACTO = 1     # Escrita desde RegistroPais: números como int64
+
+CABECERA = struct.Struct('<8sHHIIIIII')
+MINIMO_INT64, MAXIMO_INT64 = -2 ** 63, 2 ** 63 - 1
+CAMPOS = ('Pais',) + fn.CAMPOS_NUMERICOS
+
+
+def obtener_ruta_instantanea(base_dir=None, compacto=False):
+    """Devuelve la ruta de la instantánea del modo pedido, junto al árbol (BASE_DIR.instantanea.bin)."""
+    base = (base_dir or fn.BASE_DIR).rstrip(os.sep)
+    return base + (SUFIJO_ARCHIVO_COMPACTO if compacto else SUFIJO_ARCHIVO)
+
+def _columna_int64(datos=b''):
+    """Columna de enteros de 64 bits; los bytes se interpretan como little-endian."""
+    columna = array('q')
+    columna.frombytes(datos)
+    if sys.byteorder != 'little':
+        columna.byteswap()
+    return columna
+
+def _bytes_int64(columna):
+    """Devuelve los bytes little-endian de una columna de int64."""
+    if sys.byteorder != 'little':
+        columna = array('q', columna)
+        columna.byteswap()
+    return columna.tobytes()
+
+def _entero_representable(valor):
+    """
+    Devuelve el int que representa exactamente al valor (su texto, si es texto), o None.
+    El texto '007' o ' 7' no es representable: al volver a texto daría otro valor.
+    """
+    if type(valor) is int:
+        numero = valor
+    else:
+        try:
+            numero = int(valor)
+        except (ValueError, TypeError):
+            return None
+        if str(numero) != valor:
+            return None
+    return numero if MINIMO_INT64 <= numero <= MAXIMO_INT64 else None
+
+def _texto_representable(valor):
+    """Devuelve el valor si es texto que entra en una tabla separada por '\0', o None."""
+    return valor if type(valor) is str and '\0' not in valor else None
+
+def _tabla_texto(bloque, filas):
+    """Separa una tabla de texto (UTF-8, '\0' entre valores) en una lista de 'filas' valores."""
+    return bloque.decode('utf-8').split('\0') if filas else []
+
+
+# Escritura
+
+def guardar(cache, compacto=False, base_dir=None):
+    """
+    Escribe la instantánea del modo con las entradas de una caché de carga
+    ({ruta_csv: ((sello, compacto), ítems)}), como la que arma funciones.recargar_datos_incremental.
+    Se escribe en un temporal y se renombra. Devuelve la cantidad de filas guardadas, o None si no
+    se pudo escribir.
+    """
+    base_dir = base_dir or fn.BASE_DIR
+    archivos = []
+    excepciones = []
+    nombres = []
+    if compacto:
+        columnas = {'Poblacion': array('q'), 'Superficie': array('q')}
+        convertir, relleno = _entero_representable, 0
+    else:
+        columnas = {'Poblacion': [], 'Superficie': []}
+        convertir, relleno = _texto_representable, ''
+
+    for ruta_csv, ((sello, _), items) in cache.items():
+        archivos.append([os.path.relpath(ruta_csv, base_dir), sello, len(items)])
+        for item in items:
+            fila = len(nombres)
+            pais = item['Pais']
+            if _texto_representable(pais) is None:
+                nombres.append('')
+                excepciones.append([fila, 'Pais', pais])
+            else:
+                nombres.append(pais)
+            for campo, columna in columnas.items():
+                valor = convertir(item[campo])
+                if valor is None:
+                    columna.append(relleno)
+                    excepciones.append([fila, campo, item[campo]])
+                else:
+                    columna.append(valor)
+
+    catalogo = json.dumps({'archivos': archivos, 'excepciones': excepciones}, ensure_ascii=False).encode('utf-8')
+    if compacto:
+        secciones = [_bytes_int64(columna) for columna in columnas.values()]
+    else:
+        secciones = ['\0'.join(columna).encode('utf-8') for columna in columnas.values()]
+    cuerpo = [catalogo, '\0'.join(nombres).encode('utf-8'), *secciones]
+    crc = 0
+    for parte in cuerpo:
+        crc = zlib.crc32(parte, crc)
+    cabecera = CABECERA.pack(MAGICO, VERSION, MODO_COMPACTO if compacto else MODO_TEXTO,
+                             len(nombres), crc, *(len(parte) for parte in cuerpo))
+
+    ruta = obtener_ruta_instantanea(base_dir, compacto)
+    # Nombre temporal propio del proceso: dos procesos pueden guardar a la vez sin pisarse el temporal
+    ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(ruta_temporal, 'wb') as f:
+            f.write(cabecera)
+            for parte in cuerpo:
+                f.write(parte)
+        os.replace(ruta_temporal, ruta)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Error al guardar la instantánea {ruta}: {e}")
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        return None
+    return len(nombres)
+
+
+# Lectura
+
+def leer(base_dir=None, compacto=False):
+    """
+    Lee y valida la instantánea del modo (mágico, versión, modo, tamaños y crc32).
+    Devuelve (archivos del catálogo, excepciones, nombres, población, superficie), con las
+    columnas como listas de texto (modo texto) o arrays int64 (modo compacto),
+    o None si no existe o no es válida.
+    """
+    try:
+        with open(obtener_ruta_instantanea(base_dir, compacto), 'rb') as f:
+            datos = f.read()
+    except OSError:
+        return None
+    if len(datos) < CABECERA.size:
+        return None
+
+    magico, version, modo, filas, crc, *largos = CABECERA.unpack_from(datos)
+    if (magico != MAGICO or version != VERSION or modo != (MODO_COMPACTO if compacto else MODO_TEXTO)
+            or len(datos) != CABECERA.size + sum(largos)
+            or zlib.crc32(memoryview(datos)[CABECERA.size:]) != crc):
+        return None
+
+    secciones = []
+    inicio = CABECERA.size
+    for largo in largos:
+        secciones.append(datos[inicio:inicio + largo])
+        inicio += largo
+    bloque_catalogo, bloque_nombres, *bloques_columnas = secciones
+
+    try:
+        catalogo = json.loads(bloque_catalogo.decode('utf-8'))
+        nombres = _tabla_texto(bloque_nombres, filas)
+        if compacto:
+            columnas = [_columna_int64(bloque) for bloque in bloques_columnas]
+        else:
+            columnas = [_tabla_texto(bloque, filas) for bloque in bloques_columnas]
+    except ValueError:
+        return None
+    if (any(len(columna) != filas for columna in (nombres, *columnas))
+            or sum(archivo[2] for archivo in catalogo['archivos']) != filas):
+        return None
+    return (catalogo['archivos'], catalogo['excepciones'], nombres, *columnas)
+
+def _sello_desde_json(sello):
+    """Reconstruye el sello de funciones.sello_archivo (tuplas) a partir de su forma JSON (listas)."""
+    *estado, sello_log = sello
+    return (*estado, tuple(sello_log) if sello_log is not None else None)
+
+def cargar(cache, compacto=False, base_dir=None):
+    """
+    Agrega a la caché de carga una entrada por archivo del catálogo, con sus ítems ya armados
+    (diccionarios o RegistroPais). Las entradas llevan el sello guardado: la recarga incremental
+    reutiliza las que siguen vigentes y vuelve a parsear las demás.
+    Devuelve la cantidad de archivos agregados (0 si la instantánea del modo no existe o no es válida).
+    """
+    base_dir = base_dir or fn.BASE_DIR
+    contenido = leer(base_dir, compacto)
+    if contenido is None:
+        return 0
+    archivos, excepciones, nombres, poblacion, superficie = contenido
+
+    jerarquias = {}
+    todos = []
+    limites = []
+    for ruta_relativa, _, cantidad in archivos:
+        directorio = os.path.dirname(ruta_relativa)
+        if directorio not in jerarquias:
+            jerarquias[directorio] = fn.jerarquia_de_ruta(os.path.join(base_dir, directorio), base_dir)
+        continente, region = jerarquias[directorio]
+        inicio = len(todos)
+        fin = inicio + cantidad
+        if compacto:
+            # Las columnas ya son int: se evita la conversión de RegistroPais.__init__
+            continente, region = sys.intern(continente), sys.intern(region)
+            todos.extend(map(fn.RegistroPais.desde_convertidos, nombres[inicio:fin], poblacion[inicio:fin],
+                             superficie[inicio:fin], [continente] * cantidad, [region] * cantidad))
+        else:
+            todos.extend([{'Pais': pais, 'Poblacion': p, 'Superficie': s,
+                           'Continente': continente, 'Region': region}
+                          for pais, p, s in zip(nombres[inicio:fin], poblacion[inicio:fin], superficie[inicio:fin])])
+        limites.append((inicio, fin))
+
+    # Los valores que no entraron en su sección recuperan su valor original
+    for fila, campo, valor in excepciones:
+        todos[fila][campo] = valor
+
+    for (ruta_relativa, sello, _), (inicio, fin) in zip(archivos, limites):
+        cache[os.path.join(base_dir, ruta_relativa)] = ((_sello_desde_json(sello), compacto), todos[inicio:fin])
+    return len(archivos)
+
+def borrar(base_dir=None):
+    """Elimina las instantáneas de ambos modos, si existen. Devuelve True si había alguna."""
+    borradas = False
+    for compacto in (False, True):
+        ruta = obtener_ruta_instantanea(base_dir, compacto)
+        if os.path.exists(ruta):
+            os.remove(ruta)
+            borradas = True
+    return borradas
+
+
+# Activación
+
+class Instantanea:
+    """
+    Enlace que usa funciones.obtener_todos_los_datos (fn.INSTANTANEA) en el árbol CSV.
+    Sin base_dir sigue a fn.BASE_DIR en cada llamada.
+    """
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir
+
+    def cargar(self, cache, compacto=False):
+        return cargar(cache, compacto, self.base_dir)
+
+    def guardar(self, cache, compacto=False):
+        return guardar(cache, compacto, self.base_dir)
+
+def activar(base_dir=None):
+    """Hace que las cargas del árbol CSV lean y mantengan la instantánea."""
+    fn.INSTANTANEA = Instantanea(base_dir)
+    return fn.INSTANTANEA
+
+def desactivar():
+    """Vuelve a las cargas que parsean siempre los Datos.csv (la instantánea no se borra)."""
+    fn.INSTANTANEA = None
+
+
+# Verificación
+
+def _como_diccionarios(items):
+    """Lista de diccionarios comparables (los RegistroPais se convierten)."""
+    return [item.como_dict() if isinstance(item, fn.RegistroPais) else dict(item) for item in items]
+
+def comparar_con_csv(compacto=False):
+    """
+    Compara, en el árbol de BASE_DIR, la carga que sale completa de la instantánea con la
+    lectura recursiva directa de los CSV: mismas filas, mismos valores (y tipos) y mismo orden.
+    Antes guarda la instantánea si hace falta. Devuelve una lista de diferencias (vacía si coinciden).
+    """
+    diferencias = []
+    anterior = fn.INSTANTANEA
+    try:
+        fn.INSTANTANEA = Instantanea()
+        fn.obtener_todos_los_datos(compacto=compacto) # Escribe la instantánea si no está al día
+
+        cache = {}
+        cargados = cargar(cache, compacto)
+        desde_instantanea = fn.recargar_datos_incremental(compacto=compacto, cache=cache)
+        if fn.ESTADISTICAS_RECARGA['reparseados'] or fn.ESTADISTICAS_RECARGA['eliminados']:
+            diferencias.append(f"{fn.ESTADISTICAS_RECARGA['reparseados']} archivo(s) no salieron de la instantánea "
+                               f"({cargados} en el catálogo, {fn.ESTADISTICAS_RECARGA['eliminados']} sobrantes)")
+
+        fn.INSTANTANEA = None
+        directa = fn.leer_datos_recursivo(fn.BASE_DIR, compacto) if os.path.isdir(fn.BASE_DIR) else []
+    finally:
+        fn.INSTANTANEA = anterior
+
+    a, b = _como_diccionarios(desde_instantanea), _como_diccionarios(directa)
+    if len(a) != len(b):
+        diferencias.append(f"cantidad de filas: instantánea {len(a)}, CSV {len(b)}")
+    for posicion, (x, y) in enumerate(zip(a, b)):
+        if x != y or any(type(x[campo]) is not type(y[campo]) for campo in CAMPOS):
+            diferencias.append(f"fila {posicion}: instantánea {x!r}, CSV {y!r}")
+            break
+    return diferencias
+
+def verificar(origen=None, tam_fragmento=4096):
+    """
+    Comprueba que la carga desde la instantánea da las mismas filas que la carga desde los CSV,
+    en modo diccionario y compacto. Con 'origen' lo hace en un directorio temporal: importa ese
+    CSV (con fragmentos de tam_fragmento bytes) y repite la comparación después de una
+    modificación, una baja, un alta, un lote, un valor no numérico y una sincronización; también
+    comprueba que alternar cargas de ambos modos no vuelva a parsear. Sin 'origen' compara el
+    árbol actual (y le deja escritas las instantáneas). Imprime el resultado y devuelve True si todo coincide.
+    """
+    pasos = []
+
+    def comprobar(descripcion):
+        for compacto in (False, True):
+            diferencias = comparar_con_csv(compacto)
+            estado = "OK" if not diferencias else "; ".join(diferencias)
+            print(f"- {descripcion} ({'compacto' if compacto else 'diccionarios'}): {estado}")
+            pasos.append(not diferencias)
+
+    def comprobar_sin_reparseo(descripcion):
+        """Cargas alternadas en ambos modos: con las instantáneas al día ninguna vuelve a parsear."""
+        anterior = fn.INSTANTANEA
+        reparseados = 0
+        try:
+            fn.INSTANTANEA = Instantanea()
+            for compacto in (False, True, False, True):
+                fn.obtener_todos_los_datos(compacto=compacto)
+                reparseados += fn.ESTADISTICAS_RECARGA['reparseados']
+        finally:
+            fn.INSTANTANEA = anterior
+        print(f"- {descripcion}: " + ("OK" if not reparseados else f"{reparseados} archivo(s) reparseados"))
+        pasos.append(not reparseados)
+
+    if origen is None:
+        comprobar("árbol actual")
+        comprobar_sin_reparseo("cargas alternadas")
+    else:
+        origen = os.path.abspath(origen)
+        directorio_original = os.getcwd()
+        backend_original, base_original, tam_original = fn.BACKEND, fn.BASE_DIR, fn.TAM_MAXIMO_FRAGMENTO
+        with tempfile.TemporaryDirectory() as temporal:
+            os.chdir(temporal)
+            try:
+                fn.BACKEND, fn.BASE_DIR, fn.TAM_MAXIMO_FRAGMENTO = None, 'DB', tam_fragmento
+                fn.invalidar_cache()
+                fn.importar_datos_iniciales(origen)
+                comprobar("importación")
+
+                items = fn.obtener_todos_los_datos()
+                if len(items) >= 3:
+                    primero, segundo = items[0], items[1]
+                    fn.registrar_cambio(primero['Continente'], primero['Region'], 'U',
+                                        (primero['Pais'], primero['Poblacion'], primero['Superficie']),
+                                        (primero['Pais'] + " (mod)", '123', primero['Superficie']))
+                    comprobar("modificación")
+                    fn.registrar_cambio(segundo['Continente'], segundo['Region'], 'D',
+                                        (segundo['Pais'], segundo['Poblacion'], segundo['Superficie']))
+                    comprobar("baja")
+
+                fn.alta_item("Verificacion", "Sub/Nivel", "Instantanea", 7, 8)
+                comprobar("alta en una región de tres niveles")
+                fn.aplicar_cambios_region("Verificacion", "Sub/Nivel", [
+                    ['U', "Instantanea", '7', '8', "Instantanea", '9', '8'],
+                    ['A', "Instantanea 2", '1', '2'],
+                ])
+                comprobar("lote")
+                fn.registrar_cambio("Verificacion", "Sub/Nivel", 'U', ("Instantanea 2", '1', '2'),
+                                    ("Instantanea 2", '0042', 'N/A'))
+                comprobar("valores no representables")
+                comprobar_sin_reparseo("cargas alternadas")
+
+                # La sincronización reemplaza el árbol: las instantáneas, que están fuera de él, siguen sirviendo
+                fn.sincronizar_datos(origen)
+                comprobar("sincronización")
+                existen = all(os.path.exists(obtener_ruta_instantanea(compacto=c)) for c in (False, True))
+                print("- instantáneas fuera del árbol tras sincronizar: " + ("OK" if existen else "faltan"))
+                pasos.append(existen)
+            finally:
+                fn.BACKEND, fn.BASE_DIR, fn.TAM_MAXIMO_FRAGMENTO = backend_original, base_original, tam_original
+                os.chdir(directorio_original)
+                fn.invalidar_cache()
+
+    correcto = all(pasos)
+    print("Verificación de la instantánea: " + ("OK" if correcto else "con diferencias"))
+    return correcto
+
+
+def main(argumentos=None):
+    """Línea de comandos: guardar, ver, verificar o borrar la instantánea del árbol."""
+    parser = argparse.ArgumentParser(description="Instantánea binaria de los países cargados (arranque en frío).")
+    parser.add_argument('accion', choices=['guardar', 'info', 'verificar', 'borrar'])
+    parser.add_argument('--dir', default=fn.BASE_DIR, help="Directorio base del árbol")
+    parser.add_argument('--origen', help="Con 'verificar': CSV a importar en un directorio temporal")
+    parser.add_argument('--compacto', action='store_true', help="Con 'guardar': la instantánea de las cargas compactas")
+    args = parser.parse_args(argumentos)
+    fn.BASE_DIR = args.dir
+
+    if args.accion == 'verificar':
+        return 0 if verificar(args.origen) else 1
+
+    if args.accion == 'borrar':
+        print("Instantánea eliminada." if borrar() else "No había instantánea.")
+        return 0
+
+    if args.accion == 'guardar':
+        if not os.path.isdir(fn.BASE_DIR):
+            print(f"Error: El directorio base '{fn.BASE_DIR}' no existe.")
+            return 1
+        cache = {}
+        fn.recargar_datos_incremental(compacto=args.compacto, cache=cache)
+        filas = guardar(cache, args.compacto)
+        if filas is None:
+            return 1
+        print(f"Instantánea guardada: {filas} países de {len(cache)} archivo(s) "
+              f"en {obtener_ruta_instantanea(compacto=args.compacto)}.")
+        return 0
+
+    encontradas = 0
+    for compacto in (False, True):
+        modo = 'compacto' if compacto else 'texto'
+        contenido = leer(compacto=compacto)
+        if contenido is None:
+            print(f"Modo {modo}: no hay instantánea válida (falta, es de otra versión o está dañada).")
+            continue
+        encontradas += 1
+        archivos, excepciones, nombres, _, _ = contenido
+        vigentes = 0
+        for ruta_relativa, sello, _ in archivos:
+            try:
+                vigentes += fn.sello_archivo(os.path.join(fn.BASE_DIR, ruta_relativa)) == _sello_desde_json(sello)
+            except OSError:
+                pass
+        print(f"Modo {modo} (versión {VERSION}): {len(nombres)} países, "
+              f"{len(archivos)} archivo(s) ({vigentes} vigentes), {len(excepciones)} excepción(es), "
+              f"{os.path.getsize(obtener_ruta_instantanea(compacto=compacto))} bytes.")
+    return 0 if encontradas else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+import io
+import json
+import time
+import pstats
+import inspect
+import cProfile
+import functools
+import threading
+
+import funciones as fn
+
+
+# Instrumentación de Funciones (opcional)
+#
+# activar() reemplaza cada función de funciones.py por una envoltura que cuenta llamadas y mide
+# tiempo, archivos abiertos y bytes leídos/escritos; desactivar() restaura las originales.
+# Como las funciones del módulo se llaman entre sí por su nombre global, las llamadas internas
+# también pasan por las envolturas. Con la instrumentación apagada no queda ninguna envoltura,
+# así que el costo es nulo.
+#
+# Para contar archivos y bytes se reemplaza 'open' dentro del módulo por una versión que cuenta
+# a nivel de archivo crudo (bytes reales en disco, no caracteres). 'print' también se reemplaza
+# para medir el tiempo de salida por pantalla. Los accesos por mmap (binario.py) no se cuentan.
+# Las conversiones int() se reflejan en a_entero; las de la importación están dentro de
+# importar_datos_iniciales. Los contadores no se protegen con locks: con la carga en hilos las
+# cifras de bytes pueden ser aproximadas, y lo que ocurre en un pool de procesos no se ve.
+# La profundidad de recursión sí es propia de cada hilo, para que dos hilos dentro de la misma
+# función no se tomen por una llamada recursiva.
+
+PSEUDO_FUNCION_SALIDA = "(print)"   # Entrada del reporte con el tiempo de salida por pantalla
+
+_originales = {}        # nombre -> función original del módulo, mientras la instrumentación está activa
+_estadisticas = {}      # nombre -> {'llamadas', 'tiempo_s', 'archivos', 'bytes_leidos', 'bytes_escritos'}
+_profundidad = threading.local()   # .tabla: nombre -> llamadas en curso en el hilo (las recursivas no suman dos veces)
+_io = {'archivos': 0, 'bytes_leidos': 0, 'bytes_escritos': 0}   # Contadores globales de E/S
+
+
+def _entrada(nombre):
+    """Devuelve (creándola si hace falta) la entrada de estadísticas de una función."""
+    entrada = _estadisticas.get(nombre)
+    if entrada is None:
+        entrada = {'llamadas': 0, 'tiempo_s': 0.0, 'archivos': 0, 'bytes_leidos': 0, 'bytes_escritos': 0}
+        _estadisticas[nombre] = entrada
+    return entrada
+
+
+# Conteo de Archivos y Bytes
+
+class _ArchivoContado(io.FileIO):
+    """Archivo crudo que suma los bytes efectivamente leídos y escritos en los contadores globales."""
+
+    def readinto(self, b):
+        cantidad = super().readinto(b)
+        if cantidad:
+            _io['bytes_leidos'] += cantidad
+        return cantidad
+
+    def write(self, b):
+        cantidad = super().write(b)
+        if cantidad:
+            _io['bytes_escritos'] += cantidad
+        return cantidad
+
+def _abrir_contado(file, mode='r', buffering=-1, encoding=None, errors=None, newline=None, closefd=True, opener=None):
+    """Equivalente de open() que arma la misma pila de capas sobre un _ArchivoContado."""
+    crudo = _ArchivoContado(file, mode.replace('b', '').replace('t', ''), closefd=closefd, opener=opener)
+    _io['archivos'] += 1
+    if buffering == 0:
+        return crudo
+
+    tam = buffering if buffering > 0 else io.DEFAULT_BUFFER_SIZE
+    if '+' in mode:
+        con_buffer = io.BufferedRandom(crudo, tam)
+    elif 'r' in mode:
+        con_buffer = io.BufferedReader(crudo, tam)
+    else:
+        con_buffer = io.BufferedWriter(crudo, tam)
+
+    if 'b' in mode:
+        return con_buffer
+    return io.TextIOWrapper(con_buffer, encoding=encoding, errors=errors, newline=newline)
+
+def _print_medido(*args, **kwargs):
+    """print() que acumula llamadas y tiempo en la entrada de salida por pantalla."""
+    inicio = time.perf_counter()
+    print(*args, **kwargs)
+    entrada = _entrada(PSEUDO_FUNCION_SALIDA)
+    entrada['llamadas'] += 1
+    entrada['tiempo_s'] += time.perf_counter() - inicio
+
+
+# Envolturas
+
+def _envolver(nombre, funcion):
+    """
+    Devuelve la envoltura medida de una función. Tiempo y E/S son inclusivos (incluyen las
+    funciones llamadas) y solo se suman en la llamada más externa de una recursión.
+    """
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        entrada = _entrada(nombre)
+        entrada['llamadas'] += 1
+        profundidad = getattr(_profundidad, 'tabla', None)
+        if profundidad is None:
+            profundidad = _profundidad.tabla = {}
+        if profundidad.get(nombre):
+            profundidad[nombre] += 1
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                profundidad[nombre] -= 1
+
+        profundidad[nombre] = 1
+        io_inicial = dict(_io)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            entrada['tiempo_s'] += time.perf_counter() - inicio
+            for clave in _io:
+                entrada[clave] += _io[clave] - io_inicial[clave]
+            profundidad[nombre] -= 1
+
+    return envoltura
+
+def esta_activa():
+    """Indica si la instrumentación está activa."""
+    return bool(_originales)
+
+def activar():
+    """
+    Envuelve todas las funciones definidas en funciones.py (salvo los generadores, cuyo trabajo
+    ocurre al iterarlos y queda medido en las funciones que llaman) y reemplaza open y print.
+    """
+    if esta_activa():
+        return
+    for nombre, valor in list(vars(fn).items()):
+        if inspect.isfunction(valor) and valor.__module__ == fn.__name__ and not inspect.isgeneratorfunction(valor):
+            _originales[nombre] = valor
+            setattr(fn, nombre, _envolver(nombre, valor))
+    fn.open = _abrir_contado
+    fn.print = _print_medido
+
+def desactivar():
+    """Restaura las funciones originales y los open/print de builtins."""
+    for nombre, funcion in _originales.items():
+        setattr(fn, nombre, funcion)
+    _originales.clear()
+    for nombre in ('open', 'print'):
+        vars(fn).pop(nombre, None)
+
+def reiniciar():
+    """Pone en cero todos los contadores."""
+    _estadisticas.clear()
+    for clave in _io:
+        _io[clave] = 0
+
+
+# Reportes
+
+def obtener_reporte():
+    """Devuelve las estadísticas por función, ordenadas por tiempo total descendente."""
+    return dict(sorted(_estadisticas.items(), key=lambda par: par[1]['tiempo_s'], reverse=True))
+
+def mostrar_reporte(limite=25):
+    """Imprime las funciones con más tiempo acumulado."""
+    reporte = obtener_reporte()
+    if not reporte:
+        print("No hay mediciones. Active la instrumentación y ejecute alguna operación.")
+        return
+
+    print(f"\n--- Instrumentación (tiempos inclusivos, {len(reporte)} funciones) ---")
+    print(f"{'Función':<34} {'Llamadas':>9} {'Total ms':>11} {'Media ms':>10} {'Archivos':>9} {'KB leídos':>11} {'KB escritos':>12}")
+    print("-" * 101)
+    for nombre, e in list(reporte.items())[:limite]:
+        media = e['tiempo_s'] / e['llamadas'] * 1000 if e['llamadas'] else 0
+        print(f"{nombre:<34} {e['llamadas']:>9} {e['tiempo_s'] * 1000:>11.2f} {media:>10.3f} "
+              f"{e['archivos']:>9} {e['bytes_leidos'] / 1024:>11.1f} {e['bytes_escritos'] / 1024:>12.1f}")
+    print(f"\nTotales de E/S: {_io['archivos']} archivo(s) abiertos, "
+          f"{_io['bytes_leidos']:,} bytes leídos, {_io['bytes_escritos']:,} bytes escritos.")
+
+def exportar_json(ruta):
+    """Guarda el reporte y los totales de E/S en un archivo JSON."""
+    documento = {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'activa': esta_activa(),
+        'totales_io': dict(_io),
+        'funciones': obtener_reporte(),
+    }
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(documento, f, ensure_ascii=False, indent=2)
+
+
+# Perfilado con cProfile
+
+def perfilar(funcion, *args, ruta_salida=None, limite=25, **kwargs):
+    """
+    Ejecuta una única operación bajo cProfile e imprime las funciones con más tiempo acumulado.
+    Con ruta_salida guarda además el perfil en formato pstats (para snakeviz, pstats, etc.).
+    Devuelve el resultado de la operación.
+    """
+    perfil = cProfile.Profile()
+    resultado = perfil.runcall(funcion, *args, **kwargs)
+
+    if ruta_salida:
+        perfil.dump_stats(ruta_salida)
+    texto = io.StringIO()
+    pstats.Stats(perfil, stream=texto).sort_stats('cumulative').print_stats(limite)
+    print(texto.getvalue())
+    return resultado
+
+
+# Menú
+
+def menu_instrumentacion(lista_global=None):
+    """Submenú interactivo de la instrumentación (opción del menú principal)."""
+    estado = "activa" if esta_activa() else "inactiva"
+    print(f"\n--- Instrumentación ({estado}) ---")
+    print("1. Activar / desactivar")
+    print("2. Ver reporte")
+    print("3. Exportar reporte a JSON")
+    print("4. Reiniciar contadores")
+    print("5. Perfilar una operación con cProfile")
+    opcion = input("Opción: ").strip()
+
+    if opcion == '1':
+        if esta_activa():
+            desactivar()
+            print("Instrumentación desactivada.")
+        else:
+            activar()
+            print("Instrumentación activada: las próximas operaciones quedarán medidas.")
+    elif opcion == '2':
+        mostrar_reporte()
+    elif opcion == '3':
+        ruta = input("Archivo de destino (Enter = instrumentacion.json): ").strip() or "instrumentacion.json"
+        try:
+            exportar_json(ruta)
+            print(f"Reporte guardado en {ruta}.")
+        except OSError as e:
+            print(f"Error al guardar el reporte: {e}")
+    elif opcion == '4':
+        reiniciar()
+        print("Contadores reiniciados.")
+    elif opcion == '5':
+        operaciones = {
+            '1': ("Carga completa", fn.obtener_todos_los_datos),
+            '2': ("Estadísticas (resúmenes)", fn.estadisticas_desde_resumenes),
+        }
+        if lista_global:
+            operaciones['3'] = ("Orden por población", lambda: fn.obtener_orden(lista_global, 'Poblacion', True))
+        for clave, (titulo, _) in operaciones.items():
+            print(f"  {clave}. {titulo}")
+        eleccion = operaciones.get(input("Operación: ").strip())
+        if eleccion is None:
+            print("Opción no válida.")
+            return
+        fn.invalidar_ordenes()
+        ruta = input("Guardar perfil en (Enter = no guardar): ").strip() or None
+        perfilar(eleccion[1], ruta_salida=ruta)
+    else:
+        print("Opción no válida.")
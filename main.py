@@ -1,4 +1,11 @@
+import sys
+
 import funciones as fn
+import consultas
+import analitica
+import almacenamiento
+import comandos
+import instrumentacion
 
 def mostrar_menu():
     """Imprime el menú de opciones en pantalla."""
@@ -8,18 +15,27 @@ def mostrar_menu():
     print(" 2. Alta de nuevo país (Crear)")
     print("\nOperaciones de Consulta (Usan Lectura Recursiva):")
     print(" 3. Mostrar todos los países (Lectura Global)")
-    print(" 4. Filtrar países (Por Continente o Región)")
+    print(" 4. Filtrar países (Continente, Región, rangos o nombre)")
     print(" 5. Modificar país (Actualizar)")
     print(" 6. Eliminar país (Borrar)")
-    print(" 7. Ordenar países (Por Nombre o Población)")
+    print(" 7. Ordenar países (Nombre, Población o Superficie; Top N)")
     print(" 8. Ver Estadísticas Globales")
+    print(" 9. Análisis por grupo (percentiles y densidad)")
+    print("10. Instrumentación y perfilado")
     print("\n 0. Salir")
     print("-------------------------------------------------")
 
 def main():
     """Función principal que maneja el bucle del menú."""
     
+    # Backend de almacenamiento: árbol CSV (por defecto), SQLite o binario (PAISES_BACKEND / PAISES_DB)
+    almacenamiento.configurar_desde_entorno()
+    if fn.BACKEND is not None:
+        print(f"Usando almacenamiento: {fn.BACKEND.nombre}")
+
     lista_global_memoria = None
+    indice_memoria = None
+    indices_consulta = None  # Índices secundarios del filtro; se arman al primer uso
     datos_necesitan_recarga = True 
 
     while True:
@@ -27,16 +43,27 @@ def main():
         opcion = input("Seleccione una opción: ").strip()
 
         # (Cumple Fase 3 - Carga centralizada recursiva)
-        if opcion in ['3', '4', '5', '6', '7', '8'] and datos_necesitan_recarga:
+        # El filtro (4) no fuerza la carga global: si no hay datos en memoria lee solo las particiones necesarias.
+        # Las estadísticas (8) se obtienen de los resúmenes agregados de cada región, sin cargar ítems.
+        # El listado (3) tampoco: sin datos en memoria se muestra a medida que se leen los archivos.
+        if opcion in ['5', '6', '7', '9'] and datos_necesitan_recarga:
             print("\nCargando datos desde la estructura de carpetas (recursivo)...")
-            lista_global_memoria = fn.obtener_todos_los_datos()
+            # La caché de carga reutiliza los archivos que no cambiaron desde la última lectura
+            lista_global_memoria = fn.obtener_todos_los_datos(usar_cache=True)
+            # Índice por nombre y por partición para modificar/eliminar sin recorrer la lista
+            indice_memoria = fn.construir_indice(lista_global_memoria)
+            indices_consulta = None
             datos_necesitan_recarga = False
-            if not lista_global_memoria and opcion != '3':
+            if not lista_global_memoria:
                 print("No se encontraron datos. Intente 'Importar' o 'Dar de Alta' primero.")
 
 
         if opcion == '1':
-            fn.importar_datos_iniciales('paises.csv')
+            modo = input("¿Reemplazar toda la base (R) o sincronizar solo los cambios (S)? [R]: ").strip().lower()
+            if modo == 's':
+                fn.sincronizar_datos('paises.csv')
+            else:
+                fn.importar_datos_iniciales('paises.csv')
             datos_necesitan_recarga = True 
         
         elif opcion == '2':
@@ -53,19 +80,29 @@ def main():
 
         elif opcion == '3':
             # (Cumple Fase 3 - Mostrar)
-            fn.mostrar_items(lista_global_memoria)
+            if datos_necesitan_recarga:
+                fn.mostrar_items_paginado(fn.iterar_todos_los_datos())
+            else:
+                fn.mostrar_items_paginado(lista_global_memoria)
 
         elif opcion == '4':
             # (Cumple Fase 3 - Filtrado)
-            fn.filtrar_items(lista_global_memoria)
+            if datos_necesitan_recarga:
+                fn.filtrar_items(None)
+            else:
+                if indices_consulta is None and lista_global_memoria:
+                    indices_consulta = consultas.construir_indices_consulta(lista_global_memoria)
+                fn.filtrar_items(lista_global_memoria, indices_consulta)
 
         elif opcion == '5':
             # (Cumple Fase 3 - Modificar)
-            lista_global_memoria = fn.modificar_item(lista_global_memoria)
+            lista_global_memoria = fn.modificar_item(lista_global_memoria, indice_memoria)
+            indices_consulta = None  # Los valores cambiaron: los índices secundarios quedan obsoletos
             
         elif opcion == '6':
             # (Cumple Fase 3 - Eliminar)
-            lista_global_memoria = fn.eliminar_item(lista_global_memoria)
+            lista_global_memoria = fn.eliminar_item(lista_global_memoria, indice_memoria)
+            indices_consulta = None  # Las posiciones cambiaron: los índices secundarios quedan obsoletos
 
         elif opcion == '7':
             # (Cumple Fase 3 - Adicionales)
@@ -73,7 +110,13 @@ def main():
 
         elif opcion == '8':
             # (Cumple Fase 3 - Adicionales)
-            fn.calcular_estadisticas(lista_global_memoria)
+            fn.calcular_estadisticas()
+
+        elif opcion == '9':
+            analitica.mostrar_analisis(lista_global_memoria)
+
+        elif opcion == '10':
+            instrumentacion.menu_instrumentacion(lista_global_memoria)
 
         elif opcion == '0':
             print("Saliendo del programa...")
@@ -87,4 +130,7 @@ def main():
 
 # --- Punto de entrada estándar de Python ---
 if __name__ == "__main__":
+    # Con argumentos se usa el modo de comandos (no interactivo); sin ellos, el menú
+    if len(sys.argv) > 1:
+        sys.exit(comandos.main(sys.argv[1:]))
     main()
\ No newline at end of file
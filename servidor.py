@@ -0,0 +1,405 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import asyncio
+import argparse
+from functools import partial
+
+import funciones as fn
+import consultas
+import comandos
+import almacenamiento
+
+
+# Servidor de Consultas en Memoria (socket Unix)
+#
+# 'python servidor.py iniciar' carga la jerarquía una sola vez, arma los índices y atiende
+# peticiones por un socket Unix local hasta recibir Ctrl+C (o la operación 'detener').
+# El protocolo es JSON por líneas: cada petición es un objeto en una línea y cada respuesta
+# también, en el mismo orden. Una conexión puede enviar tantas peticiones como quiera.
+#
+#   {"op": "buscar", "pais": "Chile"}
+#   {"op": "filtrar", "condiciones": [["Continente", "=", "America"], ["Poblacion", "entre", [1000000, null]]], "limite": 50}
+#   {"op": "ordenar", "campo": "Poblacion", "descendente": true, "cantidad": 10}
+#   {"op": "estadisticas"}
+#   {"op": "lote", "operaciones": [{"op": "modificar", "pais": "Chile", "poblacion": 19500000}]}
+#   {"op": "alta" | "modificar" | "eliminar", ...}    (mismos campos que una línea de 'lote')
+#   {"op": "recargar"} / {"op": "ping"} / {"op": "detener"}
+#
+# Respuesta: {"ok": true, "resultado": ...} o {"ok": false, "error": "mensaje"}.
+# Las mutaciones se escriben en los Datos.csv (o el backend activo) antes de responder, con los
+# mismos bloqueos por región que el resto del programa. Las consultas se resuelven en el hilo del
+# bucle asyncio (tardan micro o milisegundos). Una mutación se aplica en memoria también en ese
+# hilo, así ninguna lectura la ve a medias, y se escribe en disco desde un hilo del executor: esperar
+# el bloqueo de una región tomada por otro proceso, o el fsync, no frena a los demás clientes.
+# Mutaciones y recargas se turnan con un asyncio.Lock, en orden de llegada; entre que una mutación
+# se aplica en memoria y se escribe, las consultas ya la ven. Si la escritura falla, la respuesta
+# es un error y la memoria se vuelve a leer del disco, así no queda un cambio que no se guardó.
+# Los cambios hechos por otros procesos no se ven hasta pedir 'recargar'.
+
+RUTA_SOCKET_POR_DEFECTO = "paises.sock"
+LIMITE_POR_DEFECTO = 1000          # Ítems devueltos como máximo por 'filtrar' si la petición no indica 'limite'
+TAM_MAXIMO_PETICION = 16 * 1024 * 1024   # Bytes por línea (un lote grande viaja en una sola petición)
+OPERACIONES_CON_ESCRITURA = ('lote', 'alta', 'modificar', 'eliminar', 'recargar')   # Van al executor
+
+
+def _serializar(item):
+    """Convierte un ítem en un diccionario JSON con los números como enteros."""
+    fila = {campo: item.get(campo) for campo in fn.CAMPOS_SALIDA}
+    for campo in fn.CAMPOS_NUMERICOS:
+        fila[campo] = fn.a_entero(fila[campo])
+    return fila
+
+def _condiciones_desde_json(lista):
+    """Convierte las condiciones [campo, operador, valor] del protocolo en tuplas de consultas.py."""
+    if not isinstance(lista, list):
+        raise ValueError("'condiciones' debe ser una lista de [campo, operador, valor].")
+    condiciones = []
+    for condicion in lista:
+        if not isinstance(condicion, list) or len(condicion) != 3:
+            raise ValueError(f"Condición inválida: {condicion!r}.")
+        campo, operador, valor = condicion
+        if operador == 'entre':
+            if not isinstance(valor, list) or len(valor) != 2:
+                raise ValueError("El valor de 'entre' debe ser [mínimo, máximo] (null deja el extremo abierto).")
+            valor = tuple(valor)
+        elif operador not in ('=', 'prefijo', 'contiene'):
+            raise ValueError(f"Operador no soportado: {operador!r}.")
+        condiciones.append((campo, operador, valor))
+    return condiciones
+
+
+class ServidorConsultas:
+    """Datos en memoria con sus índices, y las operaciones del protocolo sobre ellos."""
+
+    def __init__(self):
+        self.lista = []
+        self.indice = None
+        self.indices_consulta = None   # Índices secundarios del filtro; se arman al primer uso
+        self.estadisticas_cacheadas = None
+        self.cerrojo_escritura = asyncio.Lock()   # Turna mutaciones y recargas de atender_async
+        self.recargar()
+
+    @staticmethod
+    def _cargar(descartar_cache=False):
+        """
+        Lee la jerarquía y arma su índice (la caché de carga solo reparsea los archivos que cambiaron).
+        Tras una escritura fallida se descarta la caché: sus ítems son los mismos objetos que la
+        mutación ya modificó en memoria, y el archivo no cambió como para reparsearlo.
+        """
+        if descartar_cache:
+            fn.invalidar_cache()
+        lista = fn.obtener_todos_los_datos(usar_cache=True)
+        return lista, fn.construir_indice(lista)
+
+    def _instalar(self, lista, indice):
+        self.lista = lista
+        self.indice = indice
+        self._invalidar()
+        return {'cantidad': len(self.lista)}
+
+    def recargar(self):
+        """Vuelve a leer la jerarquía."""
+        return self._instalar(*self._cargar())
+
+    def _invalidar(self):
+        """Descarta todo lo derivado de los datos (se llama tras cada mutación o recarga)."""
+        self.indices_consulta = None
+        self.estadisticas_cacheadas = None
+        fn.invalidar_ordenes()
+
+    def _indices(self):
+        if self.indices_consulta is None:
+            self.indices_consulta = consultas.construir_indices_consulta(self.lista)
+        return self.indices_consulta
+
+    def buscar(self, peticion):
+        item = fn.buscar_por_nombre(self.indice, comandos.texto_requerido(peticion, 'pais'))
+        return _serializar(item) if item is not None else None
+
+    def filtrar(self, peticion):
+        condiciones = _condiciones_desde_json(peticion.get('condiciones', []))
+        limite = peticion.get('limite', LIMITE_POR_DEFECTO)
+        if not isinstance(limite, int) or limite < 0:
+            raise ValueError("'limite' debe ser un entero no negativo.")
+        resultados = consultas.consultar(self._indices(), condiciones)
+        return {'total': len(resultados), 'items': [_serializar(item) for item in resultados[:limite]]}
+
+    def ordenar(self, peticion):
+        campo = peticion.get('campo', 'Pais')
+        if campo not in fn.HEADERS:
+            raise ValueError(f"Campo de orden inválido: {campo!r}.")
+        descendente = bool(peticion.get('descendente', False))
+        cantidad = peticion.get('cantidad', LIMITE_POR_DEFECTO)
+        if not isinstance(cantidad, int) or cantidad < 0:
+            raise ValueError("'cantidad' debe ser un entero no negativo.")
+        # El orden completo se calcula una vez y queda cacheado hasta la próxima mutación
+        return [_serializar(item) for item in fn.obtener_orden(self.lista, campo, descendente)[:cantidad]]
+
+    def estadisticas(self, peticion):
+        if self.estadisticas_cacheadas is not None:
+            return self.estadisticas_cacheadas
+        suma_poblacion = 0
+        por_continente = {}
+        for item in self.lista:
+            poblacion = fn.a_entero(item['Poblacion'])
+            if isinstance(poblacion, int):
+                suma_poblacion += poblacion
+            por_continente[item['Continente']] = por_continente.get(item['Continente'], 0) + 1
+        cantidad = len(self.lista)
+        self.estadisticas_cacheadas = {'cantidad': cantidad, 'poblacion_total': suma_poblacion,
+                                       'poblacion_promedio': suma_poblacion / cantidad if cantidad else 0,
+                                       'por_continente': por_continente}
+        return self.estadisticas_cacheadas
+
+    def _preparar_mutacion(self, peticion):
+        """
+        Aplica en memoria un 'lote' o una mutación suelta (alta / modificar / eliminar, que es un
+        lote de una operación). Devuelve (cambios por región, resultado de la respuesta).
+        """
+        if peticion.get('op') == 'lote':
+            operaciones = peticion.get('operaciones')
+            if not isinstance(operaciones, list):
+                raise ValueError("'operaciones' debe ser una lista.")
+        else:
+            operaciones = [peticion]
+        cambios, aplicadas, errores = comandos.preparar_lote(operaciones, self.lista, self.indice)
+        if aplicadas:
+            self._invalidar()   # Las posiciones o los valores cambiaron
+        if peticion.get('op') != 'lote' and errores:
+            raise ValueError(errores[0][1])
+        return cambios, {'aplicadas': aplicadas, 'regiones': len(cambios),
+                         'errores': [[numero, mensaje] for numero, mensaje in errores]}
+
+    def mutacion(self, peticion):
+        """Aplica y escribe una mutación en el hilo actual (atender_async escribe en el executor)."""
+        cambios, resultado = self._preparar_mutacion(peticion)
+        try:
+            comandos.persistir_lote(cambios)
+        except Exception:
+            # Lo que quedó en disco manda: la memoria se relee para no diferir de él
+            self._instalar(*self._cargar(descartar_cache=True))
+            raise
+        return resultado
+
+    def atender(self, peticion):
+        """Resuelve una petición y devuelve la respuesta del protocolo."""
+        if not isinstance(peticion, dict):
+            return {'ok': False, 'error': "La petición debe ser un objeto JSON."}
+
+        operaciones = {
+            'ping': lambda p: 'pong',
+            'buscar': self.buscar,
+            'filtrar': self.filtrar,
+            'ordenar': self.ordenar,
+            'estadisticas': self.estadisticas,
+            'lote': self.mutacion,
+            'alta': self.mutacion,
+            'modificar': self.mutacion,
+            'eliminar': self.mutacion,
+            'recargar': lambda p: self.recargar(),
+        }
+        operacion = operaciones.get(peticion.get('op'))
+        if operacion is None:
+            return {'ok': False, 'error': f"Operación desconocida: {peticion.get('op')!r}."}
+        try:
+            return {'ok': True, 'resultado': operacion(peticion)}
+        except Exception as e:
+            # Cualquier petición mal formada se informa al cliente; la conexión sigue abierta
+            return {'ok': False, 'error': str(e) or type(e).__name__}
+
+    async def atender_async(self, peticion):
+        """
+        Como atender, pero las mutaciones y recargas esperan su turno en cerrojo_escritura y hacen
+        lo que bloquea (bloqueos de región, escrituras, lectura del disco) en el executor.
+        """
+        if not isinstance(peticion, dict) or peticion.get('op') not in OPERACIONES_CON_ESCRITURA:
+            return self.atender(peticion)
+
+        bucle = asyncio.get_running_loop()
+        async with self.cerrojo_escritura:
+            try:
+                if peticion['op'] == 'recargar':
+                    resultado = self._instalar(*await bucle.run_in_executor(None, self._cargar))
+                else:
+                    cambios, resultado = self._preparar_mutacion(peticion)
+                    try:
+                        await bucle.run_in_executor(None, partial(comandos.persistir_lote, cambios))
+                    except Exception:
+                        # Como en mutacion: si la escritura falla, la memoria vuelve a lo que hay en disco
+                        self._instalar(*await bucle.run_in_executor(None, partial(self._cargar, True)))
+                        raise
+                return {'ok': True, 'resultado': resultado}
+            except Exception as e:
+                return {'ok': False, 'error': str(e) or type(e).__name__}
+
+
+# Bucle asyncio
+
+async def _atender_conexion(servidor, detener, lector, escritor):
+    """Atiende las peticiones de una conexión, una línea por vez, hasta que el cliente cierre."""
+    try:
+        while True:
+            try:
+                linea = await lector.readline()
+            except ValueError:
+                respuesta = {'ok': False, 'error': f"Petición demasiado grande (máximo {TAM_MAXIMO_PETICION} bytes)."}
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+                break
+            if not linea:
+                break
+            if not linea.strip():
+                continue
+
+            try:
+                peticion = json.loads(linea)
+            except json.JSONDecodeError as e:
+                respuesta = {'ok': False, 'error': f"JSON inválido: {e}"}
+            else:
+                if isinstance(peticion, dict) and peticion.get('op') == 'detener':
+                    respuesta = {'ok': True, 'resultado': 'detenido'}
+                    detener.set()
+                else:
+                    respuesta = await servidor.atender_async(peticion)
+
+            escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+            await escritor.drain()
+    except ConnectionError:
+        pass # El cliente se desconectó a mitad de una respuesta
+    except asyncio.CancelledError:
+        pass # Conexión abierta al detener el servidor: se cierra sin más
+    finally:
+        escritor.close()
+
+def _socket_en_uso(ruta_socket):
+    """Indica si hay un servidor escuchando en la ruta (un archivo sobrante de una caída no cuenta)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as prueba:
+        try:
+            prueba.connect(ruta_socket)
+            return True
+        except OSError:
+            return False
+
+async def servir(ruta_socket=RUTA_SOCKET_POR_DEFECTO):
+    """Carga los datos y atiende conexiones en el socket Unix hasta recibir 'detener' o una señal."""
+    if os.path.exists(ruta_socket):
+        if _socket_en_uso(ruta_socket):
+            raise OSError(f"Ya hay un servidor escuchando en {ruta_socket}.")
+        os.remove(ruta_socket)
+
+    inicio = time.perf_counter()
+    servidor = ServidorConsultas()
+    print(f"{len(servidor.lista)} países cargados en {time.perf_counter() - inicio:.2f} s.")
+
+    detener = asyncio.Event()
+    bucle = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            bucle.add_signal_handler(senal, detener.set)
+        except (NotImplementedError, RuntimeError):
+            pass # Sin manejo de señales (p. ej. fuera del hilo principal): solo 'detener' o Ctrl+C
+
+    servidor_unix = await asyncio.start_unix_server(
+        lambda lector, escritor: _atender_conexion(servidor, detener, lector, escritor),
+        path=ruta_socket, limit=TAM_MAXIMO_PETICION)
+    print(f"Escuchando en {ruta_socket} (Ctrl+C para detener).")
+    try:
+        async with servidor_unix:
+            await detener.wait()
+    finally:
+        if os.path.exists(ruta_socket):
+            os.remove(ruta_socket)
+    print("Servidor detenido.")
+
+
+# Cliente
+
+class Cliente:
+    """Conexión persistente al servidor: cada pedir() envía una petición y espera su respuesta."""
+
+    def __init__(self, ruta_socket=RUTA_SOCKET_POR_DEFECTO, tiempo_espera=None):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(tiempo_espera)
+        self._socket.connect(ruta_socket)
+        self._archivo = self._socket.makefile('rwb')
+
+    def pedir(self, peticion):
+        """Envía la petición (diccionario) y devuelve la respuesta decodificada."""
+        self._archivo.write(json.dumps(peticion, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._archivo.flush()
+        linea = self._archivo.readline()
+        if not linea:
+            raise ConnectionError("El servidor cerró la conexión.")
+        return json.loads(linea)
+
+    def cerrar(self):
+        self._archivo.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+def pedir(peticion, ruta_socket=RUTA_SOCKET_POR_DEFECTO):
+    """Envía una sola petición por una conexión nueva y devuelve la respuesta."""
+    with Cliente(ruta_socket) as cliente:
+        return cliente.pedir(peticion)
+
+def esperar_servidor(ruta_socket=RUTA_SOCKET_POR_DEFECTO, tiempo_maximo=30.0):
+    """Espera a que el servidor responda 'ping' (p. ej. tras lanzarlo en segundo plano). Devuelve True si respondió."""
+    limite = time.monotonic() + tiempo_maximo
+    while time.monotonic() < limite:
+        try:
+            if pedir({'op': 'ping'}, ruta_socket).get('ok'):
+                return True
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def main(argumentos=None):
+    """Línea de comandos: iniciar el servidor o enviarle una petición."""
+    parser = argparse.ArgumentParser(description="Servidor de consultas en memoria sobre un socket Unix.")
+    parser.add_argument('--socket', default=RUTA_SOCKET_POR_DEFECTO, help="Ruta del socket Unix")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('iniciar', help="Carga los datos y atiende peticiones hasta Ctrl+C")
+    p_pedir = sub.add_parser('pedir', help="Envía una petición JSON e imprime la respuesta")
+    p_pedir.add_argument('peticion', help='Por ejemplo: \'{"op": "buscar", "pais": "Chile"}\'')
+    args = parser.parse_args(argumentos)
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("Error: este sistema no tiene sockets Unix.")
+        return 1
+
+    if args.comando == 'iniciar':
+        almacenamiento.configurar_desde_entorno()
+        try:
+            asyncio.run(servir(args.socket))
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"Error: {e}")
+            return 1
+        return 0
+
+    try:
+        peticion = json.loads(args.peticion)
+    except json.JSONDecodeError as e:
+        parser.error(f"La petición no es JSON válido: {e}")
+    try:
+        respuesta = pedir(peticion, args.socket)
+    except OSError as e:
+        print(f"Error: no se pudo conectar con el servidor en {args.socket}: {e}")
+        return 1
+    print(json.dumps(respuesta, ensure_ascii=False, indent=2))
+    return 0 if respuesta.get('ok') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
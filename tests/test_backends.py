@@ -0,0 +1,252 @@
+"""
+Pruebas de paridad entre backends: el mismo recorrido de operaciones sobre el árbol CSV,
+SQLite y el binario debe dar los mismos datos y las mismas estadísticas.
+Cada caso corre en un directorio temporal. Ejecutar con: python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import almacenamiento
+import comandos
+import funciones as fn
+
+
+# (Pais, Continente, Región, Población, Superficie). Chile aparece dos veces en America/Sur
+# (filas idénticas) y una vez en America/Norte; Europa/Sur/Iberica es una región de dos niveles.
+DATOS = [
+    ("Argentina", "America", "Sur", 45000000, 2780400),
+    ("Chile", "America", "Sur", 19000000, 756102),
+    ("Chile", "America", "Sur", 19000000, 756102),
+    ("Peru", "America", "Sur", 33000000, 1285216),
+    ("Chile", "America", "Norte", 5, 10),
+    ("Mexico", "America", "Norte", 126000000, 1964375),
+    ("Francia", "Europa", "Oeste", 67000000, 643801),
+    ("España", "Europa", "Sur/Iberica", 47000000, 505990),
+    ("Fiji", "Oceania", "Pacifico", 900000, 18274),
+]
+
+
+def _filas(items):
+    """Ítems como tuplas comparables (Pais, Continente, Región, Población, Superficie)."""
+    return [(i['Pais'], i['Continente'], i['Region'], int(i['Poblacion']), int(i['Superficie'])) for i in items]
+
+def _por_region(items):
+    """Agrupa las filas por región conservando el orden interno (el orden global depende del backend)."""
+    return sorted(_filas(items), key=lambda fila: (fila[1], fila[2]))
+
+def _por_region_esperado(datos):
+    """Lo mismo que _por_region para filas de DATOS."""
+    return sorted(datos, key=lambda fila: (fila[1], fila[2]))
+
+
+class ParidadBackends:
+    """Casos comunes; cada subclase indica el backend con NOMBRE."""
+    NOMBRE = None
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        self.directorio = temporal.name
+
+        directorio_original = os.getcwd()
+        backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+        os.chdir(self.directorio)
+
+        def restaurar():
+            if isinstance(fn.BACKEND, almacenamiento.BackendSQLite):
+                fn.BACKEND.cerrar()
+            fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+            fn.invalidar_cache()
+            os.chdir(directorio_original)
+        self.addCleanup(restaurar)
+
+        # Las funciones informan por pantalla; en las pruebas solo interesa el resultado
+        salida = contextlib.redirect_stdout(io.StringIO())
+        salida.__enter__()
+        self.addCleanup(salida.__exit__, None, None, None)
+        ruta = os.path.join(self.directorio, 'paises.db') if self.NOMBRE == 'sqlite' else 'DB'
+        almacenamiento.configurar_backend(self.NOMBRE, ruta)
+
+    def escribir_origen(self, datos):
+        origen = os.path.join(self.directorio, 'origen.csv')
+        with open(origen, 'w', encoding='utf-8') as f:
+            f.write("Pais,Continente,Region,Poblacion,Superficie\n")
+            for pais, continente, region, poblacion, superficie in datos:
+                f.write(f"{pais},{continente},{region},{poblacion},{superficie}\n")
+        return origen
+
+    def importar(self, datos=DATOS):
+        fn.importar_datos_iniciales(self.escribir_origen(datos))
+
+    def region(self, continente, region):
+        return _filas(fn.obtener_datos_filtrados(continente, region))
+
+    def test_importacion_conserva_filas_y_orden_de_cada_region(self):
+        self.importar()
+        self.assertEqual(_por_region(fn.obtener_todos_los_datos()), _por_region_esperado(DATOS))
+
+    def test_nombres_duplicados_cambian_solo_la_primera_fila(self):
+        self.importar()
+        chile = ("Chile", 19000000, 756102)
+
+        fn.registrar_cambio("America", "Sur", 'U', chile, ("Chile", 1, 2))
+        self.assertEqual(self.region("America", "Sur"), [
+            ("Argentina", "America", "Sur", 45000000, 2780400),
+            ("Chile", "America", "Sur", 1, 2),
+            ("Chile", "America", "Sur", 19000000, 756102),
+            ("Peru", "America", "Sur", 33000000, 1285216),
+        ])
+
+        # La baja alcanza a la fila que todavía tiene los valores originales, no a la modificada
+        fn.registrar_cambio("America", "Sur", 'D', chile)
+        self.assertEqual([fila[3] for fila in self.region("America", "Sur") if fila[0] == "Chile"], [1])
+        # El Chile de otra región no se toca
+        self.assertIn(("Chile", "America", "Norte", 5, 10), self.region("America", "Norte"))
+
+    def test_renombrar_a_un_nombre_que_existe_en_otra_region(self):
+        self.importar()
+        fn.registrar_cambio("America", "Sur", 'U', ("Peru", 33000000, 1285216), ("Mexico", 33000000, 1285216))
+
+        self.assertEqual(self.region("America", "Sur")[-1], ("Mexico", "America", "Sur", 33000000, 1285216))
+        self.assertEqual(self.region("America", "Norte"), [
+            ("Chile", "America", "Norte", 5, 10),
+            ("Mexico", "America", "Norte", 126000000, 1964375),
+        ])
+
+    def test_lote_mueve_un_pais_de_region(self):
+        self.importar()
+        resultado = comandos.aplicar_lote([
+            {"op": "eliminar", "pais": "Fiji"},
+            {"op": "alta", "continente": "Europa", "region": "Oeste", "pais": "Fiji",
+             "poblacion": 900000, "superficie": 18274},
+            {"op": "modificar", "pais": "Fiji", "nuevo_pais": "Fiyi"},
+        ])
+        self.assertEqual((resultado['aplicadas'], resultado['errores']), (3, []))
+
+        self.assertEqual(self.region("Oceania", None), [])
+        self.assertEqual(self.region("Europa", "Oeste"), [
+            ("Francia", "Europa", "Oeste", 67000000, 643801),
+            ("Fiyi", "Europa", "Oeste", 900000, 18274),
+        ])
+
+    def test_renombrar_entre_fragmentos_de_una_region(self):
+        # Con un tamaño máximo mínimo el árbol CSV reparte la región en varios archivos;
+        # para los demás backends el parámetro no tiene efecto y el resultado debe ser el mismo
+        datos = [(f"Pais{numero:02d}", "Asia", "Este", numero + 1, numero + 2) for numero in range(40)]
+        with mock.patch.object(fn, 'TAM_MAXIMO_FRAGMENTO', 200):
+            self.importar(datos)
+            for numero in range(0, 40, 3):
+                anterior = (f"Pais{numero:02d}", numero + 1, numero + 2)
+                fn.registrar_cambio("Asia", "Este", 'U', anterior, (f"Nuevo{numero:02d}", numero + 1, numero + 2))
+
+            esperado = sorted(
+                (f"Nuevo{numero:02d}" if numero % 3 == 0 else f"Pais{numero:02d}", "Asia", "Este", numero + 1, numero + 2)
+                for numero in range(40)
+            )
+            self.assertEqual(sorted(self.region("Asia", "Este")), esperado)
+            self.assertEqual(sorted(_filas(fn.obtener_todos_los_datos())), esperado)
+            self.assertEqual(fn.estadisticas_desde_resumenes()['global'], fn.calcular_resumen(
+                [{'Poblacion': fila[3], 'Superficie': fila[4]} for fila in esperado]))
+
+    def test_filtros_de_particion(self):
+        self.importar()
+        esperado_america = _por_region_esperado([fila for fila in DATOS if fila[1] == "America"])
+
+        self.assertEqual(_por_region(fn.obtener_datos_filtrados("america")), esperado_america)
+        self.assertEqual(self.region(None, "SUR"), [d for d in DATOS if d[2] == "Sur"])
+        self.assertEqual(self.region("Europa", "Sur/Iberica"), [("España", "Europa", "Sur/Iberica", 47000000, 505990)])
+        self.assertEqual(self.region("Europa", "Sur"), [])
+        self.assertEqual(self.region("Asia", None), [])
+        self.assertEqual(self.region(None, "Inexistente"), [])
+
+    def test_region_vaciada(self):
+        self.importar()
+        fn.reescribir_archivo_csv_especifico("Oceania", "Pacifico", [])
+        fn.registrar_cambio("Europa", "Oeste", 'D', ("Francia", 67000000, 643801))
+
+        self.assertEqual(self.region("Oceania", "Pacifico"), [])
+        self.assertEqual(self.region("Europa", "Oeste"), [])
+        restantes = [d for d in DATOS if d[2] not in ("Pacifico", "Oeste")]
+        self.assertEqual(_por_region(fn.obtener_todos_los_datos()), _por_region_esperado(restantes))
+
+        estadisticas = fn.estadisticas_desde_resumenes()
+        self.assertNotIn("Oceania", estadisticas['por_continente'])
+        self.assertNotIn(("Europa", "Oeste"), estadisticas['por_region'])
+        self.assertEqual(estadisticas['global']['cantidad'], len(restantes))
+
+    def test_sincronizacion_reescribe_y_quita_regiones(self):
+        self.importar()
+        # Oceania desaparece, America/Norte cambia y Asia/Este es nueva; el resto queda igual
+        nuevos = [d for d in DATOS if d[1] != "Oceania" and d[2] != "Norte"]
+        nuevos += [("Mexico", "America", "Norte", 127000000, 1964375), ("Japon", "Asia", "Este", 125000000, 377975)]
+        conteo = fn.sincronizar_datos(self.escribir_origen(nuevos))
+
+        self.assertEqual((conteo['regiones_reescritas'], conteo['regiones_eliminadas']), (2, 1))
+        self.assertEqual(_por_region(fn.obtener_todos_los_datos()), _por_region_esperado(nuevos))
+        self.assertEqual(fn.estadisticas_desde_resumenes()['global']['cantidad'], len(nuevos))
+
+    def test_estadisticas_coinciden_con_un_recorrido_completo(self):
+        self.importar()
+        # La baja del máximo deja vencido el resumen del árbol CSV: debe recalcularse
+        fn.registrar_cambio("America", "Norte", 'D', ("Mexico", 126000000, 1964375))
+        fn.registrar_cambio("America", "Sur", 'U', ("Argentina", 45000000, 2780400), ("Argentina", 46000000, 2780400))
+        fn.alta_item("Asia", "Este", "Japon", 125000000, 377975)
+
+        items = fn.obtener_todos_los_datos()
+        por_continente, por_region = {}, {}
+        for item in items:
+            por_continente.setdefault(item['Continente'], []).append(item)
+            por_region.setdefault((item['Continente'], item['Region']), []).append(item)
+
+        estadisticas = fn.estadisticas_desde_resumenes()
+        self.assertEqual(estadisticas['global'], fn.calcular_resumen(items))
+        self.assertEqual(estadisticas['por_continente'],
+                         {clave: fn.calcular_resumen(grupo) for clave, grupo in por_continente.items()})
+        self.assertEqual(estadisticas['por_region'],
+                         {clave: fn.calcular_resumen(grupo) for clave, grupo in por_region.items()})
+
+
+class TestBackendCSV(ParidadBackends, unittest.TestCase):
+    NOMBRE = 'csv'
+
+
+class TestBackendSQLite(ParidadBackends, unittest.TestCase):
+    NOMBRE = 'sqlite'
+
+    def test_sincronizacion_fallida_no_cambia_ninguna_region(self):
+        self.importar()
+        nuevos = [d for d in DATOS if d[1] != "Oceania"] + [("Japon", "Asia", "Este", 125000000, 377975)]
+        insertar = fn.BACKEND._ejecutar_insercion
+        llamadas = []
+
+        def fallar_en_la_segunda(filas):
+            llamadas.append(filas)
+            if len(llamadas) == 2:
+                raise sqlite3.OperationalError("disk I/O error")
+            insertar(filas)
+
+        with mock.patch.object(fn.BACKEND, '_ejecutar_insercion', fallar_en_la_segunda):
+            with self.assertRaises(sqlite3.OperationalError):
+                fn.sincronizar_datos(self.escribir_origen(nuevos))
+        self.assertEqual(len(llamadas), 2)
+        self.assertEqual(_por_region(fn.obtener_todos_los_datos()), _por_region_esperado(DATOS))
+
+
+class TestBackendBinario(ParidadBackends, unittest.TestCase):
+    NOMBRE = 'binario'
+
+
+class TestVerificacionDeBackends(unittest.TestCase):
+    def test_recorrido_de_verificar_backends(self):
+        origen = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'paises.csv')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(almacenamiento.verificar_backends(origen))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+Prueba de estrés con escritores concurrentes en varios procesos (ver benchmark.ejecutar_estres).
+Con pocos procesos y regiones compartidas alcanza para que una regresión en los bloqueos
+por región se note como escrituras perdidas o países duplicados.
+"""
+import unittest
+
+import benchmark
+
+PROCESOS = 4
+OPERACIONES = 60   # Por proceso: altas, cambios por el registro y lotes que reescriben la región
+REGIONES = 2       # Menos regiones que procesos: varios escriben siempre sobre la misma
+
+
+class TestEscritoresConcurrentes(unittest.TestCase):
+    def comprobar(self, backend):
+        resultado = benchmark.ejecutar_estres(PROCESOS, OPERACIONES, REGIONES, backend)
+        self.assertEqual(resultado['operaciones'], PROCESOS * OPERACIONES)
+        self.assertEqual(resultado['perdidas'], 0)
+        self.assertEqual(resultado['duplicados'], 0)
+
+    def test_arbol_csv(self):
+        self.comprobar('csv')
+
+    def test_binario(self):
+        self.comprobar('binario')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Pruebas de la instantánea de carga (instantanea.py): en ambos modos debe devolver lo mismo que
+la lectura de los Datos.csv, y un cambio posterior en el árbol la deja vencida solo en ese archivo.
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import funciones as fn
+import instantanea
+
+DATOS = [
+    ("Argentina", "America", "Sur", 45000000, 2780400),
+    ("Chile", "America", "Sur", 19000000, 756102),
+    ("Mexico", "America", "Norte", 126000000, 1964375),
+    ("Francia", "Europa", "Oeste", 67000000, 643801),
+    ("España", "Europa", "Sur/Iberica", 47000000, 505990),
+]
+
+
+class TestInstantanea(unittest.TestCase):
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        directorio_original = os.getcwd()
+        backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+        instantanea_original = fn.INSTANTANEA
+        os.chdir(temporal.name)
+
+        def restaurar():
+            fn.BACKEND, fn.BASE_DIR, fn.INSTANTANEA = backend_original, base_original, instantanea_original
+            fn.invalidar_cache()
+            os.chdir(directorio_original)
+        self.addCleanup(restaurar)
+
+        salida = contextlib.redirect_stdout(io.StringIO())
+        salida.__enter__()
+        self.addCleanup(salida.__exit__, None, None, None)
+
+        fn.BACKEND, fn.BASE_DIR, fn.INSTANTANEA = None, 'DB', None
+        fn.invalidar_cache()
+        with open('origen.csv', 'w', encoding='utf-8') as f:
+            f.write("Pais,Continente,Region,Poblacion,Superficie\n")
+            for fila in DATOS:
+                f.write(",".join(map(str, fila)) + "\n")
+        fn.importar_datos_iniciales('origen.csv')
+        # Un valor no numérico, que la instantánea compacta guarda aparte como excepción
+        fn.registrar_cambio("Europa", "Sur/Iberica", 'U', ("España", 47000000, 505990), ("España", 47000000, 'N/A'))
+
+    def desde_csv(self, compacto):
+        """La carga de referencia: los Datos.csv parseados, sin instantánea."""
+        fn.invalidar_cache()
+        return instantanea._como_diccionarios(fn.obtener_todos_los_datos(compacto=compacto))
+
+    def desde_instantanea(self, compacto):
+        """Carga partiendo solo de la instantánea guardada; devuelve (ítems, archivos reparseados)."""
+        cache = {}
+        instantanea.cargar(cache, compacto)
+        items = fn.recargar_datos_incremental(compacto=compacto, cache=cache)
+        return instantanea._como_diccionarios(items), fn.ESTADISTICAS_RECARGA['reparseados']
+
+    def guardar(self, compacto):
+        cache = {}
+        fn.recargar_datos_incremental(compacto=compacto, cache=cache)
+        self.assertEqual(instantanea.guardar(cache, compacto), len(DATOS))
+
+    def test_ambos_modos_coinciden_con_la_carga(self):
+        for compacto in (False, True):
+            with self.subTest(compacto=compacto):
+                self.guardar(compacto)
+                self.assertTrue(os.path.exists(instantanea.obtener_ruta_instantanea(compacto=compacto)))
+                # 'N/A' no es un int64: en modo compacto sale de la lista de excepciones
+                self.assertEqual(len(instantanea.leer(compacto=compacto)[1]), 1 if compacto else 0)
+
+                items, reparseados = self.desde_instantanea(compacto)
+                self.assertEqual(reparseados, 0)
+                esperado = self.desde_csv(compacto)
+                self.assertEqual(items, esperado)
+                # También los tipos: int en modo compacto, el texto exacto en modo diccionario
+                self.assertEqual([[type(item[campo]) for campo in instantanea.CAMPOS] for item in items],
+                                 [[type(item[campo]) for campo in instantanea.CAMPOS] for item in esperado])
+
+    def test_alta_posterior_deja_la_instantanea_vencida(self):
+        for compacto in (False, True):
+            self.guardar(compacto)
+        fn.alta_item("America", "Sur", "Peru", 33000000, 1285216)
+
+        for compacto in (False, True):
+            with self.subTest(compacto=compacto):
+                items, reparseados = self.desde_instantanea(compacto)
+                # Solo el archivo de America/Sur cambió de sello; el resto sigue saliendo de la instantánea
+                self.assertEqual(reparseados, 1)
+                self.assertIn("Peru", [item['Pais'] for item in items])
+                self.assertEqual(items, self.desde_csv(compacto))
+
+    def test_la_carga_activa_la_vuelve_a_escribir(self):
+        instantanea.activar()
+        fn.obtener_todos_los_datos()
+        fn.alta_item("Asia", "Este", "Japon", 125000000, 377975)
+
+        fn.invalidar_cache()
+        fn.obtener_todos_los_datos()
+        self.assertEqual(fn.ESTADISTICAS_RECARGA['reparseados'], 1)
+        # La carga anterior reescribió la instantánea: la siguiente ya no parsea nada
+        items, reparseados = self.desde_instantanea(False)
+        self.assertEqual(reparseados, 0)
+        self.assertEqual(items, self.desde_csv(False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Pruebas del registro de cambios (Datos.log) del árbol CSV: una compactación interrumpida
+en cualquier punto no debe perder ni repetir cambios.
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import funciones as fn
+
+
+class Interrupcion(Exception):
+    """Simula que el proceso muere en medio de la compactación."""
+
+
+class TestCompactacionInterrumpida(unittest.TestCase):
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        directorio_original = os.getcwd()
+        backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+        os.chdir(temporal.name)
+
+        def restaurar():
+            fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+            fn.invalidar_cache()
+            os.chdir(directorio_original)
+        self.addCleanup(restaurar)
+
+        salida = contextlib.redirect_stdout(io.StringIO())
+        salida.__enter__()
+        self.addCleanup(salida.__exit__, None, None, None)
+
+        fn.BACKEND, fn.BASE_DIR = None, 'DB'
+        fn.invalidar_cache()
+        # Alta A, alta B, baja de A (al log) y A de nuevo: el log tiene una baja que coincide con la A nueva
+        fn.alta_item("America", "Sur", "A", 1, 1)
+        fn.alta_item("America", "Sur", "B", 2, 2)
+        fn.registrar_cambio("America", "Sur", 'D', ("A", 1, 1))
+        fn.alta_item("America", "Sur", "A", 1, 1)
+        self.ruta_directorio, self.ruta_csv = fn.obtener_ruta_csv("America", "Sur")
+        self.assertTrue(os.path.exists(fn.obtener_ruta_log(self.ruta_csv)))
+
+    def paises(self):
+        fn.invalidar_cache()
+        return [item['Pais'] for item in fn.obtener_todos_los_datos()]
+
+    def compactar_interrumpiendo(self, funcion, condicion):
+        """Compacta la región haciendo fallar la primera llamada a os.<funcion> que cumpla la condición."""
+        original = getattr(os, funcion)
+
+        def interrumpir(ruta, *args):
+            if condicion(ruta, *args):
+                raise Interrupcion()
+            return original(ruta, *args)
+
+        with mock.patch.object(os, funcion, interrumpir):
+            with self.assertRaises(Interrupcion):
+                fn.compactar_region("America", "Sur")
+
+    def comprobar_recuperacion(self):
+        self.assertEqual(self.paises(), ["B", "A"])
+        # La próxima escritura termina el reemplazo pendiente antes de tocar la región
+        fn.alta_item("America", "Sur", "C", 3, 3)
+        self.assertEqual(self.paises(), ["B", "A", "C"])
+        self.assertEqual(sorted(n for n in os.listdir(self.ruta_directorio) if n.startswith("Datos.csv")),
+                         ["Datos.csv"])
+        self.assertFalse(os.path.exists(fn.obtener_ruta_log(self.ruta_csv)))
+
+    def test_compactacion_completa(self):
+        fn.compactar_region("America", "Sur")
+        self.comprobar_recuperacion()
+
+    def test_interrupcion_antes_de_borrar_el_log(self):
+        self.compactar_interrumpiendo('remove', lambda ruta: ruta.endswith(".log"))
+        self.comprobar_recuperacion()
+
+    def test_interrupcion_antes_de_instalar_la_base(self):
+        self.compactar_interrumpiendo('replace', lambda origen, destino: destino == self.ruta_csv)
+        self.assertFalse(os.path.exists(fn.obtener_ruta_log(self.ruta_csv)))
+        self.comprobar_recuperacion()
+
+    def test_resumen_tras_la_interrupcion(self):
+        self.compactar_interrumpiendo('replace', lambda origen, destino: destino == self.ruta_csv)
+        self.assertEqual(fn.estadisticas_desde_resumenes()['global']['cantidad'], 2)
+
+
+class TestErroresDeEscritura(unittest.TestCase):
+    """Un cambio que no llegó al disco se informa con OSError, no se da por guardado."""
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        directorio_original = os.getcwd()
+        backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+        os.chdir(temporal.name)
+
+        def restaurar():
+            fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+            fn.invalidar_cache()
+            os.chdir(directorio_original)
+        self.addCleanup(restaurar)
+
+        salida = contextlib.redirect_stdout(io.StringIO())
+        salida.__enter__()
+        self.addCleanup(salida.__exit__, None, None, None)
+
+        fn.BACKEND, fn.BASE_DIR = None, 'DB'
+        fn.invalidar_cache()
+        fn.alta_item("America", "Sur", "A", 1, 1)
+
+    def test_cambio_suelto(self):
+        with mock.patch.object(fn, '_anexar_al_log', side_effect=OSError("disco lleno")):
+            with self.assertRaises(OSError):
+                fn.aplicar_cambios_region("America", "Sur", [['D', "A", 1, 1]])
+            with self.assertRaises(OSError):
+                fn.registrar_cambio("America", "Sur", 'U', ("A", 1, 1), ("A", 2, 2))
+
+    def test_alta_suelta(self):
+        with mock.patch.object(fn, '_fragmentar_si_hace_falta', side_effect=OSError("disco lleno")):
+            with self.assertRaises(OSError):
+                fn.aplicar_cambios_region("America", "Sur", [['A', "B", 2, 2]])
+
+    def test_varios_cambios(self):
+        with mock.patch.object(fn, '_reemplazar_archivo_datos', side_effect=OSError("disco lleno")):
+            with self.assertRaises(OSError):
+                fn.aplicar_cambios_region("America", "Sur", [['D', "A", 1, 1], ['A', "B", 2, 2]])
+        self.assertEqual([item['Pais'] for item in fn.obtener_todos_los_datos()], ["A"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Pruebas del servidor de consultas (servidor.py) sobre el árbol CSV y sobre SQLite.
+Las mutaciones se escriben desde un hilo del executor, así que cada backend tiene que
+aceptar que lo usen desde un hilo distinto del que lo creó.
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import almacenamiento
+import comandos
+import funciones as fn
+import servidor
+
+DATOS = [
+    ("Argentina", "America", "Sur", 45000000, 2780400),
+    ("Chile", "America", "Sur", 19000000, 756102),
+    ("Francia", "Europa", "Oeste", 67000000, 643801),
+]
+
+
+class ServidorSobreBackend:
+    """Casos comunes; cada subclase indica el backend con NOMBRE."""
+    NOMBRE = None
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        directorio_original = os.getcwd()
+        backend_original, base_original = fn.BACKEND, fn.BASE_DIR
+        os.chdir(temporal.name)
+
+        def restaurar():
+            if isinstance(fn.BACKEND, almacenamiento.BackendSQLite):
+                fn.BACKEND.cerrar()
+            fn.BACKEND, fn.BASE_DIR = backend_original, base_original
+            fn.invalidar_cache()
+            os.chdir(directorio_original)
+        self.addCleanup(restaurar)
+
+        salida = contextlib.redirect_stdout(io.StringIO())
+        salida.__enter__()
+        self.addCleanup(salida.__exit__, None, None, None)
+
+        ruta = os.path.join(temporal.name, 'paises.db') if self.NOMBRE == 'sqlite' else 'DB'
+        almacenamiento.configurar_backend(self.NOMBRE, ruta)
+        with open('origen.csv', 'w', encoding='utf-8') as f:
+            f.write("Pais,Continente,Region,Poblacion,Superficie\n")
+            for fila in DATOS:
+                f.write(",".join(map(str, fila)) + "\n")
+        fn.importar_datos_iniciales('origen.csv')
+        self.servidor = servidor.ServidorConsultas()
+
+    def pedir(self, *peticiones):
+        """Atiende las peticiones en orden dentro de un mismo bucle asyncio."""
+        async def atender():
+            return [await self.servidor.atender_async(peticion) for peticion in peticiones]
+        return asyncio.run(atender())
+
+    def en_disco(self, pais):
+        return [(i['Poblacion'], i['Superficie']) for i in fn.obtener_todos_los_datos() if i['Pais'] == pais]
+
+    def test_mutaciones_y_recarga_desde_el_executor(self):
+        respuestas = self.pedir(
+            {"op": "modificar", "pais": "Chile", "poblacion": 19500000},
+            {"op": "alta", "continente": "Asia", "region": "Este", "pais": "Japon",
+             "poblacion": 125000000, "superficie": 377975},
+            {"op": "eliminar", "pais": "Francia"},
+            {"op": "recargar"},
+            {"op": "buscar", "pais": "Chile"},
+        )
+        for respuesta in respuestas:
+            self.assertTrue(respuesta['ok'], respuesta)
+        self.assertEqual(respuestas[3]['resultado'], {'cantidad': 3})
+        self.assertEqual(int(respuestas[4]['resultado']['Poblacion']), 19500000)
+
+        self.assertEqual([int(v) for v in self.en_disco("Chile")[0]], [19500000, 756102])
+        self.assertEqual(len(self.en_disco("Japon")), 1)
+        self.assertEqual(self.en_disco("Francia"), [])
+
+    def test_escritura_fallida_no_queda_en_memoria(self):
+        with mock.patch.object(comandos, 'persistir_lote', side_effect=OSError("disco lleno")):
+            respuesta, = self.pedir({"op": "modificar", "pais": "Chile", "poblacion": 1})
+        self.assertEqual(respuesta, {'ok': False, 'error': "disco lleno"})
+
+        buscado, = self.pedir({"op": "buscar", "pais": "Chile"})
+        self.assertEqual(int(buscado['resultado']['Poblacion']), 19000000)
+        self.assertEqual([int(v) for v in self.en_disco("Chile")[0]], [19000000, 756102])
+
+    def test_error_del_backend_se_informa(self):
+        # Falla la escritura propia del backend, por debajo de aplicar_cambios_region
+        with self.fallar_escritura():
+            respuesta, = self.pedir({"op": "eliminar", "pais": "Chile"})
+        self.assertFalse(respuesta['ok'])
+        buscado, = self.pedir({"op": "buscar", "pais": "Chile"})
+        self.assertIsNotNone(buscado['resultado'])
+        self.assertEqual(len(self.en_disco("Chile")), 1)
+
+
+class TestServidorCSV(ServidorSobreBackend, unittest.TestCase):
+    NOMBRE = 'csv'
+
+    def fallar_escritura(self):
+        return mock.patch.object(fn, '_anexar_al_log', side_effect=OSError("disco lleno"))
+
+
+class TestServidorSQLite(ServidorSobreBackend, unittest.TestCase):
+    NOMBRE = 'sqlite'
+
+    def fallar_escritura(self):
+        return mock.patch.object(fn.BACKEND, 'eliminar', side_effect=sqlite3.OperationalError("disk I/O error"))
+
+
+if __name__ == '__main__':
+    unittest.main()